@@ -0,0 +1,303 @@
+import numpy as np
+import pandas as pd
+
+from indicadores import construir_matriz_indicadores
+
+# =====================================================
+# CUBO DE CONTEOS CANDIDATO × FECHA × CATEGORÍA
+# =====================================================
+
+# Marca de celda sin publicaciones en 'primera_fila'
+SIN_FILA = np.iinfo(np.int64).max
+
+def construir_cubo_conteos(df, dummy_cols, col_candidato='Candidato', col_fecha='Fecha_convertida',
+                           posiciones=None):
+    """
+    Precalcula los conteos de cada columna dummy por candidato y por día
+
+    Devuelve un diccionario con:
+    - 'conteos': ndarray (candidatos x fechas x columnas) con el número de usos
+    - 'publicaciones': ndarray (candidatos x fechas) con el número de publicaciones
+    - 'primera_fila': ndarray (candidatos x fechas) con la primera fila de cada celda,
+      para conservar el orden de aparición de los candidatos
+    - 'candidatos', 'fechas' (datetime64[D]), 'columnas' y 'posicion'
+
+    La última posición del eje de fechas agrupa las publicaciones sin fecha.
+    Si col_fecha es None (o no existe) el cubo solo tiene esa posición.
+    'posiciones' permite indicar el orden global de cada fila (por defecto, su posición en df).
+    """
+    matriz = construir_matriz_indicadores(df, dummy_cols)
+    datos = matriz['datos']
+    n_filas = len(df)
+
+    if col_candidato in df.columns:
+        codigos_candidato, candidatos = pd.factorize(df[col_candidato], use_na_sentinel=False)
+        candidatos = list(candidatos)
+    else:
+        codigos_candidato = np.zeros(n_filas, dtype=np.intp)
+        candidatos = ['Sin candidato']
+
+    if col_fecha is not None and col_fecha in df.columns:
+        dias = pd.to_datetime(df[col_fecha]).dt.normalize()
+        codigos_fecha, fechas = pd.factorize(dias, sort=True)
+        fechas = np.asarray(fechas, dtype='datetime64[D]')
+        codigos_fecha = np.where(codigos_fecha < 0, len(fechas), codigos_fecha)
+    else:
+        codigos_fecha = np.zeros(n_filas, dtype=np.intp)
+        fechas = np.array([], dtype='datetime64[D]')
+
+    n_candidatos = max(len(candidatos), 1)
+    n_fechas = len(fechas) + 1
+    n_celdas = n_candidatos * n_fechas
+    celdas = codigos_candidato * n_fechas + codigos_fecha
+
+    publicaciones = np.bincount(celdas, minlength=n_celdas)
+    conteos = np.zeros((n_celdas, datos.shape[1]), dtype=np.int64)
+    for j in range(datos.shape[1]):
+        conteos[:, j] = np.bincount(celdas, weights=datos[:, j], minlength=n_celdas)
+
+    if posiciones is None:
+        posiciones = np.arange(n_filas, dtype=np.int64)
+    primera_fila = np.full(n_celdas, SIN_FILA, dtype=np.int64)
+    np.minimum.at(primera_fila, celdas, np.asarray(posiciones, dtype=np.int64))
+
+    return {
+        'conteos': conteos.reshape(n_candidatos, n_fechas, -1),
+        'publicaciones': publicaciones.reshape(n_candidatos, n_fechas),
+        'primera_fila': primera_fila.reshape(n_candidatos, n_fechas),
+        'candidatos': candidatos,
+        'fechas': fechas,
+        'columnas': matriz['columnas'],
+        'posicion': matriz['posicion']
+    }
+
+def combinar_cubos(cubo, delta, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) un cubo parcial sobre otro, ampliando los ejes
+
+    Los candidatos nuevos se añaden al final y el eje de fechas pasa a ser la unión
+    ordenada de ambos. Ambos cubos deben tener las mismas columnas dummy.
+    """
+    if delta['columnas'] != cubo['columnas']:
+        raise ValueError("Los cubos tienen columnas dummy distintas")
+
+    candidatos = list(cubo['candidatos']) + [c for c in delta['candidatos'] if c not in cubo['candidatos']]
+    fechas = np.union1d(cubo['fechas'], delta['fechas']).astype('datetime64[D]')
+    indice_candidato = {cand: i for i, cand in enumerate(candidatos)}
+
+    def reubicar(origen):
+        # Posiciones de los ejes de 'origen' en los ejes combinados (sin fecha -> última)
+        filas = np.array([indice_candidato[c] for c in origen['candidatos']], dtype=np.intp)
+        columnas = np.append(np.searchsorted(fechas, origen['fechas']), len(fechas))
+        return np.ix_(filas, columnas)
+
+    forma = (len(candidatos), len(fechas) + 1)
+    conteos = np.zeros(forma + (len(cubo['columnas']),), dtype=np.int64)
+    publicaciones = np.zeros(forma, dtype=np.int64)
+    primera_fila = np.full(forma, SIN_FILA, dtype=np.int64)
+
+    destino = reubicar(cubo)
+    conteos[destino] = cubo['conteos']
+    publicaciones[destino] = cubo['publicaciones']
+    primera_fila[destino] = cubo['primera_fila']
+
+    destino = reubicar(delta)
+    conteos[destino] += signo * delta['conteos']
+    publicaciones[destino] += signo * delta['publicaciones']
+    if signo > 0:
+        primera_fila[destino] = np.minimum(primera_fila[destino], delta['primera_fila'])
+    # Tras una baja 'primera_fila' queda como cota inferior; las celdas vacías se reinician
+    primera_fila[publicaciones == 0] = SIN_FILA
+
+    return {
+        'conteos': conteos,
+        'publicaciones': publicaciones,
+        'primera_fila': primera_fila,
+        'candidatos': candidatos,
+        'fechas': fechas,
+        'columnas': cubo['columnas'],
+        'posicion': cubo['posicion']
+    }
+
+def actualizar_cubo_conteos(cubo, df_altas, df_bajas, dummy_cols, posiciones_altas=None,
+                            col_candidato='Candidato', col_fecha='Fecha_convertida'):
+    """
+    Actualiza un cubo existente con las filas añadidas y retiradas, sin recalcularlo
+
+    Parámetros:
+    - cubo: Cubo creado con construir_cubo_conteos
+    - df_altas: Filas nuevas (o nueva versión de filas modificadas)
+    - df_bajas: Filas eliminadas (o versión anterior de filas modificadas)
+    - dummy_cols: Columnas dummy del cubo
+    - posiciones_altas: Orden global de las filas añadidas
+    """
+    for df, signo, posiciones in ((df_bajas, -1, None), (df_altas, 1, posiciones_altas)):
+        if df is not None and len(df) > 0:
+            delta = construir_cubo_conteos(df, dummy_cols, col_candidato, col_fecha, posiciones)
+            cubo = combinar_cubos(cubo, delta, signo)
+    return cubo
+
+def anadir_sumas_acumuladas(cubo):
+    """
+    Añade al cubo las sumas acumuladas por día, para consultar rangos de fechas en O(1)
+
+    'conteos_acumulados' (candidatos x (fechas + 2) x columnas) y
+    'publicaciones_acumuladas' (candidatos x (fechas + 2)) empiezan con una fila de
+    ceros: los conteos de las posiciones de fecha [i, j) son acumulados[:, j] -
+    acumulados[:, i]. La última posición sigue siendo la de publicaciones sin fecha.
+    """
+    forma = cubo['conteos'].shape
+    conteos_acumulados = np.zeros((forma[0], forma[1] + 1, forma[2]), dtype=np.int64)
+    np.cumsum(cubo['conteos'], axis=1, out=conteos_acumulados[:, 1:])
+    publicaciones_acumuladas = np.zeros((forma[0], forma[1] + 1), dtype=np.int64)
+    np.cumsum(cubo['publicaciones'], axis=1, out=publicaciones_acumuladas[:, 1:])
+    return {**cubo, 'conteos_acumulados': conteos_acumulados,
+            'publicaciones_acumuladas': publicaciones_acumuladas}
+
+def posiciones_rango_fechas(cubo, fecha_inicio=None, fecha_fin=None):
+    """
+    Posiciones [inicio, fin) del eje de fechas del cubo para un rango inclusivo
+
+    Sin rango se devuelve el eje completo (incluida la posición sin fecha); con
+    rango, las publicaciones sin fecha quedan fuera.
+    """
+    if fecha_inicio is None and fecha_fin is None:
+        return 0, cubo['publicaciones'].shape[1]
+    dias = cubo['fechas']
+    inicio = 0 if fecha_inicio is None else np.searchsorted(dias, np.datetime64(fecha_inicio, 'D'), side='left')
+    fin = len(dias) if fecha_fin is None else np.searchsorted(dias, np.datetime64(fecha_fin, 'D'), side='right')
+    return int(inicio), int(max(fin, inicio))
+
+def consultar_cubo(cubo, candidatos=None, fecha_inicio=None, fecha_fin=None, columnas=None):
+    """
+    Obtiene los conteos por candidato de una selección del cubo
+
+    Parámetros:
+    - cubo: Cubo creado con construir_cubo_conteos
+    - candidatos: Lista de candidatos a incluir (None = todos)
+    - fecha_inicio, fecha_fin: Rango de fechas inclusivo; si se indica, se excluyen
+      las publicaciones sin fecha
+    - columnas: Columnas dummy a devolver (None = todas)
+
+    Devuelve un diccionario con 'conteos' (DataFrame candidatos x columnas) y
+    'publicaciones' (Series por candidato), en orden de primera aparición.
+    """
+    indices_candidato = np.arange(len(cubo['candidatos']))
+    if candidatos is not None:
+        indices_candidato = np.array(
+            [i for i, cand in enumerate(cubo['candidatos']) if cand in candidatos], dtype=np.intp
+        )
+
+    inicio, fin = posiciones_rango_fechas(cubo, fecha_inicio, fecha_fin)
+
+    nombres = cubo['columnas']
+    indices_columna = np.arange(len(nombres))
+    if columnas is not None:
+        nombres = [col for col in columnas if col in cubo['posicion']]
+        indices_columna = np.array([cubo['posicion'][col] for col in nombres], dtype=np.intp)
+
+    if 'conteos_acumulados' in cubo:
+        # Diferencia de dos filas de las sumas acumuladas (no depende del número de días)
+        acumulados = cubo['conteos_acumulados']
+        conteos = (acumulados[indices_candidato, fin] - acumulados[indices_candidato, inicio])[:, indices_columna]
+        acumuladas = cubo['publicaciones_acumuladas']
+        publicaciones = acumuladas[indices_candidato, fin] - acumuladas[indices_candidato, inicio]
+    else:
+        conteos = cubo['conteos'][indices_candidato][:, inicio:fin].sum(axis=1)[:, indices_columna]
+        publicaciones = cubo['publicaciones'][indices_candidato][:, inicio:fin].sum(axis=1)
+    primera_fila = cubo['primera_fila'][indices_candidato][:, inicio:fin].min(axis=1, initial=SIN_FILA)
+
+    # Solo candidatos con publicaciones en la selección, en orden de aparición
+    presentes = np.flatnonzero(publicaciones > 0)
+    presentes = presentes[np.argsort(primera_fila[presentes], kind='stable')]
+    etiquetas = [cubo['candidatos'][indices_candidato[i]] for i in presentes]
+
+    return {
+        'conteos': pd.DataFrame(conteos[presentes], index=etiquetas, columns=nombres),
+        'publicaciones': pd.Series(publicaciones[presentes], index=etiquetas, dtype='int64')
+    }
+
+def contar_por_candidato(df, dummy_cols):
+    """Calcula en una pasada los conteos por candidato de un DataFrame (mismo formato que consultar_cubo)"""
+    return consultar_cubo(construir_cubo_conteos(df, dummy_cols, col_fecha=None))
+
+# =====================================================
+# MOTOR DE AGREGACIÓN POR GRUPOS (FORMATO LARGO)
+# =====================================================
+
+def contar_por_grupo(df, dummy_cols, por='Candidato'):
+    """
+    Conteos de columnas dummy por grupo en una sola pasada (groupby().sum() sobre la matriz booleana)
+
+    'por' es una columna o una lista de columnas; los grupos, incluido el valor
+    ausente, quedan en orden de primera aparición. Devuelve el mismo formato que
+    consultar_cubo: 'conteos' (DataFrame grupos x columnas) y 'publicaciones'.
+    """
+    claves = [por] if isinstance(por, str) else list(por)
+    matriz = construir_matriz_indicadores(df, dummy_cols)
+
+    # Código de grupo combinando los códigos de cada columna de agrupación
+    codigos = np.zeros(len(df), dtype=np.int64)
+    for col in claves:
+        codigos_col, valores = pd.factorize(df[col], use_na_sentinel=False)
+        codigos = codigos * max(len(valores), 1) + codigos_col
+    codigos_grupo, _ = pd.factorize(codigos)
+    _, primeras_filas = np.unique(codigos_grupo, return_index=True)
+
+    if len(claves) == 1:
+        etiquetas = pd.Index(df[claves[0]].to_numpy()[primeras_filas], name=claves[0])
+    else:
+        etiquetas = pd.MultiIndex.from_frame(df[claves].iloc[primeras_filas])
+
+    conteos = pd.DataFrame(matriz['datos'], columns=matriz['columnas']).groupby(codigos_grupo, sort=True).sum()
+    publicaciones = np.bincount(codigos_grupo, minlength=len(etiquetas))
+
+    return {
+        'conteos': pd.DataFrame(conteos.to_numpy(dtype=np.int64), index=etiquetas, columns=matriz['columnas']),
+        'publicaciones': pd.Series(publicaciones, index=etiquetas, dtype='int64')
+    }
+
+def formato_largo(conteos, columnas=None, por='Candidato'):
+    """
+    Pasa unos conteos por grupo al formato largo: una fila por grupo y columna dummy
+
+    Columnas del resultado: las de agrupación ('por'), 'Columna', 'Usos',
+    'Publicaciones' y 'Porcentaje' (usos sobre publicaciones del grupo), en el
+    orden de los grupos y, dentro de cada grupo, de las columnas.
+    """
+    tabla = conteos['conteos']
+    if columnas is not None:
+        tabla = tabla[[col for col in columnas if col in tabla.columns]]
+
+    usos = tabla.to_numpy(dtype=np.int64)
+    publicaciones = conteos['publicaciones'].reindex(tabla.index).to_numpy(dtype=np.int64)
+    n_grupos, n_columnas = usos.shape
+
+    largo = {}
+    claves = [por] if isinstance(por, str) else list(por)
+    grupos = tabla.index.to_frame(index=False)
+    for nombre, col in zip(claves, grupos.columns):
+        largo[nombre] = np.repeat(grupos[col].to_numpy(), n_columnas)
+    largo['Columna'] = np.tile(np.asarray(tabla.columns, dtype=object), n_grupos)
+    largo['Usos'] = usos.ravel()
+    largo['Publicaciones'] = np.repeat(publicaciones, n_columnas)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        porcentaje = (largo['Usos'] / largo['Publicaciones']) * 100
+    largo['Porcentaje'] = np.where(largo['Publicaciones'] > 0, porcentaje, 0.0)
+
+    return pd.DataFrame(largo)
+
+def agregar_indicadores(df, dummy_cols, por='Candidato', conteos=None):
+    """
+    Conteos y porcentajes de cualquier conjunto de columnas dummy por grupo (formato largo)
+
+    Parámetros:
+    - df: DataFrame con las columnas dummy y las de agrupación
+    - dummy_cols: Columnas dummy a agregar
+    - por: Columna o lista de columnas de agrupación
+    - conteos: Conteos ya calculados (p. ej. consultar_cubo); evitan recorrer df
+    """
+    if conteos is None:
+        conteos = contar_por_grupo(df, dummy_cols, por)
+    return formato_largo(conteos, dummy_cols, por)
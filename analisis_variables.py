@@ -1,9 +1,9 @@
-import pandas as pd
+from carga_datos import cargar_recodificado
 
 def main():
     try:
         # Cargar el archivo
-        df = pd.read_excel("recodificado.xlsx")
+        df = cargar_recodificado()
         
         # Identificar columnas dummy
         dummy_cols = [col for col in df.columns if '__' in col]
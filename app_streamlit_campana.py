@@ -11,6 +11,9 @@ import io
 import base64
 from scipy.stats import chi2_contingency
 
+from carga_datos import cargar_recodificado
+from fechas import convertir_fechas
+
 # =====================================================
 # CONFIGURACIÓN VISUAL Y FORMATO APA
 # =====================================================
@@ -181,29 +184,11 @@ st.markdown("""
 def cargar_datos():
     """Carga y procesa los datos del archivo Excel"""
     try:
-        df = pd.read_excel("recodificado.xlsx")
+        df = cargar_recodificado()
         
         # Procesar fechas
         if 'Fecha' in df.columns:
-            meses = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            def convertir_fecha(fecha_str):
-                try:
-                    if pd.isna(fecha_str):
-                        return None
-                    partes = str(fecha_str).lower().strip().split(' de ')
-                    if len(partes) == 2:
-                        dia = int(partes[0])
-                        mes = meses.get(partes[1], 1)
-                        return datetime(2025, mes, dia)
-                except:
-                    pass
-                return None
-            
-            df['Fecha_convertida'] = df['Fecha'].apply(convertir_fecha)
+            df['Fecha_convertida'] = convertir_fechas(df['Fecha'])
         
         # Identificar columnas dummy
         dummy_cols = [col for col in df.columns if '__' in col]
@@ -7,14 +7,33 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import io
 import base64
 from scipy.stats import chi2_contingency
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.shared import OxmlElement, qn
+
+from carga_datos import cargar_recodificado, obtener_firma_datos, almacen_vigente
+from fechas import convertir_fechas
+from indicadores import construir_matriz_indicadores, sumar_indicadores
+from agregaciones import (
+    construir_cubo_conteos, anadir_sumas_acumuladas, consultar_cubo, contar_por_candidato, agregar_indicadores
+)
+from ingesta_incremental import cargar_cubo_almacen
+from filtros import obtener_filtro, clave_seleccion, FilasFiltradas
+from asociaciones import calcular_asociaciones, METODOS_CORRECCION
+from reglas_asociacion import reglas_por_candidato, SOPORTE_MINIMO, CONFIANZA_MINIMA, LIFT_MINIMO, MAX_LONGITUD
+from exportacion import exportar_tablas, FORMATOS_EXPORTACION
+from informe_docx import generar_informe_docx
+from cache_figuras import imagenes_figuras
+from series_temporales import (
+    construir_motor_temporal, construir_motor_temporal_df, tabla_temporal, FRECUENCIAS, MEDIDAS
+)
+from rendimiento import (
+    iniciar_ejecucion, finalizar_ejecucion, medir, instrumentar, anotar_calculo,
+    contar_filas, resumen_ejecucion, guardar_ejecucion, ARCHIVO_LOG as ARCHIVO_LOG_RENDIMIENTO
+)
+from indice_bitmap import (
+    construir_indice_bitmap, restringir_indice, bitmap_posiciones,
+    valores_presentes, contar_bits, contar_dummies, COLUMNA_CONTEXTO
+)
 
 # =====================================================
 # CONFIGURACIÓN DE LA PÁGINA STREAMLIT
@@ -166,33 +185,16 @@ def mostrar_tabla_con_formato(df, titulo, formato_apa=False):
         st.subheader(titulo)
         st.dataframe(df, use_container_width=True)
 
-@st.cache_data
-def cargar_datos():
-    """Carga y procesa los datos del archivo Excel"""
+@st.cache_data(max_entries=1)
+def cargar_datos(firma_datos=None):
+    """Carga y procesa los datos del archivo Excel (o del almacén incremental)"""
+    anotar_calculo()
     try:
-        df = pd.read_excel("recodificado.xlsx")
+        df = cargar_recodificado()
         
         # Procesar fechas
         if 'Fecha' in df.columns:
-            meses = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            def convertir_fecha(fecha_str):
-                try:
-                    if pd.isna(fecha_str):
-                        return None
-                    partes = str(fecha_str).lower().strip().split(' de ')
-                    if len(partes) == 2:
-                        dia = int(partes[0])
-                        mes = meses.get(partes[1], 1)
-                        return datetime(2025, mes, dia)
-                except:
-                    pass
-                return None
-            
-            df['Fecha_convertida'] = df['Fecha'].apply(convertir_fecha)
+            df['Fecha_convertida'] = convertir_fechas(df['Fecha'])
         
         # Identificar columnas dummy
         dummy_cols = [col for col in df.columns if '__' in col]
@@ -202,7 +204,8 @@ def cargar_datos():
         st.error(f"Error al cargar datos: {e}")
         return None, []
 
-def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False):
+@instrumentar()
+def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False, conteos=None):
     """Crea ranking de categorías dentro de una variable específica o de todas"""
     try:
         if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -211,19 +214,24 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
         else:
             cols_variable = dummy_cols
         
+        # Conteos por candidato: del cubo precalculado o en una sola pasada sobre df
+        if conteos is None:
+            conteos = contar_por_candidato(df, cols_variable)
+        tabla_conteos = conteos['conteos']
+        total_publicaciones = int(conteos['publicaciones'].sum())
+        
         # Calcular sumas
+        totales = tabla_conteos[[col for col in cols_variable if col in tabla_conteos.columns]].sum(axis=0)
         sumas = {}
-        for col in cols_variable:
-            if col in df.columns:
-                suma = df[col].sum()
-                if suma > 0:  # Solo incluir categorías con al menos 1 uso
-                    if '__' in col:
-                        variable = col.split('__')[0].replace('_', ' ').title()
-                        categoria = col.split('__')[1].replace('_', ' ').title()
-                        nombre_completo = f"{variable} - {categoria}"
-                    else:
-                        nombre_completo = col
-                    sumas[nombre_completo] = suma
+        for col, suma in totales.items():
+            if suma > 0:  # Solo incluir categorías con al menos 1 uso
+                if '__' in col:
+                    variable = col.split('__')[0].replace('_', ' ').title()
+                    categoria = col.split('__')[1].replace('_', ' ').title()
+                    nombre_completo = f"{variable} - {categoria}"
+                else:
+                    nombre_completo = col
+                sumas[nombre_completo] = suma
         
         # Crear DataFrame y ordenar
         if sumas:
@@ -233,8 +241,7 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
             df_ranking.index += 1  # Comenzar numeración en 1
             
             # Agregar porcentaje
-            total = df_ranking['Frecuencia'].sum()
-            df_ranking['Porcentaje'] = (df_ranking['Frecuencia'] / len(df) * 100).round(2)
+            df_ranking['Porcentaje'] = (df_ranking['Frecuencia'] / total_publicaciones * 100).round(2)
             
             return df_ranking
         else:
@@ -244,7 +251,8 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
         st.error(f"Error al crear ranking: {e}")
         return pd.DataFrame(columns=['Categoría', 'Frecuencia', 'Porcentaje'])
 
-def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False):
+@instrumentar()
+def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False, conteos=None):
     """Crea ranking de categorías por candidato y total general"""
     try:
         if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -253,69 +261,42 @@ def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=No
         else:
             cols_variable = dummy_cols
         
-        # Obtener candidatos únicos
-        candidatos = df['Candidato'].unique() if 'Candidato' in df.columns else ['Sin candidato']
-        
-        # Crear diccionario para almacenar resultados
-        resultados = {}
-        
-        # Calcular para cada candidato
-        for candidato in candidatos:
-            df_candidato = df[df['Candidato'] == candidato] if 'Candidato' in df.columns else df
-            sumas_candidato = {}
-            
-            for col in cols_variable:
-                if col in df_candidato.columns:
-                    suma = df_candidato[col].sum()
-                    if suma > 0:
-                        if '__' in col:
-                            variable = col.split('__')[0].replace('_', ' ').title()
-                            categoria = col.split('__')[1].replace('_', ' ').title()
-                            nombre_completo = f"{variable} - {categoria}"
-                        else:
-                            nombre_completo = col
-                        sumas_candidato[nombre_completo] = suma
-            
-            # Crear DataFrame para este candidato
-            if sumas_candidato:
-                df_cand = pd.DataFrame(list(sumas_candidato.items()), columns=['Categoría', f'{candidato}'])
-                df_cand = df_cand.sort_values(f'{candidato}', ascending=False)
-                resultados[candidato] = df_cand
+        # Conteos por candidato: del cubo precalculado o en una sola pasada sobre df
+        if conteos is None:
+            conteos = contar_por_candidato(df, cols_variable)
+        tabla_conteos = conteos['conteos']
+        tabla_conteos = tabla_conteos[[col for col in cols_variable if col in tabla_conteos.columns]]
+        total_publicaciones = int(conteos['publicaciones'].sum())
+        
+        # Candidatos en orden de aparición
+        candidatos = list(tabla_conteos.index)
         
         # Calcular totales generales
-        sumas_total = {}
-        for col in cols_variable:
-            if col in df.columns:
-                suma = df[col].sum()
-                if suma > 0:
-                    if '__' in col:
-                        variable = col.split('__')[0].replace('_', ' ').title()
-                        categoria = col.split('__')[1].replace('_', ' ').title()
-                        nombre_completo = f"{variable} - {categoria}"
-                    else:
-                        nombre_completo = col
-                    sumas_total[nombre_completo] = suma
+        totales = tabla_conteos.sum(axis=0)
+        totales = totales[totales > 0]
+        
+        nombres_categorias = []
+        for col in totales.index:
+            if '__' in col:
+                variable = col.split('__')[0].replace('_', ' ').title()
+                categoria = col.split('__')[1].replace('_', ' ').title()
+                nombres_categorias.append(f"{variable} - {categoria}")
+            else:
+                nombres_categorias.append(col)
         
         # Crear DataFrame consolidado
-        if sumas_total:
+        if len(totales) > 0:
             # Comenzar con totales
-            df_consolidado = pd.DataFrame(list(sumas_total.items()), columns=['Categoría', 'Total'])
+            df_consolidado = pd.DataFrame({'Categoría': nombres_categorias, 'Total': totales.to_numpy()})
             df_consolidado = df_consolidado.sort_values('Total', ascending=False).head(n_top)
             
-            # Agregar columnas por candidato
-            for candidato in candidatos:
-                df_consolidado[candidato] = 0
-                if candidato in resultados:
-                    df_cand = resultados[candidato]
-                    for idx, row in df_consolidado.iterrows():
-                        categoria = row['Categoría']
-                        match = df_cand[df_cand['Categoría'] == categoria]
-                        if not match.empty:
-                            df_consolidado.at[idx, candidato] = match.iloc[0][candidato]
+            # Agregar columnas por candidato (lectura directa de la tabla de conteos)
+            tabla_top = tabla_conteos[totales.index[df_consolidado.index]].to_numpy()
+            for i, candidato in enumerate(candidatos):
+                df_consolidado[candidato] = tabla_top[i]
             
             # Calcular porcentajes
-            total_general = df_consolidado['Total'].sum()
-            df_consolidado['Porcentaje'] = (df_consolidado['Total'] / len(df) * 100).round(2)
+            df_consolidado['Porcentaje'] = (df_consolidado['Total'] / total_publicaciones * 100).round(2)
             
             # Resetear índice y empezar en 1
             df_consolidado = df_consolidado.reset_index(drop=True)
@@ -330,6 +311,7 @@ def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=No
         st.error(f"Error al crear ranking por candidato: {e}")
         return pd.DataFrame()
 
+@instrumentar()
 def crear_tabla_cruzada(df, var1, var2, formato_apa=False):
     """Crea una tabla cruzada entre dos variables"""
     try:
@@ -356,25 +338,27 @@ def crear_tabla_cruzada(df, var1, var2, formato_apa=False):
         st.error(f"Error al crear tabla cruzada: {e}")
         return None, None, None, None
 
+@instrumentar()
 def exportar_a_excel(dataframes_dict, nombre_archivo):
-    """Exporta múltiples DataFrames a un archivo Excel"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for sheet_name, df in dataframes_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # Límite de 31 caracteres para nombres de hojas
-    
-    output.seek(0)
-    return output
+    """Exporta múltiples DataFrames a un archivo Excel (hojas de solo escritura, ver exportacion.py)"""
+    return exportar_tablas(dataframes_dict, 'xlsx')
+
+@instrumentar()
+def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, formato_apa=False, motor=None,
+                                frecuencia='diaria', medida='usos', estrategias=None, por_candidato=False):
+    """
+    Análisis de evolución temporal de estrategias
 
-def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
-    """Análisis de evolución temporal de estrategias"""
+    motor (series_temporales.construir_motor_temporal) tiene ya las series de todas
+    las estrategias y candidatos en cada frecuencia; sin él se construye desde df.
+    Sin estrategias indicadas se siguen las estrategias clave (hasta 6).
+    """
     if 'Fecha_convertida' not in df.columns:
         return None, []
     
-    df_temporal = df.dropna(subset=['Fecha_convertida'])
-    
-    if variable_seleccionada and variable_seleccionada != "Todas las variables":
+    if estrategias:
+        estrategias_clave = [col for col in estrategias if col in dummy_cols]
+    elif variable_seleccionada and variable_seleccionada != "Todas las variables":
         # Filtrar columnas de la variable seleccionada
         estrategias_clave = [col for col in dummy_cols if col.split('__')[0] == variable_seleccionada][:6]
     else:
@@ -387,12 +371,15 @@ def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, form
     if not estrategias_clave:
         return None, []
     
-    # Agrupar por fecha
-    df_agrupado = df_temporal.groupby('Fecha_convertida')[estrategias_clave].sum().reset_index()
+    # Recorte del motor (periodo × candidato × estrategia) para la frecuencia y medida elegidas
+    if motor is None:
+        motor = construir_motor_temporal_df(df, dummy_cols)
+    df_agrupado = tabla_temporal(motor, estrategias_clave, frecuencia, medida, por_candidato=por_candidato)
     
-    return df_agrupado, estrategias_clave
+    return df_agrupado, list(df_agrupado.columns[1:])
 
-def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, formato_apa=False, conteos=None):
     """Análisis de técnicas de propaganda por candidato"""
     if variable_seleccionada and variable_seleccionada != "Todas las variables":
         propaganda_cols = [col for col in dummy_cols if col.split('__')[0] == variable_seleccionada]
@@ -402,34 +389,26 @@ def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, f
     if not propaganda_cols or 'Candidato' not in df.columns:
         return None
     
-    candidatos = df['Candidato'].unique()
-    datos_propaganda = []
+    # Conteos y porcentajes por candidato en formato largo (del cubo precalculado o de df)
+    largo = agregar_indicadores(df, propaganda_cols, conteos=conteos)
     
-    for candidato in candidatos:
-        df_cand = df[df['Candidato'] == candidato]
-        total_posts = len(df_cand)
-        
-        for col in propaganda_cols:
-            if col in df.columns:
-                usos = df_cand[col].sum()
-                porcentaje = (usos / total_posts) * 100 if total_posts > 0 else 0
-                
-                if '__' in col:
-                    variable = col.split('__')[0].replace('_', ' ').title()
-                    tecnica = col.split('__')[1].replace('_', ' ').title()
-                    nombre_completo = f"{variable} - {tecnica}"
-                else:
-                    nombre_completo = col
-                
-                datos_propaganda.append({
-                    'Candidato': candidato,
-                    'Técnica': nombre_completo,
-                    'Usos': usos,
-                    'Porcentaje': porcentaje
-                })
-    
-    return pd.DataFrame(datos_propaganda)
+    nombres_tecnica = {}
+    for col in propaganda_cols:
+        if '__' in col:
+            variable = col.split('__')[0].replace('_', ' ').title()
+            tecnica = col.split('__')[1].replace('_', ' ').title()
+            nombres_tecnica[col] = f"{variable} - {tecnica}"
+        else:
+            nombres_tecnica[col] = col
+    
+    return pd.DataFrame({
+        'Candidato': largo['Candidato'],
+        'Técnica': largo['Columna'].map(nombres_tecnica),
+        'Usos': largo['Usos'],
+        'Porcentaje': largo['Porcentaje']
+    })
 
+@instrumentar()
 def analisis_plain_folks(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
     """Análisis detallado de la estrategia Plain-folks"""
     if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -440,30 +419,22 @@ def analisis_plain_folks(df, dummy_cols, variable_seleccionada=None, formato_apa
     if not plain_folks_cols:
         return None
     
-    # Filtrar posts que usan Plain-folks
-    df_plain = df[df[plain_folks_cols].sum(axis=1) > 0].copy()
+    # Indicador de posts que usan Plain-folks (alguna de sus columnas)
+    usa_plain = pd.DataFrame({'plain_folks': (df[plain_folks_cols].sum(axis=1) > 0).to_numpy()})
     
     resultados = {}
     
     # Por candidato
-    if 'Candidato' in df.columns and len(df_plain) > 0:
-        candidatos_stats = []
-        for candidato in df['Candidato'].unique():
-            df_cand = df[df['Candidato'] == candidato]
-            df_plain_cand = df_plain[df_plain['Candidato'] == candidato]
-            
-            total_posts = len(df_cand)
-            plain_posts = len(df_plain_cand)
-            porcentaje = (plain_posts / total_posts) * 100 if total_posts > 0 else 0
-            
-            candidatos_stats.append({
-                'Candidato': candidato,
-                'Total_Posts': total_posts,
-                'Plain_Folks_Posts': plain_posts,
-                'Porcentaje': porcentaje
-            })
-        
-        resultados['candidatos'] = pd.DataFrame(candidatos_stats)
+    if 'Candidato' in df.columns and usa_plain['plain_folks'].any():
+        usa_plain['Candidato'] = df['Candidato'].to_numpy()
+        largo = agregar_indicadores(usa_plain, ['plain_folks'])
+        
+        resultados['candidatos'] = pd.DataFrame({
+            'Candidato': largo['Candidato'],
+            'Total_Posts': largo['Publicaciones'],
+            'Plain_Folks_Posts': largo['Usos'],
+            'Porcentaje': largo['Porcentaje']
+        })
     
     return resultados
 
@@ -471,7 +442,8 @@ def analisis_plain_folks(df, dummy_cols, variable_seleccionada=None, formato_apa
 # NUEVAS FUNCIONES DE ANÁLISIS AVANZADO
 # =====================================================
 
-def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis detallado de Plain-folks según contexto y campaña"""
     resultados = {}
     
@@ -482,28 +454,26 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
         return None
     
     # Análisis por contexto y candidato
-    if 'Contexto_de_la_imagen' in df.columns and 'Candidato' in df.columns:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
-        candidatos = df['Candidato'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns and 'Candidato' in df.columns:
+        # Bitmaps por contexto, candidato y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, plain_folks_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
+        candidatos, bitmaps_candidato = valores_presentes(indice, 'Candidato')
         
         # Crear tabla de Plain-folks por contexto y candidato
         tabla_contexto = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Calcular totales por candidato
-            for candidato in candidatos:
-                df_cand_contexto = df_contexto[df_contexto['Candidato'] == candidato]
+            for candidato, bitmap_candidato in zip(candidatos, bitmaps_candidato):
+                filas_cand_contexto = bitmap_contexto & bitmap_candidato
+                total_publicaciones = int(contar_bits(filas_cand_contexto))
                 
-                if len(df_cand_contexto) > 0:
+                if total_publicaciones > 0:
                     # Contar publicaciones con Plain-folks
-                    plain_folks_count = 0
-                    for col in plain_folks_cols:
-                        if col in df_cand_contexto.columns:
-                            plain_folks_count += df_cand_contexto[col].sum()
+                    plain_folks_count = contar_dummies(indice, filas_cand_contexto, plain_folks_cols).sum()
                     
-                    total_publicaciones = len(df_cand_contexto)
                     porcentaje = (plain_folks_count / total_publicaciones * 100) if total_publicaciones > 0 else 0
                     
                     tabla_contexto.append({
@@ -528,7 +498,8 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
                     ]
                     
                     for _, row in datos_contexto.iterrows():
-                        if candidato in row[f'{candidato}: publicaciones con Plain-folks (%)']:
+                        # Solo las filas de este candidato tienen valor en su columna (NaN en las demás)
+                        if pd.notna(row[f'{candidato}: publicaciones con Plain-folks (%)']):
                             fila[f'{candidato}: publicaciones con Plain-folks (%)'] = row[f'{candidato}: publicaciones con Plain-folks (%)']
                 
                 tabla_pivot.append(fila)
@@ -537,7 +508,8 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
     
     return resultados
 
-def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=None, formato_apa=False, conteos=None):
     """Análisis de distribución general de recursos de propaganda según IPA"""
     resultados = {}
     
@@ -548,25 +520,24 @@ def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=N
     ]
     
     if 'Candidato' in df.columns:
-        candidatos = df['Candidato'].dropna().unique()
+        # Conteos por candidato en formato largo (del cubo precalculado o de df)
+        largo = agregar_indicadores(df, dummy_cols, conteos=conteos)
+        largo = largo[largo['Candidato'].notna()]
+        publicaciones = largo.drop_duplicates('Candidato').set_index('Candidato')['Publicaciones']
+        candidatos = list(publicaciones.index)
         
         tabla_recursos = []
         
         for i, recurso in enumerate(recursos_ipa, 1):
             fila = {'Recurso de propaganda (IPA)': f"{i}. {recurso.replace('_', '-').title()}"}
             
+            # Usos de las columnas que contienen este recurso, sumados por candidato
+            es_recurso = largo['Columna'].str.lower().str.contains(recurso.lower(), regex=False)
+            totales = largo[es_recurso].groupby('Candidato', sort=False)['Usos'].sum()
+            
             for candidato in candidatos:
-                df_candidato = df[df['Candidato'] == candidato]
-                
-                # Buscar columnas que contengan este recurso
-                recurso_cols = [col for col in dummy_cols if recurso.lower() in col.lower()]
-                
-                total_recurso = 0
-                for col in recurso_cols:
-                    if col in df_candidato.columns:
-                        total_recurso += df_candidato[col].sum()
-                
-                total_publicaciones = len(df_candidato)
+                total_recurso = totales.get(candidato, 0)
+                total_publicaciones = publicaciones[candidato]
                 porcentaje = (total_recurso / total_publicaciones * 100) if total_publicaciones > 0 else 0
                 
                 fila[f'{candidato}: Nº de publicaciones'] = total_recurso
@@ -578,13 +549,17 @@ def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=N
     
     return resultados
 
-def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis de cruce entre reglas de propaganda y contexto de imagen"""
     resultados = {}
     
     # Buscar variables de reglas dominantes y contexto
-    if 'Contexto_de_la_imagen' in df.columns:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns:
+        # Bitmaps por contexto, candidato y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, dummy_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
         
         # Buscar columnas de reglas de propaganda
         reglas_cols = [col for col in dummy_cols if any(regla in col.lower() for regla in 
@@ -592,28 +567,26 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
         
         tabla_cruce = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Encontrar la regla dominante en este contexto
             regla_dominante = None
             max_count = 0
             
-            for col in reglas_cols:
-                if col in df_contexto.columns:
-                    count = df_contexto[col].sum()
-                    if count > max_count:
-                        max_count = count
-                        regla_dominante = col.split('__')[-1] if '__' in col else col
+            for col, count in contar_dummies(indice, bitmap_contexto, reglas_cols).items():
+                if count > max_count:
+                    max_count = count
+                    regla_dominante = col.split('__')[-1] if '__' in col else col
             
             # Determinar campaña dominante
             campana_dominante = "Votantes"  # Por defecto
             candidato_dominante = "Ambos"
             
-            if 'Candidato' in df_contexto.columns:
-                candidatos_count = df_contexto['Candidato'].value_counts()
-                if len(candidatos_count) > 0:
-                    candidato_dominante = candidatos_count.index[0]
+            if 'Candidato' in df.columns:
+                # Publicaciones por candidato en el contexto (mismo orden que value_counts)
+                candidatos, bitmaps_candidato = valores_presentes(indice, 'Candidato', bitmap_contexto)
+                if len(candidatos) > 0:
+                    candidatos_count = pd.Series(contar_bits(bitmaps_candidato), index=candidatos)
+                    candidato_dominante = candidatos_count.sort_values(ascending=False).index[0]
             
             # Mapear contexto a campaña
             if 'personal' in contexto.lower():
@@ -626,7 +599,7 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
             tabla_cruce.append({
                 'Contexto de la imagen': contexto,
                 'Regla dominante (Domenach)': regla_dominante.replace('_', ' ').title() if regla_dominante else "N/A",
-                'Nº publicaciones': len(df_contexto),
+                'Nº publicaciones': int(contar_bits(bitmap_contexto)),
                 'Candidato dominante': candidato_dominante
             })
         
@@ -634,21 +607,23 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
     
     return resultados
 
-def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis de aparición del líder según contexto y campaña"""
     resultados = {}
     
     # Buscar columnas relacionadas con aparición del líder
     aparicion_cols = [col for col in dummy_cols if 'aparicion' in col.lower() or 'lider' in col.lower() or 'acompañado' in col.lower()]
     
-    if 'Contexto_de_la_imagen' in df.columns and aparicion_cols:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns and aparicion_cols:
+        # Bitmaps por contexto y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, aparicion_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
         
         tabla_aparicion = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Determinar si va acompañado
             acompanado = "Ninguno"
             if 'personal' in contexto.lower():
@@ -657,12 +632,8 @@ def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato
                 acompanado = "Votantes"
             
             # Calcular presencia del líder
-            presencia_lider = 0
-            total_publicaciones = len(df_contexto)
-            
-            for col in aparicion_cols:
-                if col in df_contexto.columns:
-                    presencia_lider += df_contexto[col].sum()
+            total_publicaciones = int(contar_bits(bitmap_contexto))
+            presencia_lider = contar_dummies(indice, bitmap_contexto, aparicion_cols).sum()
             
             porcentaje_presencia = (presencia_lider / total_publicaciones * 100) if total_publicaciones > 0 else 0
             
@@ -677,6 +648,7 @@ def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato
     
     return resultados
 
+@instrumentar()
 def generar_tabla_contingencia_avanzada(df, var1, var2, incluir_porcentajes=True):
     """Genera tabla de contingencia avanzada con múltiples estadísticos"""
     try:
@@ -884,33 +856,16 @@ def mostrar_tabla_con_formato(df, titulo, formato_apa=False):
         st.subheader(titulo)
         st.dataframe(df, use_container_width=True)
 
-@st.cache_data
-def cargar_datos():
-    """Carga y procesa los datos del archivo Excel"""
+@st.cache_data(max_entries=1)
+def cargar_datos(firma_datos=None):
+    """Carga y procesa los datos del archivo Excel (o del almacén incremental)"""
+    anotar_calculo()
     try:
-        df = pd.read_excel("recodificado.xlsx")
+        df = cargar_recodificado()
         
         # Procesar fechas
         if 'Fecha' in df.columns:
-            meses = {
-                'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-                'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-            }
-            
-            def convertir_fecha(fecha_str):
-                try:
-                    if pd.isna(fecha_str):
-                        return None
-                    partes = str(fecha_str).lower().strip().split(' de ')
-                    if len(partes) == 2:
-                        dia = int(partes[0])
-                        mes = meses.get(partes[1], 1)
-                        return datetime(2025, mes, dia)
-                except:
-                    pass
-                return None
-            
-            df['Fecha_convertida'] = df['Fecha'].apply(convertir_fecha)
+            df['Fecha_convertida'] = convertir_fechas(df['Fecha'])
         
         # Identificar columnas dummy
         dummy_cols = [col for col in df.columns if '__' in col]
@@ -920,7 +875,492 @@ def cargar_datos():
         st.error(f"Error al cargar datos: {e}")
         return None, []
 
-def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False):
+@st.cache_resource(max_entries=1)
+def cargar_cubo_conteos(firma_datos=None):
+    """
+    Precalcula una sola vez el cubo candidato × fecha × categoría del dataset completo,
+    con sus sumas acumuladas por día (rangos de fechas en O(1))
+    """
+    anotar_calculo()
+    # Con el almacén incremental, el cubo ya se mantiene actualizado en cada ingesta
+    cubo = cargar_cubo_almacen() if almacen_vigente() else None
+    if cubo is None:
+        df, dummy_cols = cargar_datos(firma_datos)
+        if df is None:
+            return None
+        cubo = construir_cubo_conteos(df, dummy_cols)
+    return anadir_sumas_acumuladas(cubo)
+
+@st.cache_resource(max_entries=1)
+def cargar_indice_bitmap(firma_datos=None):
+    """Construye una sola vez los bitmaps por candidato, contexto, día y columna dummy"""
+    anotar_calculo()
+    df, dummy_cols = cargar_datos(firma_datos)
+    if df is None:
+        return None
+    return construir_indice_bitmap(df, dummy_cols)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _calcular_seccion_memorizada(nombre, clave, _funcion, _args=(), _kwargs=None):
+    anotar_calculo()
+    # Las filas filtradas solo se copian cuando la sección se calcula de verdad
+    _args = [arg.materializar() if isinstance(arg, FilasFiltradas) else arg for arg in _args]
+    return _funcion(*_args, **(_kwargs or {}))
+
+def calcular_seccion(nombre, clave, _funcion, _args=(), _kwargs=None):
+    """
+    Resultado de una sección del panel, memorizado por selección y controles
+
+    La clave combina la selección de la barra lateral (clave_seleccion) con los
+    controles propios de la sección; los datos (_args) no se hashean. Cada
+    llamada queda en el registro de rendimiento como acierto o fallo de caché.
+    Los argumentos FilasFiltradas se materializan solo en los fallos de caché.
+    """
+    with medir(f"sección {nombre}", cache=True) as medicion:
+        resultado = _calcular_seccion_memorizada(nombre, clave, _funcion, _args, _kwargs)
+        medicion['filas'] = len(_args[0]) if _args and hasattr(_args[0], 'shape') else None
+    return resultado
+
+class SeccionPanel:
+    """Contenedor de una sección del panel; las secciones no elegidas no dibujan nada"""
+    def __init__(self, abierta):
+        self.abierta = abierta
+        self.contenedor = st.container() if abierta else None
+
+    def __enter__(self):
+        return self.contenedor.__enter__() if self.abierta else self
+
+    def __exit__(self, *excepcion):
+        return self.contenedor.__exit__(*excepcion) if self.abierta else False
+
+def crear_pestanas_secciones(titulos, clave):
+    """
+    Selector de las secciones del panel: solo se dibuja y calcula la sección elegida
+
+    Un selector horizontal (st.radio) en lugar de st.tabs, que dibuja y calcula
+    todas las pestañas en cada ejecución; la sección elegida se guarda en
+    st.session_state[clave].
+    """
+    seleccion = st.radio("Sección:", titulos, key=clave, horizontal=True, label_visibility="collapsed")
+    return [SeccionPanel(titulo == seleccion) for titulo in titulos]
+
+def seccion_abierta(pestana):
+    return pestana.abierta
+
+def conservar_estado_widgets(claves):
+    """Mantiene el valor de los controles de las secciones no elegidas (Streamlit descarta el estado de los widgets no dibujados)"""
+    for clave in claves:
+        if clave in st.session_state:
+            st.session_state[clave] = st.session_state[clave]
+
+def mostrar_panel_rendimiento(ejecucion):
+    """Panel "Rendimiento" de la barra lateral con las mediciones de esta ejecución"""
+    st.sidebar.markdown("---")
+    activo = st.sidebar.checkbox(
+        "⏱️ Medir rendimiento",
+        key="medir_rendimiento",
+        help="Tiempo, filas, caché y pico de memoria de cada sección (diagnóstico: ralentiza la aplicación "
+             "mientras está activo); se añade a " + ARCHIVO_LOG_RENDIMIENTO
+    )
+    if not activo or ejecucion is None:
+        return
+    guardar_ejecucion(ejecucion)
+    resumen = resumen_ejecucion(ejecucion)
+    with st.sidebar.expander("⏱️ Rendimiento", expanded=True):
+        col1, col2 = st.columns(2)
+        col1.metric("Ejecución", f"{resumen['duracion'] * 1000:.0f} ms")
+        col2.metric("Caché", f"{resumen['aciertos_cache']} / {resumen['aciertos_cache'] + resumen['fallos_cache']}")
+        if resumen['memoria_pico'] is not None:
+            st.caption(f"Pico de memoria de la ejecución: {resumen['memoria_pico'] / 2**20:.1f} MB")
+        if not ejecucion['mediciones']:
+            st.caption("Sin secciones medidas en esta ejecución")
+            return
+        tabla = pd.DataFrame(ejecucion['mediciones'])
+        st.dataframe(pd.DataFrame({
+            'Sección': tabla['nombre'],
+            'ms': (tabla['tiempo'] * 1000).round(1),
+            'Filas': tabla['filas'],
+            'Caché': tabla['cache'],
+            'Pico de memoria (MB)': (pd.to_numeric(tabla['memoria_pico']) / 2**20).round(2)
+        }).sort_values('ms', ascending=False), hide_index=True)
+
+def etiqueta_columnas(columnas):
+    """Nombre legible 'Variable - Categoría' de una o varias columnas dummy"""
+    return " + ".join(
+        f"{c.split('__')[0].replace('_', ' ').title()} - {c.split('__')[1].replace('_', ' ').title()}"
+        if '__' in c else c for c in columnas)
+
+def etiqueta_serie(columna):
+    """Nombre de una serie temporal: la categoría, precedida del candidato si la serie es por candidato"""
+    candidato, _, estrategia = columna.rpartition(' · ')
+    nombre = estrategia.split('__')[1].replace('_', ' ').title() if '__' in estrategia else estrategia
+    return f"{candidato} · {nombre}" if candidato else nombre
+
+# =====================================================
+# FIGURAS DEL PANEL (TAMBIÉN SE EXPORTAN AL DOCX)
+# =====================================================
+
+def figura_ranking(df_top, titulo_ranking, mostrar_por_candidato, altura=500):
+    """Barras horizontales de las 10 categorías más usadas"""
+    fig = px.bar(
+        df_top.head(10),
+        x='Total' if mostrar_por_candidato else 'Frecuencia',
+        y='Categoría',
+        orientation='h',
+        title=titulo_ranking,
+        labels={'Total': 'Número de Usos Total', 'Frecuencia': 'Número de Usos', 'Categoría': 'Categoría'},
+        height=altura
+    )
+    
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        xaxis_title="Número de Usos",
+        yaxis_title="",
+        title_x=0.5,
+        margin=dict(l=200, r=50, t=80, b=50)  # Más margen izquierdo para etiquetas largas
+    )
+    # Mejorar legibilidad de etiquetas
+    fig.update_yaxes(tickfont=dict(size=10))
+    fig.update_xaxes(tickfont=dict(size=12))
+    return fig
+
+def figura_temporal(df_temporal, estrategias_clave, titulo_temporal, altura=500, titulo_eje_y="Número de Usos"):
+    """Líneas por periodo (día, semana o fase: primera columna) de las estrategias seleccionadas"""
+    fig = go.Figure()
+    
+    for estrategia in estrategias_clave:
+        if estrategia in df_temporal.columns:
+            fig.add_trace(go.Scatter(
+                x=df_temporal.iloc[:, 0],
+                y=df_temporal[estrategia],
+                mode='lines+markers',
+                name=etiqueta_serie(estrategia),
+                line=dict(width=3),
+                marker=dict(size=8)
+            ))
+    
+    fig.update_layout(
+        title=titulo_temporal,
+        xaxis_title="Fecha" if df_temporal.columns[0] == 'Fecha_convertida' else df_temporal.columns[0],
+        yaxis_title=titulo_eje_y,
+        height=altura,
+        hovermode='x unified',
+        title_x=0.5,
+        margin=dict(l=50, r=50, t=80, b=50),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+def figura_heatmap(tabla_pct, altura=500):
+    """Heatmap de porcentajes de la tabla cruzada (sin márgenes)"""
+    fig = px.imshow(
+        tabla_pct.iloc[:-1, :-1],  # Excluir márgenes
+        labels=dict(x="Variable 2", y="Variable 1", color="Porcentaje"),
+        title="Heatmap de Porcentajes",
+        height=altura
+    )
+    fig.update_layout(
+        title_x=0.5,
+        margin=dict(l=150, r=50, t=80, b=50)
+    )
+    return fig
+
+def figura_propaganda(datos_propaganda, altura=500):
+    """Barras de uso de técnicas de propaganda por candidato"""
+    fig = px.bar(
+        datos_propaganda,
+        x='Candidato',
+        y='Porcentaje',
+        color='Técnica',
+        title="Uso de Técnicas por Candidato (%)",
+        labels={'Porcentaje': 'Porcentaje de Posts (%)'},
+        height=altura
+    )
+    fig.update_layout(
+        title_x=0.5,
+        margin=dict(l=50, r=50, t=80, b=100),
+        xaxis_tickangle=-45
+    )
+    return fig
+
+# =====================================================
+# BLOQUES CON RECARGA PROPIA (FRAGMENTOS)
+# =====================================================
+# Los controles de tamaño y pantalla completa solo vuelven a ejecutar su bloque:
+# los datos llegan ya calculados (caché por sección) y no se recalcula nada más
+
+@st.fragment
+def mostrar_graficos_ranking(df_top, titulo_ranking, mostrar_por_candidato, hay_candidatos):
+    """Gráficos del ranking con su selector de tamaño (solo se recarga este bloque)"""
+    col_grafico1, col_grafico2 = st.columns([4, 1])
+    
+    with col_grafico2:
+        tamaño_grafico = st.selectbox(
+            "📏 Tamaño del gráfico:",
+            ["Normal", "Grande", "Extra Grande"],
+            index=0,
+            help="Selecciona el tamaño del gráfico para mejor visualización",
+            key="ranking_size"
+        )
+    
+        # Determinar altura según selección
+        altura_grafico = {
+            "Normal": 500,
+            "Grande": 700,
+            "Extra Grande": 900
+        }[tamaño_grafico]
+    
+    with col_grafico1:
+        fig = figura_ranking(df_top, titulo_ranking, mostrar_por_candidato, altura_grafico)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col_grafico2:
+        if st.button("🔍 Ver en pantalla completa", use_container_width=True):
+            # Crear gráfico en pantalla completa
+            fig_full = px.bar(
+                df_top,
+                x='Total' if mostrar_por_candidato else 'Frecuencia',
+                y='Categoría',
+                orientation='h',
+                title=f"{titulo_ranking} - Vista Expandida",
+                labels={'Total': 'Número de Usos Total', 'Frecuencia': 'Número de Usos', 'Categoría': 'Categoría'},
+                height=max(800, len(df_top) * 40)  # Altura dinámica según número de categorías
+            )
+            fig_full.update_layout(
+                yaxis={'categoryorder': 'total ascending'},
+                xaxis_title="Número de Usos",
+                yaxis_title="",
+                title_x=0.5,
+                margin=dict(l=300, r=50, t=100, b=50),  # Márgenes amplios
+                font=dict(size=14)  # Fuente más grande
+            )
+    
+            st.plotly_chart(fig_full, use_container_width=True)
+    
+    # Si se muestra por candidato, agregar gráfico de barras apiladas
+    if mostrar_por_candidato and hay_candidatos:
+        st.markdown("### 📊 Distribución por Candidato")
+    
+        # Preparar datos para gráfico apilado
+        candidatos = [col for col in df_top.columns if col not in ['Categoría', 'Total', 'Porcentaje']]
+    
+        if len(candidatos) > 0:
+            fig_stack = go.Figure()
+    
+            for candidato in candidatos:
+                fig_stack.add_trace(go.Bar(
+                    name=candidato,
+                    x=df_top['Categoría'][:10],  # Solo top 10 para legibilidad
+                    y=df_top[candidato][:10],
+                    text=df_top[candidato][:10],
+                    textposition='inside'
+                ))
+    
+            fig_stack.update_layout(
+                barmode='stack',
+                title="Distribución de Categorías por Candidato",
+                xaxis_title="Categorías",
+                yaxis_title="Número de Usos",
+                height=altura_grafico,
+                xaxis_tickangle=-45,
+                margin=dict(l=50, r=50, t=80, b=150)  # Margen inferior para etiquetas rotadas
+            )
+    
+            st.plotly_chart(fig_stack, use_container_width=True)
+
+@st.fragment
+def mostrar_grafico_temporal(df_temporal, estrategias_clave, titulo_temporal, titulo_eje_y="Número de Usos"):
+    """Gráfico de evolución temporal con su selector de tamaño (solo se recarga este bloque)"""
+    col_temp1, col_temp2 = st.columns([3, 1])
+    
+    with col_temp2:
+        tamaño_temporal = st.selectbox(
+            "📏 Tamaño del gráfico temporal:",
+            ["Normal", "Grande", "Extra Grande"],
+            index=0,
+            key="temporal_size"
+        )
+    
+        altura_temporal = {
+            "Normal": 500,
+            "Grande": 700,
+            "Extra Grande": 900
+        }[tamaño_temporal]
+    
+    with col_temp1:
+        # Gráfico de líneas interactivo
+        fig = figura_temporal(df_temporal, estrategias_clave, titulo_temporal, altura_temporal, titulo_eje_y)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Botón para vista expandida
+    if st.button("🔍 Ver evolución temporal en pantalla completa", key="temp_full"):
+        fig_full_temp = go.Figure()
+    
+        for estrategia in estrategias_clave:
+            if estrategia in df_temporal.columns:
+                fig_full_temp.add_trace(go.Scatter(
+                    x=df_temporal.iloc[:, 0],
+                    y=df_temporal[estrategia],
+                    mode='lines+markers',
+                    name=etiqueta_serie(estrategia),
+                    line=dict(width=4),
+                    marker=dict(size=10)
+                ))
+    
+        fig_full_temp.update_layout(
+            title=f"{titulo_temporal} - Vista Expandida",
+            xaxis_title="Fecha" if df_temporal.columns[0] == 'Fecha_convertida' else df_temporal.columns[0],
+            yaxis_title=titulo_eje_y,
+            height=800,
+            hovermode='x unified',
+            title_x=0.5,
+            font=dict(size=14),
+            margin=dict(l=80, r=80, t=100, b=80)                )
+    
+        st.plotly_chart(fig_full_temp, use_container_width=True)
+
+@st.fragment
+def mostrar_heatmap_cruce(tabla_pct):
+    """Heatmap de la tabla cruzada con su selector de tamaño (solo se recarga este bloque)"""
+    # Configuración del heatmap
+    col_heat1, col_heat2 = st.columns([3, 1])
+    
+    with col_heat2:
+        tamaño_heatmap = st.selectbox(
+            "📏 Tamaño del heatmap:",
+            ["Normal", "Grande", "Extra Grande"],
+            index=0,
+            key="heatmap_size"
+        )
+    
+        altura_heatmap = {
+            "Normal": 500,
+            "Grande": 700,
+            "Extra Grande": 900
+        }[tamaño_heatmap]
+    
+    with col_heat1:
+        fig = figura_heatmap(tabla_pct, altura_heatmap)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Botón para vista expandida del heatmap
+    if st.button("🔍 Ver heatmap en pantalla completa", key="heat_full"):
+        fig_heat_full = px.imshow(
+            tabla_pct.iloc[:-1, :-1],
+            labels=dict(x="Variable 2", y="Variable 1", color="Porcentaje"),
+            title="Heatmap de Porcentajes - Vista Expandida",
+            height=800
+        )
+        fig_heat_full.update_layout(
+            title_x=0.5,
+            font=dict(size=14),
+            margin=dict(l=200, r=100, t=100, b=100)
+        )
+        st.plotly_chart(fig_heat_full, use_container_width=True)
+
+@st.fragment
+def mostrar_grafico_propaganda(datos_propaganda):
+    """Gráfico de técnicas por candidato con su selector de tamaño (solo se recarga este bloque)"""
+    tamaño_propaganda = st.selectbox(
+        "📏 Tamaño del gráfico:",
+        ["Normal", "Grande", "Extra Grande"],
+        index=0,
+        key="prop_size"
+    )
+    
+    altura_propaganda = {
+        "Normal": 500,
+        "Grande": 700,
+        "Extra Grande": 900
+    }[tamaño_propaganda]
+    
+    # Gráfico por candidato
+    fig = figura_propaganda(datos_propaganda, altura_propaganda)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Botón para vista expandida
+    if st.button("🔍 Ver análisis de propaganda en pantalla completa", key="prop_full"):
+        fig_prop_full = px.bar(
+            datos_propaganda,
+            x='Candidato',
+            y='Porcentaje',
+            color='Técnica',
+            title="Uso de Técnicas por Candidato (%) - Vista Expandida",
+            labels={'Porcentaje': 'Porcentaje de Posts (%)'},
+            height=800
+        )
+        fig_prop_full.update_layout(
+            title_x=0.5,
+            font=dict(size=14),
+            margin=dict(l=80, r=80, t=100, b=120),
+            xaxis_tickangle=-45
+        )
+        st.plotly_chart(fig_prop_full, use_container_width=True)
+
+@st.fragment
+def mostrar_tabla_dimensionable(df, encabezado, titulo_apa, formato_apa, clave):
+    """Tabla con selector de tamaño propio (solo se recarga este bloque)"""
+    col_size, _ = st.columns([3, 1])
+    
+    with col_size:
+        tamano_tabla = st.selectbox(
+            "📏 Tamaño de tabla:",
+            ["Normal", "Compacta", "Expandida"],
+            key=clave
+        )
+    
+    # Mostrar tabla
+    st.markdown(f"### {encabezado}")
+    
+    if formato_apa:
+        tabla_apa = aplicar_formato_apa_dataframe(df, titulo_apa)
+        st.markdown(tabla_apa, unsafe_allow_html=True)
+    else:
+        if tamano_tabla == "Compacta":
+            st.dataframe(df, use_container_width=True, height=300)
+        elif tamano_tabla == "Expandida":
+            st.dataframe(df, use_container_width=True, height=600)
+        else:
+            st.dataframe(df, use_container_width=True)
+
+@st.fragment
+def mostrar_grafico_dimensionable(fig, alturas, indice_altura, clave_altura, clave_completa):
+    """Gráfico Plotly con selector de altura y modo pantalla completa (solo se recarga este bloque)"""
+    col_graf, col_config = st.columns([4, 1])
+    
+    with col_config:
+        altura_graf = st.selectbox(
+            "📐 Altura del gráfico:",
+            alturas,
+            index=indice_altura,
+            key=clave_altura
+        )
+        
+        pantalla_completa = st.checkbox(
+            "🖥️ Modo pantalla completa",
+            key=clave_completa
+        )
+    
+    with col_graf:
+        fig.update_layout(height=altura_graf)
+        
+        if pantalla_completa:
+            st.plotly_chart(fig, use_container_width=True, height=altura_graf, config={
+                'displayModeBar': True,
+                'displaylogo': False,
+                'modeBarButtonsToAdd': ['pan2d', 'select2d', 'lasso2d', 'autoScale2d', 'resetScale2d']
+            })
+        else:
+            st.plotly_chart(fig, use_container_width=True)
+
+@instrumentar()
+def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False, conteos=None):
     """Crea ranking de categorías dentro de una variable específica o de todas"""
     try:
         if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -929,19 +1369,24 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
         else:
             cols_variable = dummy_cols
         
+        # Conteos por candidato: del cubo precalculado o en una sola pasada sobre df
+        if conteos is None:
+            conteos = contar_por_candidato(df, cols_variable)
+        tabla_conteos = conteos['conteos']
+        total_publicaciones = int(conteos['publicaciones'].sum())
+        
         # Calcular sumas
+        totales = tabla_conteos[[col for col in cols_variable if col in tabla_conteos.columns]].sum(axis=0)
         sumas = {}
-        for col in cols_variable:
-            if col in df.columns:
-                suma = df[col].sum()
-                if suma > 0:  # Solo incluir categorías con al menos 1 uso
-                    if '__' in col:
-                        variable = col.split('__')[0].replace('_', ' ').title()
-                        categoria = col.split('__')[1].replace('_', ' ').title()
-                        nombre_completo = f"{variable} - {categoria}"
-                    else:
-                        nombre_completo = col
-                    sumas[nombre_completo] = suma
+        for col, suma in totales.items():
+            if suma > 0:  # Solo incluir categorías con al menos 1 uso
+                if '__' in col:
+                    variable = col.split('__')[0].replace('_', ' ').title()
+                    categoria = col.split('__')[1].replace('_', ' ').title()
+                    nombre_completo = f"{variable} - {categoria}"
+                else:
+                    nombre_completo = col
+                sumas[nombre_completo] = suma
         
         # Crear DataFrame y ordenar
         if sumas:
@@ -951,8 +1396,7 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
             df_ranking.index += 1  # Comenzar numeración en 1
             
             # Agregar porcentaje
-            total = df_ranking['Frecuencia'].sum()
-            df_ranking['Porcentaje'] = (df_ranking['Frecuencia'] / len(df) * 100).round(2)
+            df_ranking['Porcentaje'] = (df_ranking['Frecuencia'] / total_publicaciones * 100).round(2)
             
             return df_ranking
         else:
@@ -962,7 +1406,8 @@ def crear_ranking_por_variable(df, dummy_cols, variable_seleccionada=None, n_top
         st.error(f"Error al crear ranking: {e}")
         return pd.DataFrame(columns=['Categoría', 'Frecuencia', 'Porcentaje'])
 
-def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False):
+@instrumentar()
+def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=None, n_top=10, formato_apa=False, conteos=None):
     """Crea ranking de categorías por candidato y total general"""
     try:
         if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -971,69 +1416,42 @@ def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=No
         else:
             cols_variable = dummy_cols
         
-        # Obtener candidatos únicos
-        candidatos = df['Candidato'].unique() if 'Candidato' in df.columns else ['Sin candidato']
-        
-        # Crear diccionario para almacenar resultados
-        resultados = {}
-        
-        # Calcular para cada candidato
-        for candidato in candidatos:
-            df_candidato = df[df['Candidato'] == candidato] if 'Candidato' in df.columns else df
-            sumas_candidato = {}
-            
-            for col in cols_variable:
-                if col in df_candidato.columns:
-                    suma = df_candidato[col].sum()
-                    if suma > 0:
-                        if '__' in col:
-                            variable = col.split('__')[0].replace('_', ' ').title()
-                            categoria = col.split('__')[1].replace('_', ' ').title()
-                            nombre_completo = f"{variable} - {categoria}"
-                        else:
-                            nombre_completo = col
-                        sumas_candidato[nombre_completo] = suma
-            
-            # Crear DataFrame para este candidato
-            if sumas_candidato:
-                df_cand = pd.DataFrame(list(sumas_candidato.items()), columns=['Categoría', f'{candidato}'])
-                df_cand = df_cand.sort_values(f'{candidato}', ascending=False)
-                resultados[candidato] = df_cand
+        # Conteos por candidato: del cubo precalculado o en una sola pasada sobre df
+        if conteos is None:
+            conteos = contar_por_candidato(df, cols_variable)
+        tabla_conteos = conteos['conteos']
+        tabla_conteos = tabla_conteos[[col for col in cols_variable if col in tabla_conteos.columns]]
+        total_publicaciones = int(conteos['publicaciones'].sum())
+        
+        # Candidatos en orden de aparición
+        candidatos = list(tabla_conteos.index)
         
         # Calcular totales generales
-        sumas_total = {}
-        for col in cols_variable:
-            if col in df.columns:
-                suma = df[col].sum()
-                if suma > 0:
-                    if '__' in col:
-                        variable = col.split('__')[0].replace('_', ' ').title()
-                        categoria = col.split('__')[1].replace('_', ' ').title()
-                        nombre_completo = f"{variable} - {categoria}"
-                    else:
-                        nombre_completo = col
-                    sumas_total[nombre_completo] = suma
+        totales = tabla_conteos.sum(axis=0)
+        totales = totales[totales > 0]
+        
+        nombres_categorias = []
+        for col in totales.index:
+            if '__' in col:
+                variable = col.split('__')[0].replace('_', ' ').title()
+                categoria = col.split('__')[1].replace('_', ' ').title()
+                nombres_categorias.append(f"{variable} - {categoria}")
+            else:
+                nombres_categorias.append(col)
         
         # Crear DataFrame consolidado
-        if sumas_total:
+        if len(totales) > 0:
             # Comenzar con totales
-            df_consolidado = pd.DataFrame(list(sumas_total.items()), columns=['Categoría', 'Total'])
+            df_consolidado = pd.DataFrame({'Categoría': nombres_categorias, 'Total': totales.to_numpy()})
             df_consolidado = df_consolidado.sort_values('Total', ascending=False).head(n_top)
             
-            # Agregar columnas por candidato
-            for candidato in candidatos:
-                df_consolidado[candidato] = 0
-                if candidato in resultados:
-                    df_cand = resultados[candidato]
-                    for idx, row in df_consolidado.iterrows():
-                        categoria = row['Categoría']
-                        match = df_cand[df_cand['Categoría'] == categoria]
-                        if not match.empty:
-                            df_consolidado.at[idx, candidato] = match.iloc[0][candidato]
+            # Agregar columnas por candidato (lectura directa de la tabla de conteos)
+            tabla_top = tabla_conteos[totales.index[df_consolidado.index]].to_numpy()
+            for i, candidato in enumerate(candidatos):
+                df_consolidado[candidato] = tabla_top[i]
             
             # Calcular porcentajes
-            total_general = df_consolidado['Total'].sum()
-            df_consolidado['Porcentaje'] = (df_consolidado['Total'] / len(df) * 100).round(2)
+            df_consolidado['Porcentaje'] = (df_consolidado['Total'] / total_publicaciones * 100).round(2)
             
             # Resetear índice y empezar en 1
             df_consolidado = df_consolidado.reset_index(drop=True)
@@ -1048,6 +1466,7 @@ def crear_ranking_por_candidato_y_total(df, dummy_cols, variable_seleccionada=No
         st.error(f"Error al crear ranking por candidato: {e}")
         return pd.DataFrame()
 
+@instrumentar()
 def crear_tabla_cruzada(df, var1, var2, formato_apa=False):
     """Crea una tabla cruzada entre dos variables"""
     try:
@@ -1074,25 +1493,27 @@ def crear_tabla_cruzada(df, var1, var2, formato_apa=False):
         st.error(f"Error al crear tabla cruzada: {e}")
         return None, None, None, None
 
+@instrumentar()
 def exportar_a_excel(dataframes_dict, nombre_archivo):
-    """Exporta múltiples DataFrames a un archivo Excel"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for sheet_name, df in dataframes_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # Límite de 31 caracteres para nombres de hojas
-    
-    output.seek(0)
-    return output
+    """Exporta múltiples DataFrames a un archivo Excel (hojas de solo escritura, ver exportacion.py)"""
+    return exportar_tablas(dataframes_dict, 'xlsx')
+
+@instrumentar()
+def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, formato_apa=False, motor=None,
+                                frecuencia='diaria', medida='usos', estrategias=None, por_candidato=False):
+    """
+    Análisis de evolución temporal de estrategias
 
-def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
-    """Análisis de evolución temporal de estrategias"""
+    motor (series_temporales.construir_motor_temporal) tiene ya las series de todas
+    las estrategias y candidatos en cada frecuencia; sin él se construye desde df.
+    Sin estrategias indicadas se siguen las estrategias clave (hasta 6).
+    """
     if 'Fecha_convertida' not in df.columns:
         return None, []
     
-    df_temporal = df.dropna(subset=['Fecha_convertida'])
-    
-    if variable_seleccionada and variable_seleccionada != "Todas las variables":
+    if estrategias:
+        estrategias_clave = [col for col in estrategias if col in dummy_cols]
+    elif variable_seleccionada and variable_seleccionada != "Todas las variables":
         # Filtrar columnas de la variable seleccionada
         estrategias_clave = [col for col in dummy_cols if col.split('__')[0] == variable_seleccionada][:6]
     else:
@@ -1105,12 +1526,15 @@ def analisis_evolucion_temporal(df, dummy_cols, variable_seleccionada=None, form
     if not estrategias_clave:
         return None, []
     
-    # Agrupar por fecha
-    df_agrupado = df_temporal.groupby('Fecha_convertida')[estrategias_clave].sum().reset_index()
+    # Recorte del motor (periodo × candidato × estrategia) para la frecuencia y medida elegidas
+    if motor is None:
+        motor = construir_motor_temporal_df(df, dummy_cols)
+    df_agrupado = tabla_temporal(motor, estrategias_clave, frecuencia, medida, por_candidato=por_candidato)
     
-    return df_agrupado, estrategias_clave
+    return df_agrupado, list(df_agrupado.columns[1:])
 
-def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, formato_apa=False, conteos=None):
     """Análisis de técnicas de propaganda por candidato"""
     if variable_seleccionada and variable_seleccionada != "Todas las variables":
         propaganda_cols = [col for col in dummy_cols if col.split('__')[0] == variable_seleccionada]
@@ -1120,34 +1544,26 @@ def analisis_propaganda_candidatos(df, dummy_cols, variable_seleccionada=None, f
     if not propaganda_cols or 'Candidato' not in df.columns:
         return None
     
-    candidatos = df['Candidato'].unique()
-    datos_propaganda = []
+    # Conteos y porcentajes por candidato en formato largo (del cubo precalculado o de df)
+    largo = agregar_indicadores(df, propaganda_cols, conteos=conteos)
     
-    for candidato in candidatos:
-        df_cand = df[df['Candidato'] == candidato]
-        total_posts = len(df_cand)
-        
-        for col in propaganda_cols:
-            if col in df.columns:
-                usos = df_cand[col].sum()
-                porcentaje = (usos / total_posts) * 100 if total_posts > 0 else 0
-                
-                if '__' in col:
-                    variable = col.split('__')[0].replace('_', ' ').title()
-                    tecnica = col.split('__')[1].replace('_', ' ').title()
-                    nombre_completo = f"{variable} - {tecnica}"
-                else:
-                    nombre_completo = col
-                
-                datos_propaganda.append({
-                    'Candidato': candidato,
-                    'Técnica': nombre_completo,
-                    'Usos': usos,
-                    'Porcentaje': porcentaje
-                })
-    
-    return pd.DataFrame(datos_propaganda)
+    nombres_tecnica = {}
+    for col in propaganda_cols:
+        if '__' in col:
+            variable = col.split('__')[0].replace('_', ' ').title()
+            tecnica = col.split('__')[1].replace('_', ' ').title()
+            nombres_tecnica[col] = f"{variable} - {tecnica}"
+        else:
+            nombres_tecnica[col] = col
+    
+    return pd.DataFrame({
+        'Candidato': largo['Candidato'],
+        'Técnica': largo['Columna'].map(nombres_tecnica),
+        'Usos': largo['Usos'],
+        'Porcentaje': largo['Porcentaje']
+    })
 
+@instrumentar()
 def analisis_plain_folks(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
     """Análisis detallado de la estrategia Plain-folks"""
     if variable_seleccionada and variable_seleccionada != "Todas las variables":
@@ -1158,34 +1574,27 @@ def analisis_plain_folks(df, dummy_cols, variable_seleccionada=None, formato_apa
     if not plain_folks_cols:
         return None
     
-    # Filtrar posts que usan Plain-folks
-    df_plain = df[df[plain_folks_cols].sum(axis=1) > 0].copy()
+    # Indicador de posts que usan Plain-folks (alguna de sus columnas)
+    usa_plain = pd.DataFrame({'plain_folks': (df[plain_folks_cols].sum(axis=1) > 0).to_numpy()})
     
     resultados = {}
     
     # Por candidato
-    if 'Candidato' in df.columns and len(df_plain) > 0:
-        candidatos_stats = []
-        for candidato in df['Candidato'].unique():
-            df_cand = df[df['Candidato'] == candidato]
-            df_plain_cand = df_plain[df_plain['Candidato'] == candidato]
-            
-            total_posts = len(df_cand)
-            plain_posts = len(df_plain_cand)
-            porcentaje = (plain_posts / total_posts) * 100 if total_posts > 0 else 0
-            
-            candidatos_stats.append({
-                'Candidato': candidato,
-                'Total_Posts': total_posts,
-                'Plain_Folks_Posts': plain_posts,
-                'Porcentaje': porcentaje
-            })
-        
-        resultados['candidatos'] = pd.DataFrame(candidatos_stats)
+    if 'Candidato' in df.columns and usa_plain['plain_folks'].any():
+        usa_plain['Candidato'] = df['Candidato'].to_numpy()
+        largo = agregar_indicadores(usa_plain, ['plain_folks'])
+        
+        resultados['candidatos'] = pd.DataFrame({
+            'Candidato': largo['Candidato'],
+            'Total_Posts': largo['Publicaciones'],
+            'Plain_Folks_Posts': largo['Usos'],
+            'Porcentaje': largo['Porcentaje']
+        })
     
     return resultados
 
-def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis detallado de Plain-folks según contexto y campaña"""
     resultados = {}
     
@@ -1196,28 +1605,26 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
         return None
     
     # Análisis por contexto y candidato
-    if 'Contexto_de_la_imagen' in df.columns and 'Candidato' in df.columns:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
-        candidatos = df['Candidato'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns and 'Candidato' in df.columns:
+        # Bitmaps por contexto, candidato y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, plain_folks_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
+        candidatos, bitmaps_candidato = valores_presentes(indice, 'Candidato')
         
         # Crear tabla de Plain-folks por contexto y candidato
         tabla_contexto = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Calcular totales por candidato
-            for candidato in candidatos:
-                df_cand_contexto = df_contexto[df_contexto['Candidato'] == candidato]
+            for candidato, bitmap_candidato in zip(candidatos, bitmaps_candidato):
+                filas_cand_contexto = bitmap_contexto & bitmap_candidato
+                total_publicaciones = int(contar_bits(filas_cand_contexto))
                 
-                if len(df_cand_contexto) > 0:
+                if total_publicaciones > 0:
                     # Contar publicaciones con Plain-folks
-                    plain_folks_count = 0
-                    for col in plain_folks_cols:
-                        if col in df_cand_contexto.columns:
-                            plain_folks_count += df_cand_contexto[col].sum()
+                    plain_folks_count = contar_dummies(indice, filas_cand_contexto, plain_folks_cols).sum()
                     
-                    total_publicaciones = len(df_cand_contexto)
                     porcentaje = (plain_folks_count / total_publicaciones * 100) if total_publicaciones > 0 else 0
                     
                     tabla_contexto.append({
@@ -1242,7 +1649,8 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
                     ]
                     
                     for _, row in datos_contexto.iterrows():
-                        if candidato in row[f'{candidato}: publicaciones con Plain-folks (%)']:
+                        # Solo las filas de este candidato tienen valor en su columna (NaN en las demás)
+                        if pd.notna(row[f'{candidato}: publicaciones con Plain-folks (%)']):
                             fila[f'{candidato}: publicaciones con Plain-folks (%)'] = row[f'{candidato}: publicaciones con Plain-folks (%)']
                 
                 tabla_pivot.append(fila)
@@ -1251,7 +1659,8 @@ def analisis_plain_folks_por_contexto(df, dummy_cols, variable_seleccionada=None
     
     return resultados
 
-def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=None, formato_apa=False, conteos=None):
     """Análisis de distribución general de recursos de propaganda según IPA"""
     resultados = {}
     
@@ -1262,25 +1671,24 @@ def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=N
     ]
     
     if 'Candidato' in df.columns:
-        candidatos = df['Candidato'].dropna().unique()
+        # Conteos por candidato en formato largo (del cubo precalculado o de df)
+        largo = agregar_indicadores(df, dummy_cols, conteos=conteos)
+        largo = largo[largo['Candidato'].notna()]
+        publicaciones = largo.drop_duplicates('Candidato').set_index('Candidato')['Publicaciones']
+        candidatos = list(publicaciones.index)
         
         tabla_recursos = []
         
         for i, recurso in enumerate(recursos_ipa, 1):
             fila = {'Recurso de propaganda (IPA)': f"{i}. {recurso.replace('_', '-').title()}"}
             
+            # Usos de las columnas que contienen este recurso, sumados por candidato
+            es_recurso = largo['Columna'].str.lower().str.contains(recurso.lower(), regex=False)
+            totales = largo[es_recurso].groupby('Candidato', sort=False)['Usos'].sum()
+            
             for candidato in candidatos:
-                df_candidato = df[df['Candidato'] == candidato]
-                
-                # Buscar columnas que contengan este recurso
-                recurso_cols = [col for col in dummy_cols if recurso.lower() in col.lower()]
-                
-                total_recurso = 0
-                for col in recurso_cols:
-                    if col in df_candidato.columns:
-                        total_recurso += df_candidato[col].sum()
-                
-                total_publicaciones = len(df_candidato)
+                total_recurso = totales.get(candidato, 0)
+                total_publicaciones = publicaciones[candidato]
                 porcentaje = (total_recurso / total_publicaciones * 100) if total_publicaciones > 0 else 0
                 
                 fila[f'{candidato}: Nº de publicaciones'] = total_recurso
@@ -1292,13 +1700,17 @@ def analisis_distribucion_propaganda_ipa(df, dummy_cols, variable_seleccionada=N
     
     return resultados
 
-def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis de cruce entre reglas de propaganda y contexto de imagen"""
     resultados = {}
     
     # Buscar variables de reglas dominantes y contexto
-    if 'Contexto_de_la_imagen' in df.columns:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns:
+        # Bitmaps por contexto, candidato y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, dummy_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
         
         # Buscar columnas de reglas de propaganda
         reglas_cols = [col for col in dummy_cols if any(regla in col.lower() for regla in 
@@ -1306,28 +1718,26 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
         
         tabla_cruce = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Encontrar la regla dominante en este contexto
             regla_dominante = None
             max_count = 0
             
-            for col in reglas_cols:
-                if col in df_contexto.columns:
-                    count = df_contexto[col].sum()
-                    if count > max_count:
-                        max_count = count
-                        regla_dominante = col.split('__')[-1] if '__' in col else col
+            for col, count in contar_dummies(indice, bitmap_contexto, reglas_cols).items():
+                if count > max_count:
+                    max_count = count
+                    regla_dominante = col.split('__')[-1] if '__' in col else col
             
             # Determinar campaña dominante
             campana_dominante = "Votantes"  # Por defecto
             candidato_dominante = "Ambos"
             
-            if 'Candidato' in df_contexto.columns:
-                candidatos_count = df_contexto['Candidato'].value_counts()
-                if len(candidatos_count) > 0:
-                    candidato_dominante = candidatos_count.index[0]
+            if 'Candidato' in df.columns:
+                # Publicaciones por candidato en el contexto (mismo orden que value_counts)
+                candidatos, bitmaps_candidato = valores_presentes(indice, 'Candidato', bitmap_contexto)
+                if len(candidatos) > 0:
+                    candidatos_count = pd.Series(contar_bits(bitmaps_candidato), index=candidatos)
+                    candidato_dominante = candidatos_count.sort_values(ascending=False).index[0]
             
             # Mapear contexto a campaña
             if 'personal' in contexto.lower():
@@ -1340,7 +1750,7 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
             tabla_cruce.append({
                 'Contexto de la imagen': contexto,
                 'Regla dominante (Domenach)': regla_dominante.replace('_', ' ').title() if regla_dominante else "N/A",
-                'Nº publicaciones': len(df_contexto),
+                'Nº publicaciones': int(contar_bits(bitmap_contexto)),
                 'Candidato dominante': candidato_dominante
             })
         
@@ -1348,21 +1758,23 @@ def analisis_cruce_reglas_contexto(df, dummy_cols, variable_seleccionada=None, f
     
     return resultados
 
-def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato_apa=False):
+@instrumentar()
+def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato_apa=False, indice=None):
     """Análisis de aparición del líder según contexto y campaña"""
     resultados = {}
     
     # Buscar columnas relacionadas con aparición del líder
     aparicion_cols = [col for col in dummy_cols if 'aparicion' in col.lower() or 'lider' in col.lower() or 'acompañado' in col.lower()]
     
-    if 'Contexto_de_la_imagen' in df.columns and aparicion_cols:
-        contextos = df['Contexto_de_la_imagen'].dropna().unique()
+    if COLUMNA_CONTEXTO in df.columns and aparicion_cols:
+        # Bitmaps por contexto y columna (índice ya filtrado o construido sobre df)
+        if indice is None:
+            indice = construir_indice_bitmap(df, aparicion_cols)
+        contextos, bitmaps_contexto = valores_presentes(indice, COLUMNA_CONTEXTO)
         
         tabla_aparicion = []
         
-        for contexto in contextos:
-            df_contexto = df[df['Contexto_de_la_imagen'] == contexto]
-            
+        for contexto, bitmap_contexto in zip(contextos, bitmaps_contexto):
             # Determinar si va acompañado
             acompanado = "Ninguno"
             if 'personal' in contexto.lower():
@@ -1371,12 +1783,8 @@ def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato
                 acompanado = "Votantes"
             
             # Calcular presencia del líder
-            presencia_lider = 0
-            total_publicaciones = len(df_contexto)
-            
-            for col in aparicion_cols:
-                if col in df_contexto.columns:
-                    presencia_lider += df_contexto[col].sum()
+            total_publicaciones = int(contar_bits(bitmap_contexto))
+            presencia_lider = contar_dummies(indice, bitmap_contexto, aparicion_cols).sum()
             
             porcentaje_presencia = (presencia_lider / total_publicaciones * 100) if total_publicaciones > 0 else 0
             
@@ -1391,6 +1799,7 @@ def analisis_aparicion_lider(df, dummy_cols, variable_seleccionada=None, formato
     
     return resultados
 
+@instrumentar()
 def generar_tabla_contingencia_avanzada(df, var1, var2, incluir_porcentajes=True):
     """Genera tabla de contingencia avanzada con múltiples estadísticos"""
     try:
@@ -1574,90 +1983,15 @@ def aplicar_tema(tema="claro"):
         })
         return False
 
-def crear_tabla_apa_docx(doc, df, titulo="Tabla"):
-    """Crea una tabla en formato APA para documento DOCX"""
-    # Agregar título de tabla
-    titulo_para = doc.add_paragraph()
-    titulo_run = titulo_para.add_run(titulo)
-    titulo_run.font.name = 'Times New Roman'
-    titulo_run.font.size = Pt(12)
-    titulo_run.bold = True
-    titulo_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    
-    # Crear tabla
-    table = doc.add_table(rows=1, cols=len(df.columns))
-    table.style = 'Light Grid Accent 1'
-    
-    # Configurar encabezados
-    hdr_cells = table.rows[0].cells
-    for i, column in enumerate(df.columns):
-        hdr_cells[i].text = str(column)
-        for paragraph in hdr_cells[i].paragraphs:
-            for run in paragraph.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-                run.bold = True
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Agregar datos
-    for index, row in df.iterrows():
-        row_cells = table.add_row().cells
-        for i, value in enumerate(row):
-            row_cells[i].text = str(value)
-            for paragraph in row_cells[i].paragraphs:
-                for run in paragraph.runs:
-                    run.font.name = 'Times New Roman'
-                    run.font.size = Pt(12)
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Aplicar bordes APA
-    for row in table.rows:
-        for cell in row.cells:
-            cell.width = Inches(1.5)
-    
-    doc.add_paragraph()  # Espacio después de la tabla
-    return table
-
+@instrumentar()
 def exportar_a_docx(dataframes_dict, graficos_dict=None, titulo_documento="Análisis de Campaña Electoral"):
-    """Exporta tablas y gráficos a un documento DOCX en formato APA"""
-    doc = Document()
-    
-    # Configurar documento
-    section = doc.sections[0]
-    section.page_height = Inches(11)
-    section.page_width = Inches(8.5)
-    section.left_margin = Inches(1)
-    section.right_margin = Inches(1)
-    section.top_margin = Inches(1)
-    section.bottom_margin = Inches(1)
-    
-    # Título principal
-    titulo = doc.add_heading(titulo_documento, 0)
-    titulo.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    for run in titulo.runs:
-        run.font.name = 'Times New Roman'
-        run.font.size = Pt(16)
-    
-    # Fecha
-    fecha_para = doc.add_paragraph()
-    fecha_run = fecha_para.add_run(f"Fecha de análisis: {datetime.now().strftime('%d de %B de %Y')}")
-    fecha_run.font.name = 'Times New Roman'
-    fecha_run.font.size = Pt(12)
-    fecha_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    doc.add_paragraph()  # Espacio
-    
-    # Agregar tablas
-    for i, (nombre, df) in enumerate(dataframes_dict.items(), 1):
-        if not df.empty:
-            titulo_tabla = f"Tabla {i}. {nombre}"
-            crear_tabla_apa_docx(doc, df, titulo_tabla)
-    
-    # Guardar en memoria
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    """Exporta tablas y gráficos a un documento DOCX en formato APA (plantilla plantillas/informe_apa.docx)"""
+    # Cada figura se rasteriza una sola vez por (especificación, DPI) y se reutiliza entre exportaciones
+    imagenes, omitidas = imagenes_figuras(graficos_dict or {})
+    if omitidas:
+        st.warning(f"⚠️ Figuras no incluidas en el documento ({', '.join(omitidas)}): "
+                   f"{next(iter(omitidas.values()))}")
+    return generar_informe_docx(dataframes_dict, imagenes, titulo_documento=titulo_documento)
 
 def obtener_css_tema(tema_oscuro=False):
     """Genera CSS personalizado según el tema seleccionado"""
@@ -1859,8 +2193,11 @@ def main():
     
     st.markdown('<div class="main-header">📊 Análisis Avanzado de Campaña Electoral</div>', unsafe_allow_html=True)
     
-    # Cargar datos
-    df, dummy_cols = cargar_datos()
+    # Cargar datos (la firma cambia con cada ingesta, sin reiniciar la aplicación)
+    firma_datos = obtener_firma_datos()
+    with medir("cargar_datos", cache=True) as medicion:
+        df, dummy_cols = cargar_datos(firma_datos)
+        medicion['filas'] = len(df) if df is not None else None
     
     if df is None or len(dummy_cols) == 0:
         st.error("❌ No se pudieron cargar los datos o no se encontraron columnas dummy.")
@@ -1932,12 +2269,17 @@ def main():
     candidatos_disponibles = ["Todos"] + list(df['Candidato'].unique()) if 'Candidato' in df.columns else ["Todos"]
     candidato_seleccionado = st.sidebar.selectbox("👤 Candidato:", candidatos_disponibles)
     
-    # Filtro por fecha
+    # Filtro por fecha (extremos tomados del eje de días del cubo, sin recorrer las filas)
+    with medir("cargar_cubo_conteos", cache=True):
+        cubo = cargar_cubo_conteos(firma_datos)
     if 'Fecha_convertida' in df.columns:
-        df_con_fecha = df.dropna(subset=['Fecha_convertida'])
-        if len(df_con_fecha) > 0:
-            fecha_min = df_con_fecha['Fecha_convertida'].min().date()
-            fecha_max = df_con_fecha['Fecha_convertida'].max().date()
+        if cubo is not None:
+            dias_con_fecha = pd.to_datetime(cubo['fechas'][cubo['publicaciones'][:, :-1].sum(axis=0) > 0])
+        else:
+            dias_con_fecha = df['Fecha_convertida'].dropna()
+        if len(dias_con_fecha) > 0:
+            fecha_min = dias_con_fecha.min().date()
+            fecha_max = dias_con_fecha.max().date()
             
             rango_fechas = st.sidebar.date_input(
                 "📅 Rango de fechas:",
@@ -1950,23 +2292,50 @@ def main():
     # APLICAR FILTROS A LOS DATOS
     # =====================================================
     
-    df_filtrado = df.copy()
-    
-    # Filtrar por candidato
-    if candidato_seleccionado != "Todos":
-        df_filtrado = df_filtrado[df_filtrado['Candidato'] == candidato_seleccionado]
-    
-    # Filtrar por fecha
+    # Rango de fechas (solo cuando se han elegido los dos extremos)
+    fecha_inicio, fecha_fin = None, None
     if 'Fecha_convertida' in df.columns and 'rango_fechas' in locals() and len(rango_fechas) == 2:
         fecha_inicio, fecha_fin = rango_fechas
-        df_filtrado = df_filtrado[
-            (df_filtrado['Fecha_convertida'].dt.date >= fecha_inicio) &
-            (df_filtrado['Fecha_convertida'].dt.date <= fecha_fin)
-        ]
-      # Aplicar filtro de variable/categoría
-    df_filtrado, dummy_cols_filtradas = filtrar_datos_por_seleccion(
-        df_filtrado, dummy_cols, variable_seleccionada, categorias_seleccionadas
+    
+    # Candidato, fechas y variable/categorías: las posiciones de fila se memorizan
+    # por selección, de modo que las opciones que no filtran no recalculan nada
+    with medir("cargar_indice_bitmap", cache=True):
+        indice = cargar_indice_bitmap(firma_datos)
+    with medir("obtener_filtro", filas=len(df), cache=True):
+        posiciones_filtradas, dummy_cols_filtradas = obtener_filtro(
+            df, dummy_cols, firma_datos,
+            candidato=candidato_seleccionado,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            variable_seleccionada=variable_seleccionada,
+            categorias_seleccionadas=categorias_seleccionadas,
+            indice=indice
+        )
+    # Vista perezosa: el DataFrame filtrado solo se construye si alguna sección lo calcula
+    df_filtrado = FilasFiltradas(df, posiciones_filtradas)
+    
+    # Bitmaps limitados a la selección para los desgloses por contexto y candidato
+    indice_filtrado = None
+    if indice is not None:
+        indice_filtrado = restringir_indice(indice, bitmap_posiciones(indice, posiciones_filtradas))
+    
+    # Conteos por candidato desde el cubo precalculado (solo si el filtro de
+    # categorías no restringe filas; en ese caso cada tabla cuenta sobre df_filtrado)
+    conteos_seleccion = None
+    filtro_filas_categorias = (
+        variable_seleccionada != "Todas las variables"
+        and categorias_seleccionadas
+        and "Todas las categorías" not in categorias_seleccionadas
     )
+    # (las sumas acumuladas por día del cubo resuelven el rango de fechas con una resta)
+    seleccion_cubo = None
+    if cubo is not None and not filtro_filas_categorias:
+        seleccion_cubo = {
+            'candidatos': None if candidato_seleccionado == "Todos" else [candidato_seleccionado],
+            'fecha_inicio': fecha_inicio,
+            'fecha_fin': fecha_fin
+        }
+        conteos_seleccion = consultar_cubo(cubo, **seleccion_cubo)
     
     # Mostrar información de filtros aplicados
     st.sidebar.markdown("---")
@@ -1986,822 +2355,729 @@ def main():
     if len(df_filtrado) == 0:
         st.warning("⚠️ No hay datos que coincidan con los filtros seleccionados.")
         return
-      # =====================================================
-    # SECCIÓN 1: RANKING DE CATEGORÍAS TOP
+    
+    # =====================================================
+    # CÁLCULO PEREZOSO POR SECCIÓN
     # =====================================================
     
-    st.markdown('<div class="section-header">🏆 Ranking de Categorías Más Utilizadas</div>', unsafe_allow_html=True)
+    # Cada sección se calcula solo si su pestaña está abierta y su resultado se
+    # memoriza por selección de filtros y controles propios (calcular_seccion);
+    # la exportación reutiliza las mismas llamadas para las pestañas no abiertas
+    clave_filtro = clave_seleccion(firma_datos, candidato_seleccionado, fecha_inicio, fecha_fin,
+                                   variable_seleccionada, categorias_seleccionadas)
+    
+    def calcular_ranking(n_top, por_candidato):
+        funcion = crear_ranking_por_candidato_y_total if por_candidato else crear_ranking_por_variable
+        return calcular_seccion(
+            "ranking", (clave_filtro, n_top, por_candidato, formato_apa), funcion,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, n_top, formato_apa, conteos_seleccion)
+        )
     
-    # Configuración del ranking
-    col_config1, col_config2, col_config3 = st.columns([1, 1, 1])
+    def calcular_motor_temporal():
+        # Series periodo × candidato × estrategia de la selección, en todas las frecuencias y medidas
+        if seleccion_cubo is not None:
+            return calcular_seccion("motor_temporal", (clave_filtro,), construir_motor_temporal,
+                                    (cubo,), seleccion_cubo)
+        return calcular_seccion("motor_temporal", (clave_filtro,), construir_motor_temporal_df,
+                                (df_filtrado, dummy_cols_filtradas))
+    
+    def calcular_temporal():
+        # Frecuencia, medida y estrategias elegidas en la pestaña (o sus valores por defecto)
+        frecuencia = st.session_state.get("temporal_frecuencia", 'diaria')
+        medida = st.session_state.get("temporal_medida", 'usos')
+        estrategias = tuple(st.session_state.get("temporal_estrategias", ()))
+        por_candidato = st.session_state.get("temporal_por_candidato", False)
+        if 'Fecha_convertida' not in df_filtrado.columns:
+            return None, []
+        return calcular_seccion(
+            "temporal", (clave_filtro, formato_apa, frecuencia, medida, estrategias, por_candidato),
+            analisis_evolucion_temporal,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa),
+            {'motor': calcular_motor_temporal(), 'frecuencia': frecuencia, 'medida': medida,
+             'estrategias': list(estrategias), 'por_candidato': por_candidato}
+        )
     
-    with col_config1:
-        n_top = st.slider(
-            "Número de categorías a mostrar:",
-            min_value=5,
-            max_value=20,
-            value=10,
-            step=1
+    def calcular_variables_cruce():
+        usos_variables = sumar_indicadores(construir_matriz_indicadores(df, dummy_cols_filtradas),
+                                           filas=posiciones_filtradas)
+        return [col for col in dummy_cols_filtradas if usos_variables.get(col, 0) >= 3]
+    
+    def seleccion_cruce():
+        # Variables elegidas en la pestaña de cruces (o las que mostraría por defecto)
+        disponibles = calcular_variables_cruce()
+        if len(disponibles) < 2:
+            return None, None
+        var1 = st.session_state.get("cruce_var1")
+        var1 = var1 if var1 in disponibles else disponibles[0]
+        restantes = [v for v in disponibles if v != var1]
+        var2 = st.session_state.get("cruce_var2")
+        return var1, var2 if var2 in restantes else restantes[0]
+    
+    def calcular_cruce(var1, var2):
+        if var1 is None or var2 is None:
+            return None, None, None, None
+        return calcular_seccion(
+            "cruce", (clave_filtro, var1, var2, formato_apa), crear_tabla_cruzada,
+            (df_filtrado, var1, var2, formato_apa)
         )
     
-    with col_config2:
-        mostrar_por_candidato = st.checkbox(
-            "📊 Mostrar desglose por candidato",
-            value=True,
-            help="Muestra la distribución de cada categoría por candidato además del total"
+    def calcular_propaganda():
+        return calcular_seccion(
+            "propaganda", (clave_filtro, formato_apa), analisis_propaganda_candidatos,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa, conteos_seleccion)
         )
     
-    with col_config3:
-        tamaño_grafico = st.selectbox(
-            "📏 Tamaño del gráfico:",
-            ["Normal", "Grande", "Extra Grande"],
-            index=0,
-            help="Selecciona el tamaño del gráfico para mejor visualización"
+    def calcular_reglas(soporte_minimo, confianza_minima, lift_minimo, max_longitud):
+        return calcular_seccion(
+            "reglas_asociacion", (clave_filtro, soporte_minimo, confianza_minima, lift_minimo, max_longitud),
+            reglas_por_candidato, (df_filtrado, dummy_cols_filtradas),
+            {'indice': indice_filtrado, 'soporte_minimo': soporte_minimo, 'confianza_minima': confianza_minima,
+             'lift_minimo': lift_minimo, 'max_longitud': max_longitud}
         )
     
-    # Determinar altura según selección
-    altura_grafico = {
-        "Normal": 500,
-        "Grande": 700,
-        "Extra Grande": 900
-    }[tamaño_grafico]
+    def calcular_plain_folks():
+        return calcular_seccion(
+            "plain_folks", (clave_filtro, formato_apa), analisis_plain_folks,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
+        )
     
-    # Crear ranking
-    if mostrar_por_candidato:
-        df_top = crear_ranking_por_candidato_y_total(df_filtrado, dummy_cols_filtradas, variable_seleccionada, n_top, formato_apa)
-    else:
-        df_top = crear_ranking_por_variable(df_filtrado, dummy_cols_filtradas, variable_seleccionada, n_top, formato_apa)
+    def calcular_plain_folks_contexto():
+        return calcular_seccion(
+            "plain_folks_contexto", (clave_filtro, formato_apa), analisis_plain_folks_por_contexto,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa), {'indice': indice_filtrado}
+        )
     
-    if len(df_top) > 0:
-        # Mostrar tabla con formato seleccionado
-        titulo_ranking = f"Top {n_top} Categorías"
-        if variable_seleccionada != "Todas las variables":
-            titulo_ranking += f" - {variable_seleccionada.replace('_', ' ').title()}"
-        
-        mostrar_tabla_con_formato(df_top, titulo_ranking, formato_apa)
-        
-        # Opción para expandir tabla
-        with st.expander("📋 Ver tabla expandida"):
-            st.dataframe(df_top, use_container_width=True, height=400)
-        
-        # Gráfico de barras con tamaño ajustable
-        col_grafico1, col_grafico2 = st.columns([4, 1])
-        
-        with col_grafico1:
-            fig = px.bar(
-                df_top.head(10),
-                x='Total' if mostrar_por_candidato else 'Frecuencia',
-                y='Categoría',                orientation='h',
-                title=titulo_ranking,
-                labels={'Total': 'Número de Usos Total', 'Frecuencia': 'Número de Usos', 'Categoría': 'Categoría'},
-                height=altura_grafico
-            )
-            
-            fig.update_layout(
-                yaxis={'categoryorder': 'total ascending'},
-                xaxis_title="Número de Usos",
-                yaxis_title="",
-                title_x=0.5,
-                margin=dict(l=200, r=50, t=80, b=50)  # Más margen izquierdo para etiquetas largas
-            )
-            # Mejorar legibilidad de etiquetas
-            fig.update_yaxes(tickfont=dict(size=10))
-            fig.update_xaxes(tickfont=dict(size=12))
-            
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col_grafico2:
-            if st.button("🔍 Ver en pantalla completa", use_container_width=True):
-                # Crear gráfico en pantalla completa
-                fig_full = px.bar(
-                    df_top,
-                    x='Total' if mostrar_por_candidato else 'Frecuencia',
-                    y='Categoría',
-                    orientation='h',
-                    title=f"{titulo_ranking} - Vista Expandida",
-                    labels={'Total': 'Número de Usos Total', 'Frecuencia': 'Número de Usos', 'Categoría': 'Categoría'},
-                    height=max(800, len(df_top) * 40)  # Altura dinámica según número de categorías
+    def calcular_ipa():
+        return calcular_seccion(
+            "distribucion_ipa", (clave_filtro, formato_apa), analisis_distribucion_propaganda_ipa,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa, conteos_seleccion)
+        )
+    
+    def calcular_cruce_reglas_contexto():
+        return calcular_seccion(
+            "cruce_reglas_contexto", (clave_filtro, formato_apa), analisis_cruce_reglas_contexto,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa), {'indice': indice_filtrado}
+        )
+    
+    def calcular_lider():
+        return calcular_seccion(
+            "aparicion_lider", (clave_filtro, formato_apa), analisis_aparicion_lider,
+            (df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa), {'indice': indice_filtrado}
+        )
+    
+    def tabla_resultado(resultados, clave):
+        # Tabla de un resultado de sección, o None si no existe o está vacía
+        tabla = (resultados or {}).get(clave)
+        return tabla if tabla is not None and len(tabla) > 0 else None
+    
+    def vista_reglas(df_reglas):
+        return df_reglas.assign(
+            Antecedente=df_reglas['Antecedente'].map(etiqueta_columnas),
+            Consecuente=df_reglas['Consecuente'].map(etiqueta_columnas)
+        )
+    
+    (pestana_ranking, pestana_temporal, pestana_cruces, pestana_propaganda, pestana_plain,
+     pestana_plain_contexto, pestana_ipa, pestana_reglas_contexto, pestana_lider,
+     pestana_combinaciones) = crear_pestanas_secciones([
+        "🏆 Ranking", "📈 Evolución Temporal", "🔄 Cruces", "📢 Propaganda", "👥 Plain-Folks",
+        "🍀 Plain-folks por Contexto", "📊 Recursos IPA", "✅ Reglas y Contexto",
+        "📊 Aparición del Líder", "🧩 Combinaciones"
+    ], "seccion_activa")
+    
+    # Los controles de las secciones no elegidas no se dibujan: se conserva su valor
+    controles_por_pestana = [
+        (pestana_ranking, ["ranking_n_top", "ranking_por_candidato", "ranking_size"]),
+        (pestana_temporal, ["temporal_size", "temporal_frecuencia", "temporal_medida", "temporal_estrategias",
+                            "temporal_por_candidato"]),
+        (pestana_cruces, ["cruce_var1", "cruce_var2", "cruce_tipo", "heatmap_size", "metodo_correccion_asociacion"]),
+        (pestana_propaganda, ["prop_size"]),
+        (pestana_plain_contexto, ["tamano_plain_contexto", "altura_plain_contexto", "fullscreen_plain_contexto"]),
+        (pestana_ipa, ["tamano_ipa", "altura_ipa", "fullscreen_ipa"]),
+        (pestana_reglas_contexto, ["tamano_cruce"]),
+        (pestana_lider, ["tamano_lider"]),
+        (pestana_combinaciones, ["soporte_reglas", "confianza_reglas", "lift_reglas", "longitud_reglas"])
+    ]
+    for pestana, claves in controles_por_pestana:
+        if not seccion_abierta(pestana):
+            conservar_estado_widgets(claves)
+      # =====================================================
+    # SECCIÓN 1: RANKING DE CATEGORÍAS TOP
+    # =====================================================
+    
+    with pestana_ranking:
+        if seccion_abierta(pestana_ranking):
+            st.markdown('<div class="section-header">🏆 Ranking de Categorías Más Utilizadas</div>', unsafe_allow_html=True)
+    
+            # Configuración del ranking
+            col_config1, col_config2 = st.columns([1, 1])
+    
+            with col_config1:
+                n_top = st.slider(
+                    "Número de categorías a mostrar:",
+                    min_value=5,
+                    max_value=20,
+                    value=10,
+                    step=1,
+                    key="ranking_n_top"
                 )
-                fig_full.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    xaxis_title="Número de Usos",
-                    yaxis_title="",
-                    title_x=0.5,
-                    margin=dict(l=300, r=50, t=100, b=50),  # Márgenes amplios
-                    font=dict(size=14)  # Fuente más grande
+    
+            with col_config2:
+                mostrar_por_candidato = st.checkbox(
+                    "📊 Mostrar desglose por candidato",
+                    value=True,
+                    help="Muestra la distribución de cada categoría por candidato además del total",
+                    key="ranking_por_candidato"
                 )
-                
-                st.plotly_chart(fig_full, use_container_width=True)
+    
+            # Crear ranking
+            df_top = calcular_ranking(n_top, mostrar_por_candidato)
+    
+            if len(df_top) > 0:
+                # Mostrar tabla con formato seleccionado
+                titulo_ranking = f"Top {n_top} Categorías"
+                if variable_seleccionada != "Todas las variables":
+                    titulo_ranking += f" - {variable_seleccionada.replace('_', ' ').title()}"
         
-        # Si se muestra por candidato, agregar gráfico de barras apiladas
-        if mostrar_por_candidato and 'Candidato' in df_filtrado.columns:
-            st.markdown("### 📊 Distribución por Candidato")
-            
-            # Preparar datos para gráfico apilado
-            candidatos = [col for col in df_top.columns if col not in ['Categoría', 'Total', 'Porcentaje']]
-            
-            if len(candidatos) > 0:
-                fig_stack = go.Figure()
-                
-                for candidato in candidatos:
-                    fig_stack.add_trace(go.Bar(
-                        name=candidato,
-                        x=df_top['Categoría'][:10],  # Solo top 10 para legibilidad
-                        y=df_top[candidato][:10],
-                        text=df_top[candidato][:10],
-                        textposition='inside'
-                    ))
-                
-                fig_stack.update_layout(
-                    barmode='stack',
-                    title="Distribución de Categorías por Candidato",
-                    xaxis_title="Categorías",
-                    yaxis_title="Número de Usos",
-                    height=altura_grafico,
-                    xaxis_tickangle=-45,
-                    margin=dict(l=50, r=50, t=80, b=150)  # Margen inferior para etiquetas rotadas
-                )
-                
-                st.plotly_chart(fig_stack, use_container_width=True)
-    else:
-        st.info("No hay datos para mostrar en el ranking.")
+                mostrar_tabla_con_formato(df_top, titulo_ranking, formato_apa)
+        
+                # Opción para expandir tabla
+                with st.expander("📋 Ver tabla expandida"):
+                    st.dataframe(df_top, use_container_width=True, height=400)
+        
+                # Gráficos con tamaño ajustable (se recargan sin recalcular el ranking)
+                mostrar_graficos_ranking(df_top, titulo_ranking, mostrar_por_candidato,
+                                         'Candidato' in df_filtrado.columns)
+            else:
+                st.info("No hay datos para mostrar en el ranking.")
+    
       # =====================================================
     # SECCIÓN 2: EVOLUCIÓN TEMPORAL
     # =====================================================
     
-    st.markdown('<div class="section-header">📈 Evolución Temporal de Estrategias</div>', unsafe_allow_html=True)
-    
-    # Configuración para gráficos temporales
-    col_temp1, col_temp2 = st.columns([3, 1])
-    
-    with col_temp2:
-        tamaño_temporal = st.selectbox(
-            "📏 Tamaño del gráfico temporal:",
-            ["Normal", "Grande", "Extra Grande"],
-            index=0,
-            key="temporal_size"
-        )
-        
-        altura_temporal = {
-            "Normal": 500,
-            "Grande": 700,
-            "Extra Grande": 900
-        }[tamaño_temporal]
+    with pestana_temporal:
+        if seccion_abierta(pestana_temporal):
+            st.markdown('<div class="section-header">📈 Evolución Temporal de Estrategias</div>', unsafe_allow_html=True)
+    
+            # Frecuencia, medida y estrategias: solo recortan el motor temporal ya calculado
+            col_frec, col_medida, col_desglose = st.columns([1, 1, 1])
+            with col_frec:
+                frecuencia = st.selectbox("🗓️ Agrupación temporal:", list(FRECUENCIAS),
+                                          format_func=FRECUENCIAS.get, key="temporal_frecuencia")
+            with col_medida:
+                medida = st.selectbox("📐 Medida:", list(MEDIDAS), format_func=MEDIDAS.get, key="temporal_medida")
+            with col_desglose:
+                st.checkbox("👤 Una serie por candidato", value=False, key="temporal_por_candidato")
+            st.multiselect(
+                "🎯 Estrategias a seguir:",
+                options=dummy_cols_filtradas,
+                format_func=lambda col: etiqueta_columnas([col]),
+                key="temporal_estrategias",
+                help="Si no seleccionas ninguna, se muestran las estrategias clave"
+            )
     
-    resultado_temporal = analisis_evolucion_temporal(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
+            resultado_temporal = calcular_temporal()
     
-    if resultado_temporal[0] is not None:
-        df_temporal, estrategias_clave = resultado_temporal
+            if resultado_temporal[0] is not None:
+                df_temporal, estrategias_clave = resultado_temporal
         
-        if len(df_temporal) > 0 and len(estrategias_clave) > 0:
-            with col_temp1:
-                # Gráfico de líneas interactivo
-                fig = go.Figure()
-                
-                for estrategia in estrategias_clave:
-                    if estrategia in df_temporal.columns:
-                        nombre_limpio = estrategia.split('__')[1].replace('_', ' ').title() if '__' in estrategia else estrategia
-                        fig.add_trace(go.Scatter(
-                            x=df_temporal['Fecha_convertida'],
-                            y=df_temporal[estrategia],
-                            mode='lines+markers',
-                            name=nombre_limpio,
-                            line=dict(width=3),
-                            marker=dict(size=8)
-                        ))
-                
-                titulo_temporal = "Evolución Temporal de Estrategias"
-                if variable_seleccionada != "Todas las variables":
-                    titulo_temporal += f" - {variable_seleccionada.replace('_', ' ').title()}"
-                
-                fig.update_layout(
-                    title=titulo_temporal,
-                    xaxis_title="Fecha",
-                    yaxis_title="Número de Usos",
-                    height=altura_temporal,
-                    hovermode='x unified',
-                    title_x=0.5,
-                    margin=dict(l=50, r=50, t=80, b=50),
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+                if len(df_temporal) > 0 and len(estrategias_clave) > 0:
+                    titulo_temporal = "Evolución Temporal de Estrategias"
+                    if variable_seleccionada != "Todas las variables":
+                        titulo_temporal += f" - {variable_seleccionada.replace('_', ' ').title()}"
+                    
+                    titulo_temporal += f" ({FRECUENCIAS[frecuencia]})"
+                    
+                    # Gráfico con tamaño ajustable (se recarga sin recalcular la serie)
+                    mostrar_grafico_temporal(df_temporal, estrategias_clave, titulo_temporal, MEDIDAS[medida])
             
-            # Botón para vista expandida
-            if st.button("🔍 Ver evolución temporal en pantalla completa", key="temp_full"):
-                fig_full_temp = go.Figure()
-                
-                for estrategia in estrategias_clave:
-                    if estrategia in df_temporal.columns:
-                        nombre_limpio = estrategia.split('__')[1].replace('_', ' ').title() if '__' in estrategia else estrategia
-                        fig_full_temp.add_trace(go.Scatter(
-                            x=df_temporal['Fecha_convertida'],
-                            y=df_temporal[estrategia],
-                            mode='lines+markers',
-                            name=nombre_limpio,
-                            line=dict(width=4),
-                            marker=dict(size=10)
-                        ))
-                
-                fig_full_temp.update_layout(
-                    title=f"{titulo_temporal} - Vista Expandida",
-                    xaxis_title="Fecha",
-                    yaxis_title="Número de Usos",
-                    height=800,
-                    hovermode='x unified',
-                    title_x=0.5,
-                    font=dict(size=14),
-                    margin=dict(l=80, r=80, t=100, b=80)                )
-                
-                st.plotly_chart(fig_full_temp, use_container_width=True)
+                    # Estadísticas temporales
+                    col1, col2 = st.columns(2)
             
-            # Estadísticas temporales
-            col1, col2 = st.columns(2)
+                    # Con medias móviles y proporciones los valores no son conteos: sin total y con decimales
+                    es_conteo = medida == 'usos'
+                    redondear = int if es_conteo else (lambda valor: round(float(valor), 2))
             
-            with col1:
-                estadisticas = []
-                for estrategia in estrategias_clave:
-                    if estrategia in df_temporal.columns:
-                        valores = df_temporal[estrategia]
-                        nombre_limpio = estrategia.split('__')[1].replace('_', ' ').title() if '__' in estrategia else estrategia
+                    with col1:
+                        estadisticas = []
+                        for estrategia in estrategias_clave:
+                            if estrategia in df_temporal.columns:
+                                valores = df_temporal[estrategia]
                         
-                        estadisticas.append({
-                            'Estrategia': nombre_limpio,
-                            'Total': int(valores.sum()),
-                            'Promedio': round(valores.mean(), 2),
-                            'Máximo': int(valores.max()),
-                            'Mínimo': int(valores.min())
-                        })
+                                fila_estadisticas = {'Estrategia': etiqueta_serie(estrategia)}
+                                if es_conteo:
+                                    fila_estadisticas['Total'] = int(valores.sum())
+                                fila_estadisticas.update({
+                                    'Promedio': round(valores.mean(), 2),
+                                    'Máximo': redondear(valores.max()),
+                                    'Mínimo': redondear(valores.min())
+                                })
+                                estadisticas.append(fila_estadisticas)
                 
-                df_stats = pd.DataFrame(estadisticas)
-                mostrar_tabla_con_formato(df_stats, "📊 Estadísticas Descriptivas", formato_apa)
-            
-            with col2:
-                st.subheader("📈 Tendencias")
-                for estrategia in estrategias_clave:
-                    if estrategia in df_temporal.columns:
-                        nombre_limpio = estrategia.split('__')[1].replace('_', ' ').title() if '__' in estrategia else estrategia
-                        total_usos = df_temporal[estrategia].sum()
-                        tendencia = "📈" if df_temporal[estrategia].iloc[-1] > df_temporal[estrategia].iloc[0] else "📉"
+                        df_stats = pd.DataFrame(estadisticas)
+                        mostrar_tabla_con_formato(df_stats, "📊 Estadísticas Descriptivas", formato_apa)
+            
+                    with col2:
+                        st.subheader("📈 Tendencias")
+                        for estrategia in estrategias_clave:
+                            if estrategia in df_temporal.columns:
+                                serie = df_temporal[estrategia]
+                                tendencia = "📈" if serie.iloc[-1] > serie.iloc[0] else "📉"
                         
-                        st.metric(
-                            label=nombre_limpio,
-                            value=int(total_usos),
-                            delta=f"{tendencia} Tendencia"
-                        )
-        else:
-            st.info("No hay datos temporales suficientes para el análisis.")
-    else:
-        st.info("No se encontraron estrategias clave para el análisis temporal.")
+                                st.metric(
+                                    label=etiqueta_serie(estrategia),
+                                    value=int(serie.sum()) if es_conteo else redondear(serie.iloc[-1]),
+                                    delta=f"{tendencia} Tendencia"
+                                )
+                else:
+                    st.info("No hay datos temporales suficientes para el análisis.")
+            else:
+                st.info("No se encontraron estrategias clave para el análisis temporal.")
     
     # =====================================================
     # SECCIÓN 3: TABLA CRUZADA ENTRE VARIABLES
     # =====================================================
     
-    st.markdown('<div class="section-header">🔄 Análisis de Cruces entre Variables</div>', unsafe_allow_html=True)
+    with pestana_cruces:
+        if seccion_abierta(pestana_cruces):
+            st.markdown('<div class="section-header">🔄 Análisis de Cruces entre Variables</div>', unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("Seleccionar Variables para Cruce")
+            with col1:
+                st.subheader("Seleccionar Variables para Cruce")
         
-        # Filtrar variables con suficientes datos
-        variables_disponibles = [col for col in dummy_cols_filtradas if df_filtrado[col].sum() >= 3]
+                # Filtrar variables con suficientes datos
+                variables_disponibles = calcular_variables_cruce()
         
-        if len(variables_disponibles) >= 2:
-            var1 = st.selectbox(
-                "Variable 1:",
-                variables_disponibles,
-                format_func=lambda x: f"{x.split('__')[0].replace('_', ' ').title()} - {x.split('__')[1].replace('_', ' ').title()}" if '__' in x else x
-            )
+                if len(variables_disponibles) >= 2:
+                    var1 = st.selectbox(
+                        "Variable 1:",
+                        variables_disponibles,
+                        format_func=lambda x: f"{x.split('__')[0].replace('_', ' ').title()} - {x.split('__')[1].replace('_', ' ').title()}" if '__' in x else x,
+                        key="cruce_var1"
+                    )
             
-            var2 = st.selectbox(
-                "Variable 2:",
-                [v for v in variables_disponibles if v != var1],
-                format_func=lambda x: f"{x.split('__')[0].replace('_', ' ').title()} - {x.split('__')[1].replace('_', ' ').title()}" if '__' in x else x
-            )
+                    var2 = st.selectbox(
+                        "Variable 2:",
+                        [v for v in variables_disponibles if v != var1],
+                        format_func=lambda x: f"{x.split('__')[0].replace('_', ' ').title()} - {x.split('__')[1].replace('_', ' ').title()}" if '__' in x else x,
+                        key="cruce_var2"
+                    )
             
-            tipo_visualizacion = st.radio(
-                "Tipo de visualización:",
-                ["Heatmap", "Tabla interactiva", "Ambos"]
-            )
-        else:
-            st.warning("No hay suficientes variables con datos para realizar cruces.")
-            var1, var2 = None, None
+                    tipo_visualizacion = st.radio(
+                        "Tipo de visualización:",
+                        ["Heatmap", "Tabla interactiva", "Ambos"],
+                        key="cruce_tipo"
+                    )
+                else:
+                    st.warning("No hay suficientes variables con datos para realizar cruces.")
+                    var1, var2 = None, None
     
-    with col2:
-        if len(variables_disponibles) >= 2 and var1 and var2:
-            tabla, tabla_pct, chi2_stat, p_value = crear_tabla_cruzada(df_filtrado, var1, var2, formato_apa)
+            with col2:
+                if len(variables_disponibles) >= 2 and var1 and var2:
+                    tabla, tabla_pct, chi2_stat, p_value = calcular_cruce(var1, var2)
             
-            if tabla is not None:
-                st.subheader("Estadísticas del Cruce")
+                    if tabla is not None:
+                        st.subheader("Estadísticas del Cruce")
                 
-                # Mostrar estadísticas
-                total_casos = tabla.iloc[:-1, :-1].sum().sum()
-                st.metric("Total de casos analizados", int(total_casos))
+                        # Mostrar estadísticas
+                        total_casos = tabla.iloc[:-1, :-1].sum().sum()
+                        st.metric("Total de casos analizados", int(total_casos))
                 
-                if chi2_stat is not None:
-                    col_chi1, col_chi2 = st.columns(2)
-                    with col_chi1:
-                        st.metric("Chi-cuadrado", f"{chi2_stat:.3f}")
-                    with col_chi2:
-                        st.metric("Valor p", f"{p_value:.3f}")
+                        if chi2_stat is not None:
+                            col_chi1, col_chi2 = st.columns(2)
+                            with col_chi1:
+                                st.metric("Chi-cuadrado", f"{chi2_stat:.3f}")
+                            with col_chi2:
+                                st.metric("Valor p", f"{p_value:.3f}")
                 
-                # Mostrar tablas
-                if tipo_visualizacion in ["Tabla interactiva", "Ambos"]:
-                    mostrar_tabla_con_formato(tabla, "Tabla de Contingencia", formato_apa)
-                    mostrar_tabla_con_formato(tabla_pct, "Tabla de Porcentajes", formato_apa)
-                  # Mostrar heatmap
-                if tipo_visualizacion in ["Heatmap", "Ambos"]:
-                    # Configuración del heatmap
-                    col_heat1, col_heat2 = st.columns([3, 1])
-                    
-                    with col_heat2:
-                        tamaño_heatmap = st.selectbox(
-                            "📏 Tamaño del heatmap:",
-                            ["Normal", "Grande", "Extra Grande"],
-                            index=0,
-                            key="heatmap_size"
-                        )
-                        
-                        altura_heatmap = {
-                            "Normal": 500,
-                            "Grande": 700,
-                            "Extra Grande": 900
-                        }[tamaño_heatmap]
-                    
-                    with col_heat1:
-                        fig = px.imshow(
-                            tabla_pct.iloc[:-1, :-1],  # Excluir márgenes
-                            labels=dict(x="Variable 2", y="Variable 1", color="Porcentaje"),
-                            title="Heatmap de Porcentajes",
-                            height=altura_heatmap
-                        )
-                        fig.update_layout(
-                            title_x=0.5,
-                            margin=dict(l=150, r=50, t=80, b=50)
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Botón para vista expandida del heatmap
-                    if st.button("🔍 Ver heatmap en pantalla completa", key="heat_full"):
-                        fig_heat_full = px.imshow(
-                            tabla_pct.iloc[:-1, :-1],
-                            labels=dict(x="Variable 2", y="Variable 1", color="Porcentaje"),
-                            title="Heatmap de Porcentajes - Vista Expandida",
-                            height=800
-                        )
-                        fig_heat_full.update_layout(
-                            title_x=0.5,
-                            font=dict(size=14),
-                            margin=dict(l=200, r=100, t=100, b=100)
-                        )
-                        st.plotly_chart(fig_heat_full, use_container_width=True)
+                        # Mostrar tablas
+                        if tipo_visualizacion in ["Tabla interactiva", "Ambos"]:
+                            mostrar_tabla_con_formato(tabla, "Tabla de Contingencia", formato_apa)
+                            mostrar_tabla_con_formato(tabla_pct, "Tabla de Porcentajes", formato_apa)
+                          # Mostrar heatmap
+                        if tipo_visualizacion in ["Heatmap", "Ambos"]:
+                            mostrar_heatmap_cruce(tabla_pct)
+    
+            # Matriz de asociación de todos los pares en una sola llamada (X.T @ X)
+            if len(variables_disponibles) >= 2:
+                with st.expander("🧮 Matriz de asociación entre todas las variables (V de Cramér)", expanded=False):
+                    metodo_correccion = st.selectbox(
+                        "Corrección por comparaciones múltiples:",
+                        METODOS_CORRECCION,
+                        index=0,
+                        format_func=lambda m: {"fdr_bh": "Benjamini-Hochberg (FDR)", "holm": "Holm",
+                                               "bonferroni": "Bonferroni", "ninguno": "Ninguna"}[m],
+                        key="metodo_correccion_asociacion"
+                    )
+                    asociaciones = calcular_seccion(
+                        "asociaciones", (clave_filtro, metodo_correccion), calcular_asociaciones,
+                        (df_filtrado, variables_disponibles), {'metodo_correccion': metodo_correccion}
+                    )
+            
+                    etiquetas = [f"{x.split('__')[0].replace('_', ' ').title()} - {x.split('__')[1].replace('_', ' ').title()}"
+                                 if '__' in x else x for x in variables_disponibles]
+                    # Solo se colorean los pares significativos tras la corrección
+                    matriz_v = asociaciones['v_cramer'].where(asociaciones['p_ajustado'] < 0.05)
+                    fig_asociacion = px.imshow(
+                        matriz_v.to_numpy(),
+                        x=etiquetas,
+                        y=etiquetas,
+                        color_continuous_scale="Blues",
+                        zmin=0,
+                        zmax=1,
+                        labels=dict(color="V de Cramér"),
+                        title="V de Cramér de los pares significativos (p ajustado < 0,05)",
+                        height=max(500, 18 * len(etiquetas))
+                    )
+                    fig_asociacion.update_layout(title_x=0.5)
+                    st.plotly_chart(fig_asociacion, use_container_width=True)
+            
+                    pares = asociaciones['pares']
+                    pares_significativos = pares[pares['Significativo']].sort_values('V_Cramer', ascending=False)
+                    st.caption(f"{len(pares_significativos)} de {len(pares)} pares con asociación significativa. "
+                               "Chi-cuadrado con corrección de Yates; residuo estandarizado ajustado de la celda Sí/Sí.")
+                    mostrar_tabla_con_formato(pares_significativos.reset_index(drop=True),
+                                              "Pares con asociación significativa", formato_apa)
+    
       # =====================================================
     # SECCIÓN 4: ANÁLISIS DE PROPAGANDA
     # =====================================================
     
-    st.markdown('<div class="section-header">📢 Análisis de Técnicas de Propaganda</div>', unsafe_allow_html=True)
-    
-    # Configuración para análisis de propaganda
-    col_prop_config = st.columns([3, 1])
+    with pestana_propaganda:
+        if seccion_abierta(pestana_propaganda):
+            st.markdown('<div class="section-header">📢 Análisis de Técnicas de Propaganda</div>', unsafe_allow_html=True)
     
-    with col_prop_config[1]:
-        tamaño_propaganda = st.selectbox(
-            "📏 Tamaño del gráfico:",
-            ["Normal", "Grande", "Extra Grande"],
-            index=0,
-            key="prop_size"
-        )
-        
-        altura_propaganda = {
-            "Normal": 500,
-            "Grande": 700,
-            "Extra Grande": 900
-        }[tamaño_propaganda]
+            datos_propaganda = calcular_propaganda()
     
-    datos_propaganda = analisis_propaganda_candidatos(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
-    
-    if datos_propaganda is not None and len(datos_propaganda) > 0:
-        col1, col2 = st.columns(2)
+            if datos_propaganda is not None and len(datos_propaganda) > 0:
+                col1, col2 = st.columns(2)
         
-        with col1:
-            # Gráfico por candidato
-            fig = px.bar(
-                datos_propaganda,
-                x='Candidato',
-                y='Porcentaje',
-                color='Técnica',
-                title="Uso de Técnicas por Candidato (%)",
-                labels={'Porcentaje': 'Porcentaje de Posts (%)'},
-                height=altura_propaganda
-            )
-            fig.update_layout(
-                title_x=0.5,
-                margin=dict(l=50, r=50, t=80, b=100),
-                xaxis_tickangle=-45
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Botón para vista expandida
-            if st.button("🔍 Ver análisis de propaganda en pantalla completa", key="prop_full"):
-                fig_prop_full = px.bar(
-                    datos_propaganda,
-                    x='Candidato',
-                    y='Porcentaje',
-                    color='Técnica',
-                    title="Uso de Técnicas por Candidato (%) - Vista Expandida",
-                    labels={'Porcentaje': 'Porcentaje de Posts (%)'},
-                    height=800
-                )
-                fig_prop_full.update_layout(
-                    title_x=0.5,
-                    font=dict(size=14),
-                    margin=dict(l=80, r=80, t=100, b=120),
-                    xaxis_tickangle=-45
-                )
-                st.plotly_chart(fig_prop_full, use_container_width=True)
+                with col1:
+                    # Gráfico con tamaño ajustable (se recarga sin recalcular las técnicas)
+                    mostrar_grafico_propaganda(datos_propaganda)
         
-        with col2:
-            titulo_propaganda = "Técnicas de Propaganda por Candidato"
-            if variable_seleccionada != "Todas las variables":
-                titulo_propaganda += f" - {variable_seleccionada.replace('_', ' ').title()}"
+                with col2:
+                    titulo_propaganda = "Técnicas de Propaganda por Candidato"
+                    if variable_seleccionada != "Todas las variables":
+                        titulo_propaganda += f" - {variable_seleccionada.replace('_', ' ').title()}"
             
-            mostrar_tabla_con_formato(datos_propaganda.round(2), titulo_propaganda, formato_apa)
+                    mostrar_tabla_con_formato(datos_propaganda.round(2), titulo_propaganda, formato_apa)
             
-            # Tabla expandida
-            with st.expander("📋 Ver tabla expandida"):
-                st.dataframe(datos_propaganda.round(2), use_container_width=True, height=300)
-    else:
-        st.info("No se encontraron datos de técnicas de propaganda.")
+                    # Tabla expandida
+                    with st.expander("📋 Ver tabla expandida"):
+                        st.dataframe(datos_propaganda.round(2), use_container_width=True, height=300)
+            else:
+                st.info("No se encontraron datos de técnicas de propaganda.")
     
     # =====================================================
     # SECCIÓN 5: ANÁLISIS PLAIN-FOLKS
     # =====================================================
     
-    st.markdown('<div class="section-header">👥 Análisis Detallado: Estrategia Plain-Folks</div>', unsafe_allow_html=True)
+    with pestana_plain:
+        if seccion_abierta(pestana_plain):
+            st.markdown('<div class="section-header">👥 Análisis Detallado: Estrategia Plain-Folks</div>', unsafe_allow_html=True)
     
-    resultados_plain = analisis_plain_folks(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
+            resultados_plain = calcular_plain_folks()
     
-    if resultados_plain:
-        tab1, tab2 = st.tabs(["Por Candidato", "Detalles Contextuales"])
+            if resultados_plain:
+                tab1, tab2 = st.tabs(["Por Candidato", "Detalles Contextuales"])
         
-        with tab1:
-            if 'candidatos' in resultados_plain:
-                df_plain_cand = resultados_plain['candidatos']
+                with tab1:
+                    if 'candidatos' in resultados_plain:
+                        df_plain_cand = resultados_plain['candidatos']
                 
-                col1, col2 = st.columns(2)
+                        col1, col2 = st.columns(2)
                 
-                with col1:
-                    fig = px.bar(
-                        df_plain_cand,
-                        x='Candidato',
-                        y='Porcentaje',
-                        title="Uso de Estrategia Plain-Folks por Candidato",                        labels={'Porcentaje': 'Porcentaje de Posts (%)'}
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                        with col1:
+                            fig = px.bar(
+                                df_plain_cand,
+                                x='Candidato',
+                                y='Porcentaje',
+                                title="Uso de Estrategia Plain-Folks por Candidato",                        labels={'Porcentaje': 'Porcentaje de Posts (%)'}
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
                 
-                with col2:
-                    titulo_plain = "Plain-Folks por Candidato"
-                    if variable_seleccionada != "Todas las variables":
-                        titulo_plain += f" - {variable_seleccionada.replace('_', ' ').title()}"
+                        with col2:
+                            titulo_plain = "Plain-Folks por Candidato"
+                            if variable_seleccionada != "Todas las variables":
+                                titulo_plain += f" - {variable_seleccionada.replace('_', ' ').title()}"
                     
-                    mostrar_tabla_con_formato(df_plain_cand.round(2), titulo_plain, formato_apa)
+                            mostrar_tabla_con_formato(df_plain_cand.round(2), titulo_plain, formato_apa)
         
-        with tab2:
-            contextos_encontrados = [k for k in resultados_plain.keys() if k.startswith('contexto_')]
+                with tab2:
+                    contextos_encontrados = [k for k in resultados_plain.keys() if k.startswith('contexto_')]
             
-            if contextos_encontrados:
-                for contexto_key in contextos_encontrados[:3]:  # Máximo 3 contextos
-                    contexto_nombre = contexto_key.replace('contexto_', '')
-                    titulo_contexto = f"Plain-Folks en {contexto_nombre}"
+                    if contextos_encontrados:
+                        for contexto_key in contextos_encontrados[:3]:  # Máximo 3 contextos
+                            contexto_nombre = contexto_key.replace('contexto_', '')
+                            titulo_contexto = f"Plain-Folks en {contexto_nombre}"
                     
-                    tabla_contexto = resultados_plain[contexto_key]
-                    mostrar_tabla_con_formato(tabla_contexto, titulo_contexto, formato_apa)
+                            tabla_contexto = resultados_plain[contexto_key]
+                            mostrar_tabla_con_formato(tabla_contexto, titulo_contexto, formato_apa)
+                    else:
+                        st.info("No se encontraron datos de contexto para Plain-Folks.")
             else:
-                st.info("No se encontraron datos de contexto para Plain-Folks.")
-    else:
-        st.info("No se encontraron datos de la estrategia Plain-Folks.")
+                st.info("No se encontraron datos de la estrategia Plain-Folks.")
     
     # =====================================================
     # SECCIÓN 6: ANÁLISIS PLAIN-FOLKS POR CONTEXTO Y CAMPAÑA
     # =====================================================
     
-    st.markdown('<div class="section-header">🍀 Análisis Plain-folks por Contexto y Campaña</div>', unsafe_allow_html=True)
-    
-    with st.expander("ℹ️ ¿Qué muestra este análisis?", expanded=False):
-        st.write("""
-        **Análisis detallado del uso del recurso Plain-folks según el contexto de la imagen y la campaña:**
-        - Muestra el porcentaje de publicaciones que utilizan Plain-folks en cada contexto
-        - Compara el uso entre diferentes candidatos
-        - Analiza la efectividad del recurso según el escenario
-        """)
-    
-    resultados_plain_contexto = analisis_plain_folks_por_contexto(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
-    
-    if resultados_plain_contexto and 'plain_folks_contexto' in resultados_plain_contexto:
-        df_plain_contexto = resultados_plain_contexto['plain_folks_contexto']
-        
-        if not df_plain_contexto.empty:            # Opciones de visualización
-            col_size6, col_download6 = st.columns([3, 1])
-            
-            with col_size6:
-                tamano_tabla6 = st.selectbox(
-                    "📏 Tamaño de tabla:",
-                    ["Normal", "Compacta", "Expandida"],
-                    key="tamano_plain_contexto"
-                )
-                
-            with col_download6:
-                if st.button("📥 Exportar datos", use_container_width=True, key="download_plain_contexto"):
-                    excel_data = exportar_a_excel(
-                        {"Plain_Folks_Contexto": df_plain_contexto},
-                        "plain_folks_contexto"
-                    )
-                    st.download_button(
-                        label="📎 Descargar Excel",
-                        data=excel_data,
-                        file_name=f"plain_folks_contexto_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.ms-excel",
-                        use_container_width=True
-                    )
-            
-            # Mostrar tabla
-            st.markdown("### 📊 Uso del recurso Plain-folks según contexto y campaña")
-            
-            if formato_apa:
-                tabla_apa6 = aplicar_formato_apa_dataframe(df_plain_contexto, 
-                    "Tabla: Uso del recurso Plain-folks según contexto y campaña")
-                st.markdown(tabla_apa6, unsafe_allow_html=True)
-            else:
-                if tamano_tabla6 == "Compacta":
-                    st.dataframe(df_plain_contexto, use_container_width=True, height=300)
-                elif tamano_tabla6 == "Expandida":
-                    st.dataframe(df_plain_contexto, use_container_width=True, height=600)
+    with pestana_plain_contexto:
+        if seccion_abierta(pestana_plain_contexto):
+            st.markdown('<div class="section-header">🍀 Análisis Plain-folks por Contexto y Campaña</div>', unsafe_allow_html=True)
+    
+            with st.expander("ℹ️ ¿Qué muestra este análisis?", expanded=False):
+                st.write("""
+                **Análisis detallado del uso del recurso Plain-folks según el contexto de la imagen y la campaña:**
+                - Muestra el porcentaje de publicaciones que utilizan Plain-folks en cada contexto
+                - Compara el uso entre diferentes candidatos
+                - Analiza la efectividad del recurso según el escenario
+                """)
+    
+            resultados_plain_contexto = calcular_plain_folks_contexto()
+    
+            if resultados_plain_contexto and 'plain_folks_contexto' in resultados_plain_contexto:
+                df_plain_contexto = resultados_plain_contexto['plain_folks_contexto']
+        
+                if not df_plain_contexto.empty:            # Opciones de visualización
+                    col_download6 = st.columns([3, 1])[1]
+            
+                    with col_download6:
+                        if st.button("📥 Exportar datos", use_container_width=True, key="download_plain_contexto"):
+                            excel_data = exportar_a_excel(
+                                {"Plain_Folks_Contexto": df_plain_contexto},
+                                "plain_folks_contexto"
+                            )
+                            st.download_button(
+                                label="📎 Descargar Excel",
+                                data=excel_data,
+                                file_name=f"plain_folks_contexto_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                                mime="application/vnd.ms-excel",
+                                use_container_width=True
+                            )
+            
+                    # Tabla con tamaño ajustable (se recarga sin recalcular el análisis)
+                    mostrar_tabla_dimensionable(df_plain_contexto, "📊 Uso del recurso Plain-folks según contexto y campaña",
+                                                "Tabla: Uso del recurso Plain-folks según contexto y campaña", formato_apa, "tamano_plain_contexto")
+            
+                    # Visualización
+                    figs_plain_contexto = crear_visualizacion_avanzada(df_filtrado, "plain_folks_contexto", datos=df_plain_contexto)
+            
+                    if 'plain_folks_contexto' in figs_plain_contexto:
+                        # Altura y pantalla completa ajustables (solo se recarga el gráfico)
+                        mostrar_grafico_dimensionable(figs_plain_contexto['plain_folks_contexto'], [400, 500, 600, 700, 800], 1,
+                                                      "altura_plain_contexto", "fullscreen_plain_contexto")
                 else:
-                    st.dataframe(df_plain_contexto, use_container_width=True)
-            
-            # Visualización
-            figs_plain_contexto = crear_visualizacion_avanzada(df_filtrado, "plain_folks_contexto", datos=df_plain_contexto)
-            
-            if 'plain_folks_contexto' in figs_plain_contexto:
-                col_graf6, col_config6 = st.columns([4, 1])
-                
-                with col_config6:
-                    altura_graf6 = st.selectbox(
-                        "📐 Altura del gráfico:",
-                        [400, 500, 600, 700, 800],
-                        index=1,
-                        key="altura_plain_contexto"
-                    )
-                    
-                    pantalla_completa6 = st.checkbox(
-                        "🖥️ Modo pantalla completa",
-                        key="fullscreen_plain_contexto"
-                    )
-                
-                with col_graf6:
-                    fig_plain_contexto = figs_plain_contexto['plain_folks_contexto']
-                    fig_plain_contexto.update_layout(height=altura_graf6)
-                    
-                    if pantalla_completa6:
-                        st.plotly_chart(fig_plain_contexto, use_container_width=True, height=altura_graf6, config={
-                            'displayModeBar': True,
-                            'displaylogo': False,
-                            'modeBarButtonsToAdd': ['pan2d', 'select2d', 'lasso2d', 'autoScale2d', 'resetScale2d']
-                        })
-                    else:
-                        st.plotly_chart(fig_plain_contexto, use_container_width=True)
-        else:
-            st.info("No se encontraron datos para el análisis de Plain-folks por contexto.")
-    else:
-        st.info("No se encontraron datos suficientes para este análisis.")
+                    st.info("No se encontraron datos para el análisis de Plain-folks por contexto.")
+            else:
+                st.info("No se encontraron datos suficientes para este análisis.")
     
     # =====================================================
     # SECCIÓN 7: DISTRIBUCIÓN GENERAL DE RECURSOS IPA
     # =====================================================
     
-    st.markdown('<div class="section-header">📊 Distribución General de Recursos de Propaganda (IPA)</div>', unsafe_allow_html=True)
-    
-    with st.expander("ℹ️ ¿Qué muestra este análisis?", expanded=False):
-        st.write("""
-        **Análisis de la distribución de los 7 recursos principales de propaganda según el IPA:**
-        - Name-calling, Glittering generalities, Transfer, Testimonial, Plain folks, Card-stacking, Bandwagon
-        - Compara el uso de cada recurso entre candidatos
-        - Ideal para comparar el estilo comunicativo general
-        """)
-    
-    resultados_ipa = analisis_distribucion_propaganda_ipa(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
-    
-    if resultados_ipa and 'distribucion_ipa' in resultados_ipa:
-        df_ipa = resultados_ipa['distribucion_ipa']
-        
-        if not df_ipa.empty:            # Opciones de visualización
-            col_size7, col_download7 = st.columns([3, 1])
-            
-            with col_size7:
-                tamano_tabla7 = st.selectbox(
-                    "📏 Tamaño de tabla:",
-                    ["Normal", "Compacta", "Expandida"],
-                    key="tamano_ipa"
-                )
-                
-            with col_download7:
-                if st.button("📥 Exportar datos", use_container_width=True, key="download_ipa"):
-                    excel_data = exportar_a_excel(
-                        {"Distribucion_IPA": df_ipa},
-                        "distribucion_recursos_ipa"
-                    )
-                    st.download_button(
-                        label="📎 Descargar Excel",
-                        data=excel_data,
-                        file_name=f"distribucion_ipa_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.ms-excel",
-                        use_container_width=True
-                    )
-            
-            # Mostrar tabla
-            st.markdown("### 📊 Distribución general de recursos de propaganda (IPA)")
-            
-            if formato_apa:
-                tabla_apa7 = aplicar_formato_apa_dataframe(df_ipa, 
-                    "Tabla: Distribución general de recursos de propaganda (IPA)")
-                st.markdown(tabla_apa7, unsafe_allow_html=True)
-            else:
-                if tamano_tabla7 == "Compacta":
-                    st.dataframe(df_ipa, use_container_width=True, height=300)
-                elif tamano_tabla7 == "Expandida":
-                    st.dataframe(df_ipa, use_container_width=True, height=600)
+    with pestana_ipa:
+        if seccion_abierta(pestana_ipa):
+            st.markdown('<div class="section-header">📊 Distribución General de Recursos de Propaganda (IPA)</div>', unsafe_allow_html=True)
+    
+            with st.expander("ℹ️ ¿Qué muestra este análisis?", expanded=False):
+                st.write("""
+                **Análisis de la distribución de los 7 recursos principales de propaganda según el IPA:**
+                - Name-calling, Glittering generalities, Transfer, Testimonial, Plain folks, Card-stacking, Bandwagon
+                - Compara el uso de cada recurso entre candidatos
+                - Ideal para comparar el estilo comunicativo general
+                """)
+    
+            resultados_ipa = calcular_ipa()
+    
+            if resultados_ipa and 'distribucion_ipa' in resultados_ipa:
+                df_ipa = resultados_ipa['distribucion_ipa']
+        
+                if not df_ipa.empty:            # Opciones de visualización
+                    col_download7 = st.columns([3, 1])[1]
+            
+                    with col_download7:
+                        if st.button("📥 Exportar datos", use_container_width=True, key="download_ipa"):
+                            excel_data = exportar_a_excel(
+                                {"Distribucion_IPA": df_ipa},
+                                "distribucion_recursos_ipa"
+                            )
+                            st.download_button(
+                                label="📎 Descargar Excel",
+                                data=excel_data,
+                                file_name=f"distribucion_ipa_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                                mime="application/vnd.ms-excel",
+                                use_container_width=True
+                            )
+            
+                    # Tabla con tamaño ajustable (se recarga sin recalcular el análisis)
+                    mostrar_tabla_dimensionable(df_ipa, "📊 Distribución general de recursos de propaganda (IPA)",
+                                                "Tabla: Distribución general de recursos de propaganda (IPA)", formato_apa, "tamano_ipa")
+            
+                    # Visualización
+                    figs_ipa = crear_visualizacion_avanzada(df_filtrado, "distribucion_ipa", datos=df_ipa)
+            
+                    if 'distribucion_ipa' in figs_ipa:
+                        # Altura y pantalla completa ajustables (solo se recarga el gráfico)
+                        mostrar_grafico_dimensionable(figs_ipa['distribucion_ipa'], [500, 600, 700, 800, 900], 1,
+                                                      "altura_ipa", "fullscreen_ipa")
                 else:
-                    st.dataframe(df_ipa, use_container_width=True)
-            
-            # Visualización
-            figs_ipa = crear_visualizacion_avanzada(df_filtrado, "distribucion_ipa", datos=df_ipa)
-            
-            if 'distribucion_ipa' in figs_ipa:
-                col_graf7, col_config7 = st.columns([4, 1])
-                
-                with col_config7:
-                    altura_graf7 = st.selectbox(
-                        "📐 Altura del gráfico:",
-                        [500, 600, 700, 800, 900],
-                        index=1,
-                        key="altura_ipa"
-                    )
-                    
-                    pantalla_completa7 = st.checkbox(
-                        "🖥️ Modo pantalla completa",
-                        key="fullscreen_ipa"
-                    )
-                
-                with col_graf7:
-                    fig_ipa = figs_ipa['distribucion_ipa']
-                    fig_ipa.update_layout(height=altura_graf7)
-                    
-                    if pantalla_completa7:
-                        st.plotly_chart(fig_ipa, use_container_width=True, height=altura_graf7, config={
-                            'displayModeBar': True,
-                            'displaylogo': False,
-                            'modeBarButtonsToAdd': ['pan2d', 'select2d', 'lasso2d', 'autoScale2d', 'resetScale2d']
-                        })
-                    else:
-                        st.plotly_chart(fig_ipa, use_container_width=True)
-        else:
-            st.info("No se encontraron datos para el análisis de distribución IPA.")
-    else:
-        st.info("No se encontraron datos suficientes para este análisis.")
+                    st.info("No se encontraron datos para el análisis de distribución IPA.")
+            else:
+                st.info("No se encontraron datos suficientes para este análisis.")
     
     # =====================================================
     # SECCIÓN 8: CRUCE ENTRE REGLAS DE PROPAGANDA Y CONTEXTO
     # =====================================================
     
-    st.markdown('<div class="section-header">✅ Cruce entre Reglas de Propaganda y Contexto de la Imagen</div>', unsafe_allow_html=True)
-    
-    with st.expander("ℹ️ ¿Por qué es importante este análisis?", expanded=False):
-        st.write("""
-        **Análisis que revela la efectividad contextual de las reglas de propaganda:**
-        - Identifica qué reglas se activan en entornos más personales, profesionales o públicos
-        - Proporciona una lectura del tono propagandístico según el marco escénico
-        - Ayuda a entender la estrategia comunicativa contextual
-        """)
-    
-    resultados_cruce = analisis_cruce_reglas_contexto(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
-    
-    if resultados_cruce and 'cruce_reglas_contexto' in resultados_cruce:
-        df_cruce = resultados_cruce['cruce_reglas_contexto']
-        
-        if not df_cruce.empty:            # Opciones de visualización
-            col_size8, col_download8 = st.columns([3, 1])
-            
-            with col_size8:
-                tamano_tabla8 = st.selectbox(
-                    "📏 Tamaño de tabla:",
-                    ["Normal", "Compacta", "Expandida"],
-                    key="tamano_cruce"
-                )
-                
-            with col_download8:
-                if st.button("📥 Exportar datos", use_container_width=True, key="download_cruce"):
-                    excel_data = exportar_a_excel(
-                        {"Cruce_Reglas_Contexto": df_cruce},
-                        "cruce_reglas_contexto"
-                    )
-                    st.download_button(
-                        label="📎 Descargar Excel",
-                        data=excel_data,
-                        file_name=f"cruce_reglas_contexto_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.ms-excel",
-                        use_container_width=True
-                    )
-            
-            # Mostrar tabla
-            st.markdown("### ✅ Cruce entre reglas de propaganda y contexto de la imagen")
-            
-            if formato_apa:
-                tabla_apa8 = aplicar_formato_apa_dataframe(df_cruce, 
-                    "Tabla: Cruce entre reglas de propaganda y contexto de la imagen")
-                st.markdown(tabla_apa8, unsafe_allow_html=True)
-            else:
-                if tamano_tabla8 == "Compacta":
-                    st.dataframe(df_cruce, use_container_width=True, height=300)
-                elif tamano_tabla8 == "Expandida":
-                    st.dataframe(df_cruce, use_container_width=True, height=600)
+    with pestana_reglas_contexto:
+        if seccion_abierta(pestana_reglas_contexto):
+            st.markdown('<div class="section-header">✅ Cruce entre Reglas de Propaganda y Contexto de la Imagen</div>', unsafe_allow_html=True)
+    
+            with st.expander("ℹ️ ¿Por qué es importante este análisis?", expanded=False):
+                st.write("""
+                **Análisis que revela la efectividad contextual de las reglas de propaganda:**
+                - Identifica qué reglas se activan en entornos más personales, profesionales o públicos
+                - Proporciona una lectura del tono propagandístico según el marco escénico
+                - Ayuda a entender la estrategia comunicativa contextual
+                """)
+    
+            resultados_cruce = calcular_cruce_reglas_contexto()
+    
+            if resultados_cruce and 'cruce_reglas_contexto' in resultados_cruce:
+                df_cruce = resultados_cruce['cruce_reglas_contexto']
+        
+                if not df_cruce.empty:            # Opciones de visualización
+                    col_download8 = st.columns([3, 1])[1]
+            
+                    with col_download8:
+                        if st.button("📥 Exportar datos", use_container_width=True, key="download_cruce"):
+                            excel_data = exportar_a_excel(
+                                {"Cruce_Reglas_Contexto": df_cruce},
+                                "cruce_reglas_contexto"
+                            )
+                            st.download_button(
+                                label="📎 Descargar Excel",
+                                data=excel_data,
+                                file_name=f"cruce_reglas_contexto_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                                mime="application/vnd.ms-excel",
+                                use_container_width=True
+                            )
+            
+                    # Tabla con tamaño ajustable (se recarga sin recalcular el análisis)
+                    mostrar_tabla_dimensionable(df_cruce, "✅ Cruce entre reglas de propaganda y contexto de la imagen",
+                                                "Tabla: Cruce entre reglas de propaganda y contexto de la imagen", formato_apa, "tamano_cruce")
                 else:
-                    st.dataframe(df_cruce, use_container_width=True)
-        else:
-            st.info("No se encontraron datos para el análisis de cruce reglas-contexto.")
-    else:
-        st.info("No se encontraron datos suficientes para este análisis.")
+                    st.info("No se encontraron datos para el análisis de cruce reglas-contexto.")
+            else:
+                st.info("No se encontraron datos suficientes para este análisis.")
     
     # =====================================================
     # SECCIÓN 9: APARICIÓN DEL LÍDER SEGÚN CONTEXTO
     # =====================================================
     
-    st.markdown('<div class="section-header">📊 Aparición del Líder según Contexto y Campaña</div>', unsafe_allow_html=True)
-    
-    with st.expander("ℹ️ ¿Qué analiza esta tabla?", expanded=False):
-        st.write("""
-        **Variables cruzadas:**
-        - Aparición del líder
-        - Contexto de la imagen  
-        - Aparición de terceras personas
-        
-        **Análisis de presencia del líder en diferentes contextos y su acompañamiento.**
-        """)
+    with pestana_lider:
+        if seccion_abierta(pestana_lider):
+            st.markdown('<div class="section-header">📊 Aparición del Líder según Contexto y Campaña</div>', unsafe_allow_html=True)
+    
+            with st.expander("ℹ️ ¿Qué analiza esta tabla?", expanded=False):
+                st.write("""
+                **Variables cruzadas:**
+                - Aparición del líder
+                - Contexto de la imagen  
+                - Aparición de terceras personas
+        
+                **Análisis de presencia del líder en diferentes contextos y su acompañamiento.**
+                """)
+    
+            resultados_lider = calcular_lider()
+    
+            if resultados_lider and 'aparicion_lider' in resultados_lider:
+                df_lider = resultados_lider['aparicion_lider']
+        
+                if not df_lider.empty:            # Opciones de visualización
+                    col_download9 = st.columns([3, 1])[1]
+            
+                    with col_download9:
+                        if st.button("📥 Exportar datos", use_container_width=True, key="download_lider"):
+                            excel_data = exportar_a_excel(
+                                {"Aparicion_Lider": df_lider},
+                                "aparicion_lider_contexto"
+                            )
+                            st.download_button(
+                                label="📎 Descargar Excel",
+                                data=excel_data,
+                                file_name=f"aparicion_lider_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                                mime="application/vnd.ms-excel",
+                                use_container_width=True
+                            )
+            
+                    # Tabla con tamaño ajustable (se recarga sin recalcular el análisis)
+                    mostrar_tabla_dimensionable(df_lider, "📊 Aparición del líder según contexto y campaña",
+                                                "Tabla: Aparición del líder según contexto y campaña", formato_apa, "tamano_lider")
+                else:
+                    st.info("No se encontraron datos para el análisis de aparición del líder.")
+            else:
+                st.info("No se encontraron datos suficientes para este análisis.")
     
-    resultados_lider = analisis_aparicion_lider(df_filtrado, dummy_cols_filtradas, variable_seleccionada, formato_apa)
+    # =====================================================
+    # COMBINACIONES DE ESTRATEGIAS (REGLAS DE ASOCIACIÓN)
+    # =====================================================
     
-    if resultados_lider and 'aparicion_lider' in resultados_lider:
-        df_lider = resultados_lider['aparicion_lider']
+    with pestana_combinaciones:
+        if seccion_abierta(pestana_combinaciones):
+            st.markdown('<div class="section-header">🧩 Combinaciones de Estrategias (Reglas de Asociación)</div>', unsafe_allow_html=True)
+    
+            with st.expander("ℹ️ ¿Qué analiza esta sección?", expanded=False):
+                st.write("""
+                **Combinaciones de categorías que aparecen juntas en las publicaciones de cada candidato.**
+                - **Soporte**: proporción de publicaciones del candidato con todas las categorías de la regla
+                - **Confianza**: proporción de publicaciones con el antecedente que también tienen el consecuente
+                - **Lift**: cuántas veces más frecuente es el consecuente cuando aparece el antecedente (> 1 = se refuerzan)
+                """)
+    
+            col_soporte, col_confianza, col_lift, col_longitud = st.columns(4)
+            with col_soporte:
+                soporte_minimo = st.slider("Soporte mínimo:", 0.01, 0.50, 0.10, 0.01, key="soporte_reglas")
+            with col_confianza:
+                confianza_minima = st.slider("Confianza mínima:", 0.10, 1.00, 0.60, 0.05, key="confianza_reglas")
+            with col_lift:
+                lift_minimo = st.slider("Lift mínimo:", 1.00, 5.00, 1.10, 0.05, key="lift_reglas")
+            with col_longitud:
+                max_longitud = st.selectbox("Categorías por combinación:", [2, 3, 4], index=1, key="longitud_reglas")
+    
+            resultados_reglas = calcular_reglas(soporte_minimo, confianza_minima, lift_minimo, max_longitud)
+            df_reglas_vista = vista_reglas(resultados_reglas['reglas'])
+    
+            if not df_reglas_vista.empty:
+                col_info_reglas, col_download_reglas = st.columns([3, 1])
+                with col_info_reglas:
+                    itemsets = resultados_reglas['itemsets']
+                    st.caption(f"{len(df_reglas_vista)} reglas a partir de {int((itemsets['Longitud'] >= 2).sum())} "
+                               "combinaciones frecuentes de dos o más categorías "
+                               "(se muestran las 50 de mayor lift por candidato; la exportación incluye todas).")
+                with col_download_reglas:
+                    if st.button("📥 Exportar datos", use_container_width=True, key="download_reglas"):
+                        excel_data = exportar_a_excel(
+                            {"Reglas_Asociacion": df_reglas_vista},
+                            "reglas_asociacion"
+                        )
+                        st.download_button(
+                            label="📎 Descargar Excel",
+                            data=excel_data,
+                            file_name=f"reglas_asociacion_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                            mime="application/vnd.ms-excel",
+                            use_container_width=True
+                        )
         
-        if not df_lider.empty:            # Opciones de visualización
-            col_size9, col_download9 = st.columns([3, 1])
-            
-            with col_size9:
-                tamano_tabla9 = st.selectbox(
-                    "📏 Tamaño de tabla:",
-                    ["Normal", "Compacta", "Expandida"],
-                    key="tamano_lider"
-                )
-                
-            with col_download9:
-                if st.button("📥 Exportar datos", use_container_width=True, key="download_lider"):
-                    excel_data = exportar_a_excel(
-                        {"Aparicion_Lider": df_lider},
-                        "aparicion_lider_contexto"
-                    )
-                    st.download_button(
-                        label="📎 Descargar Excel",
-                        data=excel_data,
-                        file_name=f"aparicion_lider_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.ms-excel",
-                        use_container_width=True
-                    )
-            
-            # Mostrar tabla
-            st.markdown("### 📊 Aparición del líder según contexto y campaña")
-            
-            if formato_apa:
-                tabla_apa9 = aplicar_formato_apa_dataframe(df_lider, 
-                    "Tabla: Aparición del líder según contexto y campaña")
-                st.markdown(tabla_apa9, unsafe_allow_html=True)
+                for candidato_reglas, reglas_candidato in df_reglas_vista.groupby('Candidato', sort=False):
+                    st.markdown(f"### 🧩 {candidato_reglas}")
+                    mostrar_tabla_con_formato(reglas_candidato.drop(columns='Candidato').head(50).reset_index(drop=True),
+                                              f"Reglas de asociación - {candidato_reglas}", formato_apa)
             else:
-                if tamano_tabla9 == "Compacta":
-                    st.dataframe(df_lider, use_container_width=True, height=300)
-                elif tamano_tabla9 == "Expandida":
-                    st.dataframe(df_lider, use_container_width=True, height=600)
-                else:
-                    st.dataframe(df_lider, use_container_width=True)
-        else:
-            st.info("No se encontraron datos para el análisis de aparición del líder.")
-    else:
-        st.info("No se encontraron datos suficientes para este análisis.")
+                st.info("Ninguna combinación de categorías supera los umbrales seleccionados.")
     
     # =====================================================
     # SECCIÓN 10: EXPORTACIÓN DE DATOS
@@ -2813,7 +3089,9 @@ def main():
     
     with col1:
         if st.button("📥 Exportar Top Categorías", use_container_width=True):
-            if 'df_top' in locals() and len(df_top) > 0:
+            df_top = calcular_ranking(st.session_state.get("ranking_n_top", 10),
+                                      st.session_state.get("ranking_por_candidato", True))
+            if len(df_top) > 0:
                 excel_data = exportar_a_excel(
                     {"Top_Categorias": df_top},
                     "top_categorias_campana"
@@ -2828,7 +3106,8 @@ def main():
     
     with col2:
         if st.button("📥 Exportar Tabla Cruzada", use_container_width=True):
-            if 'tabla' in locals() and tabla is not None:
+            tabla, tabla_pct, _, _ = calcular_cruce(*seleccion_cruce())
+            if tabla is not None:
                 excel_data = exportar_a_excel(
                     {
                         "Tabla_Contingencia": tabla,
@@ -2846,7 +3125,8 @@ def main():
     
     with col3:
         if st.button("📥 Exportar Análisis Propaganda", use_container_width=True):
-            if 'datos_propaganda' in locals() and datos_propaganda is not None:
+            datos_propaganda = calcular_propaganda()
+            if datos_propaganda is not None:
                 excel_data = exportar_a_excel(
                     {"Propaganda_Candidatos": datos_propaganda},
                     "propaganda_campana"
@@ -2861,31 +3141,55 @@ def main():
     
     # Botón para exportar todo
     st.markdown("---")
+    formatos_completo = {"Excel (.xlsx)": 'xlsx', "CSV (.zip)": 'csv', "Parquet (.zip)": 'parquet'}
+    etiqueta_formato = st.radio("Formato del análisis completo:", list(formatos_completo),
+                                horizontal=True, key="formato_exportacion")
     if st.button("📦 Exportar Análisis Completo", use_container_width=True):
         dataframes_completo = {}
         
-        if 'df_top' in locals() and len(df_top) > 0:
+        # Cada tabla con los controles actuales de su pestaña (de la caché si ya se abrió)
+        df_top = calcular_ranking(st.session_state.get("ranking_n_top", 10),
+                                  st.session_state.get("ranking_por_candidato", True))
+        if len(df_top) > 0:
             dataframes_completo["Top_Categorias"] = df_top
         
-        if 'tabla' in locals() and tabla is not None:
+        tabla, tabla_pct, _, _ = calcular_cruce(*seleccion_cruce())
+        if tabla is not None:
             dataframes_completo["Tabla_Contingencia"] = tabla
             dataframes_completo["Tabla_Porcentajes"] = tabla_pct
         
-        if 'datos_propaganda' in locals() and datos_propaganda is not None:
+        datos_propaganda = calcular_propaganda()
+        if datos_propaganda is not None:
             dataframes_completo["Propaganda"] = datos_propaganda
         
-        if 'df_temporal' in locals() and len(df_temporal) > 0:
+        df_temporal = calcular_temporal()[0]
+        if df_temporal is not None and len(df_temporal) > 0:
             dataframes_completo["Evolucion_Temporal"] = df_temporal
         
+        df_reglas_vista = vista_reglas(calcular_reglas(
+            st.session_state.get("soporte_reglas", SOPORTE_MINIMO),
+            st.session_state.get("confianza_reglas", CONFIANZA_MINIMA),
+            st.session_state.get("lift_reglas", LIFT_MINIMO),
+            st.session_state.get("longitud_reglas", MAX_LONGITUD)
+        )['reglas'])
+        if len(df_reglas_vista) > 0:
+            dataframes_completo["Reglas_Asociacion"] = df_reglas_vista
+        
         if dataframes_completo:
-            excel_data = exportar_a_excel(dataframes_completo, "analisis_completo_campana")
-            
-            st.download_button(
-                label="Descargar Excel - Análisis Completo",
-                data=excel_data,
-                file_name="analisis_completo_campana.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            formato = formatos_completo[etiqueta_formato]
+            extension, mime = FORMATOS_EXPORTACION[formato]
+            try:
+                with medir(f"exportar_tablas ({formato})", filas=contar_filas(dataframes_completo)):
+                    datos_exportados = exportar_tablas(dataframes_completo, formato)
+            except ImportError as e:
+                st.error(f"No se pudo exportar: {e}")
+            else:
+                st.download_button(
+                    label=f"Descargar {etiqueta_formato} - Análisis Completo",
+                    data=datos_exportados,
+                    file_name=f"analisis_completo_campana{extension}",
+                    mime=mime
+                )
         else:
             st.warning("No hay datos para exportar.")
     
@@ -2900,41 +3204,59 @@ def main():
             # Solo exportar si el modo claro está activado (para mantener estándares APA)
             if not modo_oscuro:
                 dataframes_apa = {}
+                graficos_apa = {}
                 
-                # Recopilar todas las tablas disponibles
-                if 'df_top' in locals() and len(df_top) > 0:
-                    dataframes_apa["Top Categorías de Estrategias"] = df_top
-                
-                if 'tabla' in locals() and tabla is not None:
-                    dataframes_apa["Tabla de Contingencia"] = tabla
-                    dataframes_apa["Tabla de Porcentajes"] = tabla_pct
-                
-                if 'datos_propaganda' in locals() and datos_propaganda is not None:
-                    dataframes_apa["Análisis por Candidato"] = datos_propaganda
-                
-                if 'df_temporal' in locals() and len(df_temporal) > 0:
-                    dataframes_apa["Evolución Temporal"] = df_temporal
-                
-                if 'df_plain_cand' in locals() and len(df_plain_cand) > 0:
-                    dataframes_apa["Análisis Plain Folks por Candidato"] = df_plain_cand
+                # Todas las secciones con los controles actuales de su pestaña (de la caché si ya se abrió)
+                n_top_apa = st.session_state.get("ranking_n_top", 10)
+                por_candidato_apa = st.session_state.get("ranking_por_candidato", True)
+                df_top_apa = calcular_ranking(n_top_apa, por_candidato_apa)
+                if len(df_top_apa) > 0:
+                    dataframes_apa["Top Categorías de Estrategias"] = df_top_apa
+                    titulo_ranking_apa = f"Top {n_top_apa} Categorías"
+                    if variable_seleccionada != "Todas las variables":
+                        titulo_ranking_apa += f" - {variable_seleccionada.replace('_', ' ').title()}"
+                    graficos_apa["Top Categorías de Estrategias"] = figura_ranking(df_top_apa, titulo_ranking_apa,
+                                                                                   por_candidato_apa)
                 
-                # Nuevas tablas agregadas
-                if 'df_plain_contexto' in locals() and len(df_plain_contexto) > 0:
-                    dataframes_apa["Plain-folks por Contexto y Campaña"] = df_plain_contexto
+                tabla_apa, tabla_pct_apa, _, _ = calcular_cruce(*seleccion_cruce())
+                if tabla_apa is not None:
+                    dataframes_apa["Tabla de Contingencia"] = tabla_apa
+                    dataframes_apa["Tabla de Porcentajes"] = tabla_pct_apa
+                    graficos_apa["Heatmap de Porcentajes"] = figura_heatmap(tabla_pct_apa)
                 
-                if 'df_ipa' in locals() and len(df_ipa) > 0:
-                    dataframes_apa["Distribución de Recursos IPA"] = df_ipa
+                propaganda_apa = calcular_propaganda()
+                if propaganda_apa is not None:
+                    dataframes_apa["Análisis por Candidato"] = propaganda_apa
+                    graficos_apa["Uso de Técnicas por Candidato"] = figura_propaganda(propaganda_apa)
                 
-                if 'df_cruce' in locals() and len(df_cruce) > 0:
-                    dataframes_apa["Cruce Reglas-Contexto"] = df_cruce
+                df_temporal_apa, estrategias_apa = calcular_temporal()
+                if df_temporal_apa is not None and len(df_temporal_apa) > 0:
+                    dataframes_apa["Evolución Temporal"] = df_temporal_apa
+                    titulo_temporal_apa = "Evolución Temporal de Estrategias"
+                    if variable_seleccionada != "Todas las variables":
+                        titulo_temporal_apa += f" - {variable_seleccionada.replace('_', ' ').title()}"
+                    titulo_temporal_apa += f" ({FRECUENCIAS[st.session_state.get('temporal_frecuencia', 'diaria')]})"
+                    graficos_apa["Evolución Temporal"] = figura_temporal(
+                        df_temporal_apa, estrategias_apa, titulo_temporal_apa,
+                        titulo_eje_y=MEDIDAS[st.session_state.get("temporal_medida", 'usos')]
+                    )
                 
-                if 'df_lider' in locals() and len(df_lider) > 0:
-                    dataframes_apa["Aparición del Líder por Contexto"] = df_lider
+                tablas_secciones = [
+                    ("Análisis Plain Folks por Candidato", calcular_plain_folks, 'candidatos'),
+                    ("Plain-folks por Contexto y Campaña", calcular_plain_folks_contexto, 'plain_folks_contexto'),
+                    ("Distribución de Recursos IPA", calcular_ipa, 'distribucion_ipa'),
+                    ("Cruce Reglas-Contexto", calcular_cruce_reglas_contexto, 'cruce_reglas_contexto'),
+                    ("Aparición del Líder por Contexto", calcular_lider, 'aparicion_lider')
+                ]
+                for titulo_tabla, calcular, clave in tablas_secciones:
+                    tabla_seccion = tabla_resultado(calcular(), clave)
+                    if tabla_seccion is not None:
+                        dataframes_apa[titulo_tabla] = tabla_seccion
                 
                 if dataframes_apa:
                     # Generar documento DOCX
                     titulo_doc = f"Análisis de Campaña Electoral - {variable_seleccionada.replace('_', ' ').title() if variable_seleccionada != 'Todas las variables' else 'Análisis Completo'}"
-                    docx_buffer = exportar_a_docx(dataframes_apa, titulo_documento=titulo_doc)
+                    docx_buffer = exportar_a_docx(dataframes_apa, graficos_apa, titulo_documento=titulo_doc)
                     
                     st.download_button(
                         label="📄 Descargar Documento APA (DOCX)",
@@ -2954,9 +3276,16 @@ def main():
         - Fuente Times New Roman 12pt
         - Bordes y espaciado según normas APA
         - Títulos numerados automáticamente
+        - Figuras del panel a 300 DPI (requiere kaleido)
         - Fecha del análisis incluida
         - Compatible con editores de texto académicos
         """)
 
 if __name__ == "__main__":
-    main()
+    # Registro de rendimiento de esta ejecución (memoria solo con el panel activo)
+    iniciar_ejecucion(memoria=st.session_state.get("medir_rendimiento", False))
+    try:
+        main()
+    finally:
+        ejecucion = finalizar_ejecucion()
+    mostrar_panel_rendimiento(ejecucion)
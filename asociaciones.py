@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+from indicadores import construir_matriz_indicadores, contar_coocurrencias
+
+# =====================================================
+# ASOCIACIÓN ENTRE PARES DE COLUMNAS DUMMY (TABLAS 2 x 2)
+# =====================================================
+
+# Nivel de significación tras la corrección por comparaciones múltiples
+ALFA = 0.05
+
+# Métodos de corrección disponibles
+METODOS_CORRECCION = ['fdr_bh', 'holm', 'bonferroni', 'ninguno']
+
+def corregir_p_valores(p_valores, metodo='fdr_bh'):
+    """
+    Ajusta un vector de p-valores por comparaciones múltiples (los NaN se ignoran)
+
+    Métodos: 'fdr_bh' (Benjamini-Hochberg), 'holm', 'bonferroni' o 'ninguno'.
+    """
+    if metodo not in METODOS_CORRECCION:
+        raise ValueError(f"Método de corrección desconocido: {metodo}. Opciones: {METODOS_CORRECCION}")
+
+    p_valores = np.asarray(p_valores, dtype=float)
+    ajustados = np.full(p_valores.shape, np.nan)
+    validos = ~np.isnan(p_valores)
+    p = p_valores[validos]
+    m = len(p)
+    if m == 0 or metodo == 'ninguno':
+        ajustados[validos] = p
+        return ajustados
+
+    if metodo == 'bonferroni':
+        resultado = p * m
+    elif metodo == 'holm':
+        orden = np.argsort(p, kind='stable')
+        escalados = np.maximum.accumulate(p[orden] * (m - np.arange(m)))
+        resultado = np.empty(m)
+        resultado[orden] = escalados
+    else:
+        orden = np.argsort(p, kind='stable')[::-1]
+        escalados = np.minimum.accumulate(p[orden] * m / np.arange(m, 0, -1))
+        resultado = np.empty(m)
+        resultado[orden] = escalados
+
+    ajustados[validos] = np.minimum(resultado, 1.0)
+    return ajustados
+
+def estadisticos_2x2(coocurrencias, n_filas, n_columnas, total, correccion_yates=True):
+    """
+    Chi-cuadrado, p-valor, V de Cramér y residuo estandarizado de tablas 2 x 2 en bloque
+
+    Parámetros (arrays de la misma forma):
+    - coocurrencias: Publicaciones con ambas categorías (celda Sí/Sí)
+    - n_filas, n_columnas: Publicaciones con cada categoría (márgenes)
+    - total: Número de publicaciones
+
+    El chi-cuadrado aplica, como chi2_contingency, la corrección de Yates; la
+    V de Cramér (phi en tablas 2 x 2) usa el estadístico sin corregir. El residuo
+    es el residuo estandarizado ajustado de la celda Sí/Sí (positivo si ambas
+    categorías coinciden más de lo esperado). Las tablas con un margen vacío dan NaN.
+    """
+    a = np.asarray(coocurrencias, dtype=float)
+    r1 = np.asarray(n_filas, dtype=float)
+    c1 = np.asarray(n_columnas, dtype=float)
+    n = np.asarray(total, dtype=float)
+    r0, c0 = n - r1, n - c1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        producto_margenes = r1 * r0 * c1 * c0
+        validas = producto_margenes > 0
+
+        # |O - E| es igual en las cuatro celdas de una tabla 2 x 2
+        desviacion = np.abs(a - r1 * c1 / n)
+        suma_inversos = (1 / (r1 * c1) + 1 / (r1 * c0) + 1 / (r0 * c1) + 1 / (r0 * c0)) * n
+        chi2_sin_corregir = desviacion ** 2 * suma_inversos
+        if correccion_yates:
+            desviacion = desviacion - np.minimum(0.5, desviacion)
+        estadistico = desviacion ** 2 * suma_inversos
+
+        v_cramer = np.sqrt(chi2_sin_corregir / n)
+        residuo = (a * n - r1 * c1) * np.sqrt(n) / np.sqrt(producto_margenes)
+
+    estadistico = np.where(validas, estadistico, np.nan)
+    return {
+        'chi2': estadistico,
+        'p_valor': np.where(validas, chi2.sf(estadistico, 1), np.nan),
+        'v_cramer': np.where(validas, v_cramer, np.nan),
+        'residuo': np.where(validas, residuo, np.nan)
+    }
+
+def calcular_asociaciones(df, columnas_filas, columnas_columnas=None, correccion_yates=True,
+                          metodo_correccion='fdr_bh', alfa=ALFA):
+    """
+    Asociación entre todos los pares de columnas dummy con una sola multiplicación X.T @ X
+
+    Parámetros:
+    - df: DataFrame con las columnas dummy
+    - columnas_filas: Columnas del primer grupo
+    - columnas_columnas: Columnas del segundo grupo (None = todos los pares del primero)
+    - correccion_yates: Corrección de continuidad del chi-cuadrado (como chi2_contingency)
+    - metodo_correccion: Corrección por comparaciones múltiples (ver corregir_p_valores)
+    - alfa: Nivel de significación sobre el p-valor ajustado
+
+    Devuelve un diccionario con matrices (DataFrame filas x columnas) 'coocurrencias',
+    'chi2', 'p_valor', 'p_ajustado', 'v_cramer' y 'residuo', y 'pares' con un par
+    por fila (cada par una sola vez; sin la diagonal si ambos grupos coinciden).
+    """
+    mismas = columnas_columnas is None
+    columnas_columnas = columnas_filas if mismas else columnas_columnas
+    todas = list(dict.fromkeys(list(columnas_filas) + list(columnas_columnas)))
+
+    matriz = construir_matriz_indicadores(df, todas)
+    coocurrencias = contar_coocurrencias(matriz)
+    filas = [col for col in columnas_filas if col in matriz['posicion']]
+    columnas = [col for col in columnas_columnas if col in matriz['posicion']]
+    bloque = coocurrencias.loc[filas, columnas].to_numpy(dtype=np.int64)
+
+    frecuencias = np.diag(coocurrencias.to_numpy())
+    n_filas = frecuencias[[matriz['posicion'][col] for col in filas]][:, None]
+    n_columnas = frecuencias[[matriz['posicion'][col] for col in columnas]][None, :]
+    estadisticos = estadisticos_2x2(bloque, n_filas, n_columnas, len(df), correccion_yates)
+
+    # Pares únicos: triángulo superior si ambos grupos son el mismo
+    if mismas:
+        i, j = np.triu_indices(len(filas), k=1)
+    else:
+        i, j = np.indices((len(filas), len(columnas))).reshape(2, -1)
+        distintas = np.asarray(filas, dtype=object)[i] != np.asarray(columnas, dtype=object)[j]
+        i, j = i[distintas], j[distintas]
+
+    p_ajustado = np.full(bloque.shape, np.nan)
+    p_ajustado[i, j] = corregir_p_valores(estadisticos['p_valor'][i, j], metodo_correccion)
+    if mismas:
+        p_ajustado[j, i] = p_ajustado[i, j]
+
+    resultados = {'coocurrencias': pd.DataFrame(bloque, index=filas, columns=columnas)}
+    for nombre in ['chi2', 'p_valor', 'v_cramer', 'residuo']:
+        valores = np.asarray(estadisticos[nombre], dtype=float).copy()
+        if mismas:
+            np.fill_diagonal(valores, np.nan)
+        resultados[nombre] = pd.DataFrame(valores, index=filas, columns=columnas)
+    resultados['p_ajustado'] = pd.DataFrame(p_ajustado, index=filas, columns=columnas)
+
+    resultados['pares'] = pd.DataFrame({
+        'Variable_1': np.asarray(filas, dtype=object)[i],
+        'Variable_2': np.asarray(columnas, dtype=object)[j],
+        'Coocurrencias': bloque[i, j],
+        'Chi2': estadisticos['chi2'][i, j],
+        'p_valor': estadisticos['p_valor'][i, j],
+        'p_ajustado': p_ajustado[i, j],
+        'V_Cramer': estadisticos['v_cramer'][i, j],
+        'Residuo': estadisticos['residuo'][i, j],
+    })
+    resultados['pares']['Significativo'] = resultados['pares']['p_ajustado'] < alfa
+
+    return resultados
@@ -0,0 +1,312 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# =====================================================
+# BENCHMARKS DE LAS RUTAS CRÍTICAS (CARGA, RECODIFICACIÓN, FILTROS, AGREGACIÓN, EXPORTACIÓN)
+# =====================================================
+# python benchmarks.py --tamanos 1000 10000 100000
+# Los resultados se guardan en .benchmarks/ con el formato JSON de pytest-benchmark
+# y se comparan con la línea base (.benchmarks/base.json, --guardar-base para fijarla).
+
+# Número de publicaciones sintéticas de cada tamaño
+TAMANOS = [1000, 10000]
+
+# Rondas medidas por función (se corta antes si una función supera TIEMPO_MAXIMO)
+RONDAS = 5
+TIEMPO_MAXIMO = 10.0
+
+# Aumento de la mediana respecto a la línea base que cuenta como regresión
+UMBRAL_REGRESION = 0.10
+
+DIRECTORIO_RESULTADOS = ".benchmarks"
+ARCHIVO_BASE = os.path.join(DIRECTORIO_RESULTADOS, "base.json")
+
+SEMILLA = 42
+
+def estadisticos(tiempos):
+    """Estadísticos de una serie de tiempos (mismas claves que pytest-benchmark)"""
+    cuartiles = statistics.quantiles(tiempos, n=4) if len(tiempos) > 1 else [tiempos[0]] * 3
+    media = statistics.fmean(tiempos)
+    return {
+        'min': min(tiempos),
+        'max': max(tiempos),
+        'mean': media,
+        'stddev': statistics.stdev(tiempos) if len(tiempos) > 1 else 0.0,
+        'median': statistics.median(tiempos),
+        'iqr': cuartiles[2] - cuartiles[0],
+        'q1': cuartiles[0],
+        'q3': cuartiles[2],
+        'rounds': len(tiempos),
+        'total': sum(tiempos),
+        'ops': 1.0 / media if media > 0 else float('inf'),
+        'data': tiempos
+    }
+
+def medir(funcion, rondas=RONDAS, tiempo_maximo=TIEMPO_MAXIMO, preparar=None):
+    """
+    Tiempos de pared de funcion() tras una ronda de calentamiento
+
+    preparar() se ejecuta antes de cada ronda fuera de la medición (p. ej. para
+    vaciar una caché). Las salidas por consola de la función se descartan.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        if preparar:
+            preparar()
+        funcion()
+        tiempos = []
+        while len(tiempos) < rondas and (len(tiempos) < 2 or sum(tiempos) < tiempo_maximo):
+            if preparar:
+                preparar()
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+def importar_aplicacion():
+    """Importa la aplicación Streamlit sin servidor (solo se usan sus funciones)"""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app_streamlit_campana_mejorada as app
+    for nombre in list(logging.root.manager.loggerDict):
+        if nombre.startswith('streamlit'):
+            logging.getLogger(nombre).setLevel(logging.ERROR)
+    return app
+
+def preparar_datos(n_filas, directorio, semilla=SEMILLA):
+    """
+    Datos de un tamaño: hoja de codificación sintética, su recodificación y el Excel
+    recodificado que lee cargar_datos
+    """
+    from generador_sintetico import generar_datos_sinteticos
+    from generar_dummies_desde_codigos import recodificar
+    from exportacion import escribir_xlsx
+
+    df_fuente = generar_datos_sinteticos(n_filas, semilla=semilla)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = recodificar(df_fuente.copy())
+    dummy_cols = [col for col in df.columns if '__' in col]
+
+    ruta_excel = os.path.join(directorio, f"recodificado_{n_filas}.xlsx")
+    escribir_xlsx({'Sheet1': df.drop(columns=['Fecha_convertida'])}, ruta_excel)
+
+    variable = dummy_cols[0].split('__')[0]
+    categorias = [col.split('__')[1] for col in dummy_cols if col.split('__')[0] == variable][:2]
+    columnas_muestra = ['Candidato', 'Fecha'] + dummy_cols[:6]
+    return {
+        'df_fuente': df_fuente, 'df': df, 'dummy_cols': dummy_cols, 'ruta_excel': ruta_excel,
+        'variable': variable, 'categorias': categorias, 'var_cruce': "Tipo de propaganda",
+        'publicaciones': df[columnas_muestra]
+    }
+
+def casos(app, datos):
+    """(nombre, función, preparar) de cada ruta medida"""
+    import carga_datos
+    from generar_dummies_desde_codigos import recodificar
+
+    df, dummy_cols = datos['df'], datos['dummy_cols']
+    ranking = app.crear_ranking_por_candidato_y_total(df, dummy_cols, n_top=10)
+    contingencia = app.generar_tabla_contingencia_avanzada(df, 'Candidato', datos['var_cruce'])
+    tablas_exportacion = {
+        "Top_Categorias": ranking,
+        "Tabla_Contingencia": contingencia['tabla_frecuencias'],
+        "Publicaciones": datos['publicaciones']
+    }
+
+    def cargar():
+        # cargar_datos lee el archivo configurado en carga_datos (aquí, el Excel sintético)
+        anterior = carga_datos.ARCHIVO_DATOS
+        carga_datos.ARCHIVO_DATOS = datos['ruta_excel']
+        try:
+            return app.cargar_datos()
+        finally:
+            carga_datos.ARCHIVO_DATOS = anterior
+
+    def vaciar_caches_carga():
+        # Carga en frío: sin caché en memoria ni Feather en disco (se vuelve a leer el Excel)
+        app.cargar_datos.clear()
+        shutil.rmtree(carga_datos.DIRECTORIO_CACHE, ignore_errors=True)
+
+    return [
+        ("generar_dummies_desde_codigos", lambda: recodificar(datos['df_fuente'].copy()), None),
+        ("cargar_datos_frio", cargar, vaciar_caches_carga),
+        ("cargar_datos_caliente", cargar, app.cargar_datos.clear),
+        ("filtrar_datos_por_seleccion",
+         lambda: app.filtrar_datos_por_seleccion(df, dummy_cols, datos['variable'], datos['categorias']), None),
+        ("crear_ranking_por_candidato_y_total",
+         lambda: app.crear_ranking_por_candidato_y_total(df, dummy_cols, n_top=10), None),
+        ("generar_tabla_contingencia_avanzada",
+         lambda: app.generar_tabla_contingencia_avanzada(df, 'Candidato', datos['var_cruce']), None),
+        ("exportar_a_excel", lambda: app.exportar_a_excel(tablas_exportacion, "benchmark"), None),
+        ("exportar_a_docx", lambda: app.exportar_a_docx(tablas_exportacion), None),
+    ]
+
+def informacion_equipo():
+    return {
+        'node': platform.node(),
+        'processor': platform.processor(),
+        'machine': platform.machine(),
+        'python_implementation': platform.python_implementation(),
+        'python_version': platform.python_version(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'cpu_count': os.cpu_count()
+    }
+
+def informacion_commit():
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directorio, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        cambios = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directorio,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+        return {'id': commit, 'dirty': bool(cambios)}
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+def ejecutar_benchmarks(tamanos=TAMANOS, rondas=RONDAS, semilla=SEMILLA, solo=None, tiempo_maximo=TIEMPO_MAXIMO):
+    """
+    Mide todas las rutas con datos sintéticos de cada tamaño
+
+    Parámetros:
+    - tamanos: Números de publicaciones a generar
+    - rondas: Rondas medidas por función
+    - semilla: Semilla de los datos sintéticos (mismos datos entre ejecuciones)
+    - solo: Si se indica, solo las funciones cuyo nombre contiene alguno de estos textos
+    - tiempo_maximo: Segundos medidos por función a partir de los que se dejan de hacer rondas
+
+    Devuelve un diccionario con el formato de pytest-benchmark ('machine_info',
+    'commit_info', 'benchmarks', 'datetime', 'version').
+    """
+    app = importar_aplicacion()
+    resultados = []
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmarks_campana_") as directorio:
+        # Las cachés en disco (.cache_datos, .cache_figuras) se crean en la carpeta temporal
+        os.chdir(directorio)
+        try:
+            for n_filas in tamanos:
+                datos = preparar_datos(n_filas, directorio, semilla)
+                for nombre, funcion, preparar in casos(app, datos):
+                    if solo and not any(texto in nombre for texto in solo):
+                        continue
+                    tiempos = medir(funcion, rondas, tiempo_maximo, preparar)
+                    resultados.append({
+                        'group': f"{n_filas} filas",
+                        'name': f"{nombre}[{n_filas}]",
+                        'fullname': f"benchmarks.py::{nombre}[{n_filas}]",
+                        'params': {'filas': n_filas},
+                        'stats': estadisticos(tiempos)
+                    })
+                    print(f"  {nombre}[{n_filas}]: mediana {resultados[-1]['stats']['median'] * 1000:.1f} ms")
+        finally:
+            os.chdir(directorio_original)
+
+    return {
+        'machine_info': informacion_equipo(),
+        'commit_info': informacion_commit(),
+        'benchmarks': resultados,
+        'datetime': datetime.now().isoformat(),
+        'version': "1"
+    }
+
+def comparar_con_base(resultados, base, umbral=UMBRAL_REGRESION):
+    """
+    Cambio de la mediana de cada benchmark respecto a la línea base
+
+    Devuelve una lista de diccionarios con 'name', 'base', 'actual', 'cambio'
+    (proporción) y 'regresion' (el cambio supera el umbral).
+    """
+    medianas_base = {b['name']: b['stats']['median'] for b in base.get('benchmarks', [])}
+    comparacion = []
+    for benchmark in resultados['benchmarks']:
+        anterior = medianas_base.get(benchmark['name'])
+        if anterior is None:
+            continue
+        actual = benchmark['stats']['median']
+        cambio = actual / anterior - 1 if anterior > 0 else 0.0
+        comparacion.append({'name': benchmark['name'], 'base': anterior, 'actual': actual,
+                            'cambio': cambio, 'regresion': cambio > umbral})
+    return comparacion
+
+def imprimir_resultados(resultados):
+    """Tabla de resultados por grupo, como la de pytest-benchmark (tiempos en ms)"""
+    columnas = ['min', 'max', 'mean', 'stddev', 'median', 'iqr']
+    ancho = max([len(b['name']) for b in resultados['benchmarks']] + [4])
+    grupos = dict.fromkeys(b['group'] for b in resultados['benchmarks'])
+    for grupo in grupos:
+        print(f"\n--- benchmark '{grupo}' (ms) ---")
+        print(f"{'Name':<{ancho}} " + " ".join(f"{c.capitalize():>10}" for c in columnas) + f" {'Rounds':>7}")
+        for benchmark in (b for b in resultados['benchmarks'] if b['group'] == grupo):
+            stats = benchmark['stats']
+            print(f"{benchmark['name']:<{ancho}} " + " ".join(f"{stats[c] * 1000:>10.2f}" for c in columnas)
+                  + f" {stats['rounds']:>7}")
+
+def imprimir_comparacion(comparacion, umbral=UMBRAL_REGRESION):
+    if not comparacion:
+        print("\nSin benchmarks comunes con la línea base.")
+        return
+    ancho = max(len(c['name']) for c in comparacion)
+    print(f"\n--- comparación con la línea base (mediana, umbral {umbral:.0%}) ---")
+    for c in comparacion:
+        marca = "REGRESIÓN" if c['regresion'] else ("mejora" if c['cambio'] < -umbral else "")
+        print(f"{c['name']:<{ancho}} {c['base'] * 1000:>10.2f} -> {c['actual'] * 1000:>10.2f} ms "
+              f"({c['cambio']:+.1%}) {marca}")
+
+def guardar_json(datos, ruta):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carga, recodificación, filtros, agregación y exportación")
+    parser.add_argument("--tamanos", type=int, nargs='+', default=TAMANOS, help="Publicaciones sintéticas por tamaño")
+    parser.add_argument("--rondas", type=int, default=RONDAS, help="Rondas medidas por función")
+    parser.add_argument("--tiempo-maximo", type=float, default=TIEMPO_MAXIMO,
+                        help="Segundos por función a partir de los que no se hacen más rondas")
+    parser.add_argument("--semilla", type=int, default=SEMILLA, help="Semilla de los datos sintéticos")
+    parser.add_argument("--solo", nargs='+', default=None, help="Solo las funciones cuyo nombre contiene estos textos")
+    parser.add_argument("--salida", default=None, help="JSON de resultados (por defecto .benchmarks/<fecha>.json)")
+    parser.add_argument("--base", default=ARCHIVO_BASE, help="JSON de la línea base con la que comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda estos resultados como línea base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="Aumento de la mediana que cuenta como regresión (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    print(f"Midiendo con {args.tamanos} publicaciones ({args.rondas} rondas)...")
+    resultados = ejecutar_benchmarks(args.tamanos, args.rondas, args.semilla, args.solo, args.tiempo_maximo)
+    imprimir_resultados(resultados)
+
+    salida = args.salida or os.path.join(DIRECTORIO_RESULTADOS, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    guardar_json(resultados, salida)
+    print(f"\nResultados guardados en {salida}")
+
+    regresiones = []
+    if args.guardar_base:
+        guardar_json(resultados, args.base)
+        print(f"Línea base actualizada: {args.base}")
+    elif os.path.exists(args.base):
+        with open(args.base, encoding='utf-8') as f:
+            comparacion = comparar_con_base(resultados, json.load(f), args.umbral)
+        imprimir_comparacion(comparacion, args.umbral)
+        regresiones = [c for c in comparacion if c['regresion']]
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones por encima del {args.umbral:.0%}")
+    else:
+        print(f"No hay línea base en {args.base} (usa --guardar-base para crearla)")
+
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# RASTERIZACIÓN DE FIGURAS CON CACHÉ DIRECCIONADA POR CONTENIDO
+# =====================================================
+
+# Carpeta de las imágenes ya rasterizadas (una por especificación y resolución)
+DIRECTORIO_FIGURAS = ".cache_figuras"
+
+# Resolución por defecto de las figuras exportadas
+DPI_FIGURAS = 300
+
+# Imágenes que se conservan en memoria entre exportaciones y en la carpeta de caché
+MAX_FIGURAS_MEMORIA = 32
+MAX_FIGURAS_DISCO = 500
+
+# Puntos por pulgada de referencia de Plotly (escala 1 = 96 DPI)
+_DPI_PLOTLY = 96
+
+_IMAGENES = OrderedDict()
+
+def es_figura_plotly(figura):
+    return hasattr(figura, 'to_plotly_json')
+
+def _normalizar(valor):
+    """Versión serializable en JSON de una especificación (DataFrames y arrays por su hash)"""
+    if es_figura_plotly(valor):
+        return json.loads(valor.to_json())
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        contenido = pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes()
+        columnas = list(valor.columns) if isinstance(valor, pd.DataFrame) else [valor.name]
+        return {'hash': hashlib.sha256(contenido).hexdigest(), 'columnas': [str(c) for c in columnas]}
+    if isinstance(valor, np.ndarray):
+        return {'hash': hashlib.sha256(np.ascontiguousarray(valor).tobytes()).hexdigest(),
+                'forma': list(valor.shape), 'tipo': str(valor.dtype)}
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    return valor
+
+def _especificacion_matplotlib(figura):
+    # Sin especificación explícita se usa el SVG (vectorial, mucho más barato que el PNG a 300 DPI)
+    with plt.rc_context({'svg.hashsalt': 'figura'}):
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format='svg', metadata={'Date': None})
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+def firma_figura(especificacion, dpi=DPI_FIGURAS):
+    """Clave de caché de una figura: hash de su especificación y de la resolución"""
+    texto = json.dumps(_normalizar(especificacion), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(f"{dpi}\n{texto}".encode('utf-8')).hexdigest()
+
+def rasterizar_figura(figura, dpi=DPI_FIGURAS):
+    """
+    PNG de una figura de matplotlib o de Plotly
+
+    Las figuras de Plotly requieren kaleido (y el navegador que este use); si
+    no está disponible se lanza RuntimeError.
+    """
+    if es_figura_plotly(figura):
+        try:
+            return figura.to_image(format='png', scale=dpi / _DPI_PLOTLY)
+        except (ImportError, ValueError, RuntimeError) as e:
+            raise RuntimeError(f"No se pudo rasterizar la figura de Plotly (requiere kaleido): {e}") from e
+
+    buffer = io.BytesIO()
+    figura.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight', facecolor='white',
+                   metadata={'Software': None})
+    plt.close(figura)
+    return buffer.getvalue()
+
+def _guardar_en_memoria(clave, imagen):
+    _IMAGENES[clave] = imagen
+    _IMAGENES.move_to_end(clave)
+    if len(_IMAGENES) > MAX_FIGURAS_MEMORIA:
+        _IMAGENES.popitem(last=False)
+
+def limpiar_cache_figuras(directorio=DIRECTORIO_FIGURAS, maximo=MAX_FIGURAS_DISCO):
+    """Elimina las imágenes menos recientes si la caché en disco supera el máximo"""
+    if not os.path.isdir(directorio):
+        return
+    rutas = [os.path.join(directorio, archivo) for archivo in os.listdir(directorio) if archivo.endswith('.png')]
+    if len(rutas) <= maximo:
+        return
+    rutas.sort(key=os.path.getmtime)
+    for ruta in rutas[:len(rutas) - maximo]:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+def imagen_figura(figura, dpi=DPI_FIGURAS, especificacion=None, directorio=DIRECTORIO_FIGURAS):
+    """
+    PNG de una figura, rasterizada una sola vez por (especificación, DPI)
+
+    Parámetros:
+    - figura: Figura de matplotlib o Plotly, o función sin argumentos que la
+      construye (solo se llama si la imagen no está en caché)
+    - dpi: Resolución de la imagen
+    - especificacion: Datos que determinan la figura (DataFrames, parámetros...);
+      por defecto el JSON de la figura de Plotly o el SVG de la de matplotlib
+    - directorio: Carpeta de la caché en disco (None = solo en memoria)
+
+    La imagen se guarda con el hash como nombre, de modo que la reutilizan
+    las siguientes exportaciones y sesiones mientras la figura no cambie.
+    """
+    if especificacion is None:
+        if callable(figura):
+            figura = figura()
+        especificacion = figura if es_figura_plotly(figura) else _especificacion_matplotlib(figura)
+    clave = firma_figura(especificacion, dpi)
+
+    ruta = os.path.join(directorio, f"{clave}.png") if directorio else None
+    if clave in _IMAGENES:
+        _IMAGENES.move_to_end(clave)
+        imagen = _IMAGENES[clave]
+    elif ruta and os.path.exists(ruta):
+        with open(ruta, 'rb') as archivo:
+            imagen = archivo.read()
+    else:
+        imagen = rasterizar_figura(figura() if callable(figura) else figura, dpi)
+        if ruta:
+            os.makedirs(directorio, exist_ok=True)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as archivo:
+                archivo.write(imagen)
+            os.replace(temporal, ruta)
+            limpiar_cache_figuras(directorio)
+
+    # La figura de matplotlib ya no hace falta (rasterizar_figura la cierra al renderizar)
+    if isinstance(figura, plt.Figure):
+        plt.close(figura)
+    _guardar_en_memoria(clave, imagen)
+    return imagen
+
+def imagenes_figuras(figuras, dpi=DPI_FIGURAS, directorio=DIRECTORIO_FIGURAS):
+    """
+    PNG de varias figuras (diccionario nombre -> figura o (figura, especificación))
+
+    Devuelve las imágenes obtenidas y un diccionario nombre -> motivo con las
+    figuras que no se pudieron rasterizar.
+    """
+    imagenes, omitidas = {}, {}
+    for nombre, figura in figuras.items():
+        figura, especificacion = figura if isinstance(figura, tuple) else (figura, None)
+        try:
+            imagenes[nombre] = imagen_figura(figura, dpi, especificacion, directorio)
+        except RuntimeError as e:
+            omitidas[nombre] = str(e)
+    return imagenes, omitidas
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Sin pyarrow se lee siempre el Excel directamente
+    feather = None
+
+# =====================================================
+# CONFIGURACIÓN DE LA CACHÉ COLUMNAR
+# =====================================================
+
+ARCHIVO_RECODIFICADO = "recodificado.xlsx"
+DIRECTORIO_CACHE = ".cache_datos"
+
+# Fuente de datos por defecto: recodificado.xlsx o un archivo SPSS (.sav), p. ej.
+# CAMPANA_ARCHIVO_DATOS=TFMCRIS.sav streamlit run app_streamlit_campana_mejorada.py
+ARCHIVO_DATOS = os.environ.get("CAMPANA_ARCHIVO_DATOS", ARCHIVO_RECODIFICADO)
+
+# Almacén incremental (ver ingesta_incremental.py): partes Feather + manifiesto.
+# Refleja el contenido de ARCHIVO_RECODIFICADO y solo se consulta para ese archivo
+DIRECTORIO_ALMACEN = "almacen_recodificado"
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+COLUMNAS_CONTROL = ['_id_publicacion', '_hash_fila', '_orden', '_eliminada']
+
+# =====================================================
+# FUNCIONES DE CARGA CON CACHÉ
+# =====================================================
+
+def calcular_clave_archivo(ruta):
+    """Calcula la clave de caché de un archivo (hash del contenido + fecha de modificación)"""
+    hash_archivo = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            hash_archivo.update(bloque)
+
+    mtime = os.stat(ruta).st_mtime_ns
+    return f"{hash_archivo.hexdigest()[:16]}_{mtime}"
+
+def normalizar_columnas_mixtas(df):
+    """Convierte a texto las columnas con tipos mezclados (p. ej. códigos '1' y '1-2- 6')"""
+    for col in df.columns:
+        if df[col].dtype == object:
+            valores = df[col].dropna()
+            if valores.map(type).nunique() > 1:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def ruta_cache(ruta, clave, directorio_cache=DIRECTORIO_CACHE):
+    """Devuelve la ruta del archivo Feather asociado a un Excel y una clave"""
+    nombre_base = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(directorio_cache, f"{nombre_base}.{clave}.feather")
+
+def limpiar_caches_antiguas(ruta, ruta_vigente, directorio_cache=DIRECTORIO_CACHE):
+    """Elimina las cachés de versiones anteriores del mismo archivo fuente"""
+    nombre_base = os.path.splitext(os.path.basename(ruta))[0]
+    for archivo in os.listdir(directorio_cache):
+        ruta_archivo = os.path.join(directorio_cache, archivo)
+        if (archivo.startswith(nombre_base + ".") and archivo.endswith(".feather")
+                and ruta_archivo != ruta_vigente):
+            try:
+                os.remove(ruta_archivo)
+            except OSError:
+                pass
+
+def cargar_excel_con_cache(ruta, directorio_cache=DIRECTORIO_CACHE, usar_cache=True):
+    """
+    Carga un Excel usando una caché columnar en disco (Feather/Arrow)
+
+    La primera lectura materializa el Excel en formato Feather sin comprimir; las
+    siguientes lo abren mediante memory-map. Solo se vuelve a leer el Excel cuando
+    cambia el hash o la fecha de modificación del archivo fuente.
+
+    Parámetros:
+    - ruta: Ruta del archivo Excel
+    - directorio_cache: Carpeta donde se guardan los archivos Feather
+    - usar_cache: Si False (o no hay pyarrow), lee siempre el Excel
+    """
+    if not usar_cache or feather is None:
+        return normalizar_columnas_mixtas(pd.read_excel(ruta))
+
+    clave = calcular_clave_archivo(ruta)
+    ruta_feather = ruta_cache(ruta, clave, directorio_cache)
+
+    if os.path.exists(ruta_feather):
+        try:
+            tabla = feather.read_table(ruta_feather, memory_map=True)
+            return tabla.to_pandas()
+        except Exception:
+            pass  # Caché corrupta: se regenera a partir del Excel
+
+    df = normalizar_columnas_mixtas(pd.read_excel(ruta))
+
+    try:
+        os.makedirs(directorio_cache, exist_ok=True)
+        # Escritura atómica para que otros procesos nunca lean un archivo a medias
+        ruta_temporal = f"{ruta_feather}.{os.getpid()}.tmp"
+        feather.write_feather(df, ruta_temporal, compression='uncompressed')
+        os.replace(ruta_temporal, ruta_feather)
+        limpiar_caches_antiguas(ruta, ruta_feather, directorio_cache)
+    except Exception as e:
+        print(f"Advertencia: no se pudo guardar la caché de '{ruta}': {e}")
+
+    return df
+
+# =====================================================
+# ALMACÉN INCREMENTAL (PARTES FEATHER)
+# =====================================================
+
+def leer_manifiesto(directorio=DIRECTORIO_ALMACEN):
+    """Lee el manifiesto del almacén ({'version': int, 'partes': [...]}) o None si no existe"""
+    ruta = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+def escribir_manifiesto(manifiesto, directorio=DIRECTORIO_ALMACEN):
+    """Escribe el manifiesto de forma atómica (los lectores ven la versión anterior o la nueva)"""
+    ruta = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(ruta_temporal, ruta)
+
+def escribir_parte_almacen(df, directorio=DIRECTORIO_ALMACEN, reiniciar=False):
+    """
+    Añade un DataFrame como nueva parte del almacén y publica una nueva versión
+
+    Con reiniciar=True la parte sustituye a todas las anteriores (recodificación completa).
+    """
+    if feather is None:
+        raise ImportError("El almacén incremental requiere pyarrow (pip install pyarrow)")
+
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = leer_manifiesto(directorio) or {'version': 0, 'partes': []}
+    version = manifiesto['version'] + 1
+
+    nombre_parte = f"parte_{version:06d}.feather"
+    ruta_temporal = os.path.join(directorio, f"{nombre_parte}.{os.getpid()}.tmp")
+    feather.write_feather(normalizar_columnas_mixtas(df.reset_index(drop=True)), ruta_temporal,
+                          compression='uncompressed')
+    os.replace(ruta_temporal, os.path.join(directorio, nombre_parte))
+
+    partes_anteriores = [] if reiniciar else manifiesto['partes']
+    escribir_manifiesto({'version': version, 'partes': partes_anteriores + [nombre_parte]}, directorio)
+
+    # Las partes que ya no figuran en el manifiesto se eliminan
+    for archivo in set(manifiesto['partes']) - set(partes_anteriores):
+        try:
+            os.remove(os.path.join(directorio, archivo))
+        except OSError:
+            pass
+
+    return version
+
+def cargar_almacen(directorio=DIRECTORIO_ALMACEN, incluir_control=False):
+    """
+    Reconstruye el dataset vigente a partir de las partes del almacén
+
+    Para cada publicación se conserva su última versión; las marcadas como
+    eliminadas se descartan. Las filas se ordenan por su orden de primera ingesta.
+    """
+    manifiesto = leer_manifiesto(directorio)
+    if manifiesto is None or not manifiesto['partes']:
+        return None
+
+    partes = [
+        feather.read_table(os.path.join(directorio, parte), memory_map=True).to_pandas()
+        for parte in manifiesto['partes']
+    ]
+    # Las partes pueden diferir en tipos (p. ej. códigos leídos como número o texto)
+    df = normalizar_columnas_mixtas(pd.concat(partes, ignore_index=True)) if len(partes) > 1 else partes[0]
+    df = df.drop_duplicates(subset='_id_publicacion', keep='last')
+    df = df[~df['_eliminada']].sort_values('_orden', kind='stable').reset_index(drop=True)
+
+    if not incluir_control:
+        df = df.drop(columns=[col for col in COLUMNAS_CONTROL if col in df.columns])
+    return df
+
+def es_archivo_spss(ruta):
+    return str(ruta).lower().endswith('.sav')
+
+def es_archivo_recodificado(ruta):
+    """Indica si la ruta es el Excel recodificado que refleja el almacén"""
+    return os.path.abspath(ruta) == os.path.abspath(ARCHIVO_RECODIFICADO)
+
+def almacen_vigente(ruta=None, directorio=DIRECTORIO_ALMACEN):
+    """
+    Indica si el almacén existe y es al menos tan reciente como el Excel recodificado
+
+    Solo se aplica cuando la ruta es ARCHIVO_RECODIFICADO y el archivo existe:
+    para cualquier otra fuente, o si falta, el almacén no se considera vigente.
+    """
+    ruta = ruta or ARCHIVO_DATOS
+    ruta_manifiesto = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    if (feather is None or not es_archivo_recodificado(ruta) or not os.path.exists(ruta)
+            or not os.path.exists(ruta_manifiesto)):
+        return False
+    return os.stat(ruta_manifiesto).st_mtime_ns >= os.stat(ruta).st_mtime_ns
+
+def obtener_firma_datos(ruta=None, directorio=DIRECTORIO_ALMACEN):
+    """Firma barata (versión del almacén o fecha del archivo) para invalidar cachés en memoria"""
+    ruta = ruta or ARCHIVO_DATOS
+    if es_archivo_spss(ruta):
+        return f"spss:{os.stat(ruta).st_mtime_ns}" if os.path.exists(ruta) else None
+    if almacen_vigente(ruta, directorio):
+        return f"almacen:{leer_manifiesto(directorio)['version']}"
+    if os.path.exists(ruta):
+        return f"excel:{os.stat(ruta).st_mtime_ns}"
+    return None
+
+def compactar_indicadores(df):
+    """
+    Convierte las columnas dummy (0/1) en un único bloque contiguo uint8
+
+    Ocupa 8 veces menos que las columnas int64 leídas del Excel y permite extraer
+    la matriz de indicadores completa sin recorrer columna a columna.
+    """
+    dummy_cols = [col for col in df.columns if '__' in col and pd.api.types.is_integer_dtype(df[col])]
+    if not dummy_cols:
+        return df
+
+    bloque = pd.DataFrame(df[dummy_cols].to_numpy(dtype=np.uint8), index=df.index, columns=dummy_cols)
+    return pd.concat([df.drop(columns=dummy_cols), bloque], axis=1)
+
+def cargar_recodificado(ruta=None, usar_cache=True):
+    """
+    Carga el dataset recodificado (con columnas dummy)
+
+    Un archivo .sav se lee directamente con sus etiquetas (ver fuente_spss.py).
+    Si existe un almacén incremental más reciente que el Excel recodificado se
+    lee de él; si no, se lee el Excel usando la caché columnar. Si el archivo
+    fuente no existe se lanza FileNotFoundError.
+    """
+    ruta = ruta or ARCHIVO_DATOS
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No se encuentra el archivo de datos '{ruta}'")
+    if es_archivo_spss(ruta):
+        from fuente_spss import cargar_spss
+        return compactar_indicadores(normalizar_columnas_mixtas(cargar_spss(ruta)))
+    if usar_cache and almacen_vigente(ruta):
+        return compactar_indicadores(cargar_almacen())
+    return compactar_indicadores(cargar_excel_con_cache(ruta, usar_cache=usar_cache))
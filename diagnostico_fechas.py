@@ -2,6 +2,8 @@ import pandas as pd
 from datetime import datetime
 import matplotlib.pyplot as plt
 
+from fechas import convertir_fechas, AÑO_CAMPAÑA
+
 # Cargar los datos
 df = pd.read_excel("analisis.xlsx")
 
@@ -35,74 +37,10 @@ if 'Fecha' in df.columns:
             print(f"Error con fecha '{fecha_str}': {e}")
             return None
     
-    # Función mejorada
-    def convertir_fecha_mejorada(fecha_str):
-        try:
-            if pd.isna(fecha_str):
-                return None
-                
-            # Normalizar texto
-            fecha_str = str(fecha_str).lower().strip()
-            
-            # Extraer partes principales (día y mes)
-            # Maneja varios formatos posibles
-            if ' de ' in fecha_str:
-                partes = fecha_str.split(' de ')
-                dia_str = partes[0].strip()
-                # Si hay más texto después del mes, ignorarlo
-                mes_texto = partes[1].strip().split()[0]
-            else:
-                return None
-            
-            # Extraer el número del día
-            import re
-            dia_match = re.search(r'\d+', dia_str)
-            if dia_match:
-                dia = int(dia_match.group())
-            else:
-                return None
-                
-            # Mapeo de meses incluyendo abreviaturas y variaciones
-            meses = {
-                "ene": 1, "enero": 1,
-                "feb": 2, "febrero": 2,
-                "mar": 3, "marzo": 3,
-                "abr": 4, "abril": 4,
-                "may": 5, "mayo": 5,
-                "jun": 6, "junio": 6,
-                "jul": 7, "julio": 7,
-                "ago": 8, "agosto": 8,
-                "sep": 9, "sept": 9, "septiembre": 9,
-                "oct": 10, "octubre": 10,
-                "nov": 11, "noviembre": 11,
-                "dic": 12, "diciembre": 12
-            }
-            
-            # Buscar coincidencia del mes
-            for clave, valor in meses.items():
-                if clave in mes_texto:
-                    mes = valor
-                    break
-            else:
-                mes = None
-                
-            if mes is None:
-                return None
-                
-            # Año académico 2023-2024
-            if mes >= 9:  # septiembre a diciembre
-                año = 2023
-            else:  # enero a agosto
-                año = 2024
-                
-            return datetime(año, mes, dia)
-        except Exception as e:
-            print(f"Error con fecha '{fecha_str}': {e}")
-            return None
-    
     # Aplicar ambas funciones y comparar
     df['Fecha_actual'] = df['Fecha'].apply(convertir_fecha_actual)
-    df['Fecha_mejorada'] = df['Fecha'].apply(convertir_fecha_mejorada)
+    # Conversor compartido del proyecto (vectorizado, con abreviaturas y año configurable)
+    df['Fecha_mejorada'] = convertir_fechas(df['Fecha'])
     
     # Resumen de resultados
     fechas_nulas_actual = df['Fecha_actual'].isna().sum()
@@ -182,70 +120,6 @@ if 'Fecha' in df.columns:
     
     # Sugerir corrección
     print("\n=== SOLUCIÓN PROPUESTA ===")
-    print("1. Reemplazar la función convertir_fecha() actual por la versión mejorada")
-    print("2. Actualizar el año utilizado (usar 2024 para fechas de enero a agosto)")
+    print("1. Convertir las fechas con fechas.convertir_fechas() (compartida por todos los scripts)")
+    print(f"2. Ajustar el año con el parámetro año (por defecto {AÑO_CAMPAÑA}) o mes_inicio si la campaña cruza el cambio de año")
     print("3. Ejecutar nuevamente generar_dummies_desde_codigos.py para regenerar el archivo recodificado.xlsx")
-    print("\nCódigo de la función mejorada:")
-    print("""
-def convertir_fecha(fecha_str):
-    try:
-        if pd.isna(fecha_str):
-            return None
-            
-        # Normalizar texto
-        fecha_str = str(fecha_str).lower().strip()
-        
-        # Extraer partes principales (día y mes)
-        if ' de ' in fecha_str:
-            partes = fecha_str.split(' de ')
-            dia_str = partes[0].strip()
-            # Si hay más texto después del mes, ignorarlo
-            mes_texto = partes[1].strip().split()[0]
-        else:
-            return None
-        
-        # Extraer el número del día
-        import re
-        dia_match = re.search(r'\\d+', dia_str)
-        if dia_match:
-            dia = int(dia_match.group())
-        else:
-            return None
-            
-        # Mapeo de meses incluyendo abreviaturas
-        meses = {
-            "ene": 1, "enero": 1,
-            "feb": 2, "febrero": 2,
-            "mar": 3, "marzo": 3,
-            "abr": 4, "abril": 4,
-            "may": 5, "mayo": 5,
-            "jun": 6, "junio": 6,
-            "jul": 7, "julio": 7,
-            "ago": 8, "agosto": 8,
-            "sep": 9, "sept": 9, "septiembre": 9,
-            "oct": 10, "octubre": 10,
-            "nov": 11, "noviembre": 11,
-            "dic": 12, "diciembre": 12
-        }
-        
-        # Buscar coincidencia del mes
-        for clave, valor in meses.items():
-            if clave in mes_texto:
-                mes = valor
-                break
-        else:
-            mes = None
-            
-        if mes is None:
-            return None
-            
-        # Año académico 2023-2024
-        if mes >= 9:  # septiembre a diciembre
-            año = 2023
-        else:  # enero a agosto
-            año = 2024
-            
-        return datetime(año, mes, dia)
-    except Exception as e:
-        return None
-""")
\ No newline at end of file
@@ -1,12 +1,11 @@
-import pandas as pd
-import numpy as np
+from carga_datos import cargar_recodificado
 
 def analizar_variables():
     """Analiza las variables en el dataframe y muestra información diagnóstica"""
     print("Cargando datos...")
     
     try:
-        df = pd.read_excel("recodificado.xlsx")
+        df = cargar_recodificado()
         
         print("\n=== INFORMACIÓN BÁSICA DEL DATAFRAME ===")
         print(f"Dimensiones: {df.shape[0]} filas, {df.shape[1]} columnas")
@@ -0,0 +1,230 @@
+import io
+import os
+import zipfile
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Sin pyarrow no está disponible la exportación a Parquet
+    pa = pq = None
+
+# =====================================================
+# EXPORTACIÓN POR FLUJO: XLSX, CSV EN ZIP Y PARQUET EN ZIP
+# =====================================================
+
+# Filas que se convierten y escriben de una vez
+FILAS_POR_BLOQUE = 10000
+
+# Filas de datos por hoja (límite de Excel menos la cabecera); el resto sigue en otra hoja
+MAX_FILAS_HOJA = 1048575
+
+# Formato -> (extensión, tipo MIME)
+FORMATOS_EXPORTACION = {
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('.zip', 'application/zip'),
+    'parquet': ('.zip', 'application/zip'),
+}
+
+# Cabecera como la de DataFrame.to_excel
+_FUENTE_CABECERA = Font(bold=True)
+_BORDE_CABECERA = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+_ALINEACION_CABECERA = Alignment(horizontal='center', vertical='top')
+
+def bloques(tabla, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Trozos de una tabla para escribirla por partes
+
+    Acepta un DataFrame (se recorre en trozos de filas_por_bloque filas) o un
+    iterable de DataFrames con las mismas columnas (p. ej. un generador), que
+    se consume sin reunirlo en memoria.
+    """
+    if isinstance(tabla, pd.DataFrame):
+        if len(tabla) == 0:
+            yield tabla
+        for inicio in range(0, len(tabla), filas_por_bloque):
+            yield tabla.iloc[inicio:inicio + filas_por_bloque]
+    else:
+        yield from tabla
+
+def nombres_unicos(nombres, longitud=31):
+    """Nombres recortados (hojas de Excel: 31 caracteres) sin repeticiones"""
+    usados, resultado = set(), []
+    for nombre in nombres:
+        base = str(nombre)[:longitud]
+        candidato, k = base, 2
+        while candidato.lower() in usados:
+            sufijo = f"_{k}"
+            candidato, k = base[:longitud - len(sufijo)] + sufijo, k + 1
+        usados.add(candidato.lower())
+        resultado.append(candidato)
+    return resultado
+
+def _valor_celda(valor):
+    """Valor escribible por openpyxl (None para NaN/NaT, texto para tipos no soportados)"""
+    if valor is None or isinstance(valor, (str, bool, int, float, datetime, date, time)):
+        if isinstance(valor, float) and np.isnan(valor):
+            return None
+        if valor is pd.NaT:
+            return None
+        return valor
+    if isinstance(valor, np.generic):
+        return _valor_celda(valor.item())
+    if pd.api.types.is_scalar(valor) and pd.isna(valor):
+        return None
+    return str(valor)
+
+def _filas(bloque):
+    valores = bloque.astype(object).to_numpy()
+    for fila in valores:
+        yield [_valor_celda(valor) for valor in fila]
+
+def _nueva_hoja(libro, titulo, cabecera):
+    hoja = libro.create_sheet(title=titulo)
+    celdas = []
+    for texto in cabecera:
+        celda = WriteOnlyCell(hoja, value=texto)
+        celda.font, celda.border, celda.alignment = _FUENTE_CABECERA, _BORDE_CABECERA, _ALINEACION_CABECERA
+        celdas.append(celda)
+    if celdas:
+        hoja.append(celdas)
+    return hoja
+
+def escribir_xlsx(tablas, destino):
+    """
+    Escribe varias tablas en un libro de Excel sin construirlo en memoria
+
+    Usa hojas de solo escritura de openpyxl: cada fila se vuelca al escribirse,
+    de modo que la memoria no crece con el tamaño del libro. Una tabla con más
+    filas de las que admite Excel continúa en hojas 'Nombre_2', 'Nombre_3'...
+
+    Parámetros:
+    - tablas: Diccionario nombre de hoja -> DataFrame o iterable de DataFrames
+    - destino: Ruta o archivo binario abierto para escritura
+    """
+    libro = Workbook(write_only=True)
+    nombres = nombres_unicos(tablas.keys())
+    usados = {nombre.lower() for nombre in nombres}
+
+    for nombre, tabla in zip(nombres, tablas.values()):
+        hoja, cabecera, parte, filas_hoja = None, None, 1, 0
+        for bloque in bloques(tabla):
+            if cabecera is None:
+                cabecera = [str(col) for col in bloque.columns]
+            for fila in _filas(bloque):
+                if hoja is None or filas_hoja == MAX_FILAS_HOJA:
+                    titulo = nombre
+                    if hoja is not None:
+                        parte += 1
+                        titulo = nombres_unicos(list(usados) + [f"{nombre[:27]}_{parte}"])[-1]
+                        usados.add(titulo.lower())
+                    hoja, filas_hoja = _nueva_hoja(libro, titulo, cabecera), 0
+                hoja.append(fila)
+                filas_hoja += 1
+        if hoja is None:
+            _nueva_hoja(libro, nombre, cabecera or [])
+
+    if not libro.worksheets:
+        libro.create_sheet(title="Hoja1")
+    libro.save(destino)
+
+def _en_archivo(volcar, tabla, destino):
+    # Ruta -> se abre y se cierra aquí; archivo ya abierto -> se deja abierto
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, 'wb') as binario:
+            volcar(tabla, binario)
+    else:
+        volcar(tabla, destino)
+
+def _volcar_csv(tabla, binario):
+    texto = io.TextIOWrapper(binario, encoding='utf-8-sig', newline='')
+    try:
+        for k, bloque in enumerate(bloques(tabla)):
+            bloque.to_csv(texto, index=False, header=(k == 0))
+        texto.flush()
+    finally:
+        texto.detach()
+
+def escribir_csv(tabla, destino):
+    """Escribe una tabla (DataFrame o iterable de trozos) como un CSV UTF-8 con BOM, trozo a trozo"""
+    _en_archivo(_volcar_csv, tabla, destino)
+
+def escribir_csv_zip(tablas, destino):
+    """
+    Escribe cada tabla como un CSV (UTF-8 con BOM, legible por Excel) dentro de un ZIP
+
+    Los CSV se comprimen a medida que se escriben los trozos, sin generar
+    antes el texto completo.
+    """
+    nombres = nombres_unicos(tablas.keys(), longitud=100)
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        for nombre, tabla in zip(nombres, tablas.values()):
+            with archivo_zip.open(f"{nombre}.csv", 'w', force_zip64=True) as binario:
+                _volcar_csv(tabla, binario)
+
+def _tabla_arrow(bloque, esquema=None):
+    bloque = bloque.rename(columns=str)
+    try:
+        return pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas de texto con tipos mezclados: se guardan como texto
+        mixtas = {col: 'string' for col in bloque.columns if bloque[col].dtype == object}
+        return pa.Table.from_pandas(bloque.astype(mixtas), schema=esquema, preserve_index=False)
+
+def _volcar_parquet(tabla, binario):
+    escritor = None
+    for bloque in bloques(tabla):
+        tabla_arrow = _tabla_arrow(bloque, escritor.schema if escritor is not None else None)
+        if escritor is None:
+            escritor = pq.ParquetWriter(binario, tabla_arrow.schema, compression='snappy')
+        escritor.write_table(tabla_arrow)
+    if escritor is not None:
+        escritor.close()
+
+def _requiere_pyarrow():
+    if pq is None:
+        raise ImportError("La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+
+def escribir_parquet(tabla, destino):
+    """Escribe una tabla (DataFrame o iterable de trozos) como un Parquet, un grupo de filas por trozo"""
+    _requiere_pyarrow()
+    _en_archivo(_volcar_parquet, tabla, destino)
+
+def escribir_parquet_zip(tablas, destino):
+    """
+    Escribe cada tabla como un Parquet dentro de un ZIP (un grupo de filas por trozo)
+
+    Parquet ya va comprimido, por lo que las entradas del ZIP se guardan sin
+    volver a comprimir. Requiere pyarrow.
+    """
+    _requiere_pyarrow()
+
+    nombres = nombres_unicos(tablas.keys(), longitud=100)
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_STORED) as archivo_zip:
+        for nombre, tabla in zip(nombres, tablas.values()):
+            with archivo_zip.open(f"{nombre}.parquet", 'w', force_zip64=True) as binario:
+                _volcar_parquet(tabla, binario)
+
+def exportar_tablas(tablas, formato='xlsx', destino=None):
+    """
+    Exporta un diccionario de tablas en el formato indicado ('xlsx', 'csv' o 'parquet')
+
+    Si no se indica destino devuelve un BytesIO listo para leer (p. ej. para
+    st.download_button); si se indica (ruta o archivo) escribe en él.
+    """
+    escritores = {'xlsx': escribir_xlsx, 'csv': escribir_csv_zip, 'parquet': escribir_parquet_zip}
+    if formato not in escritores:
+        raise ValueError(f"Formato de exportación desconocido: {formato}. Opciones: {list(escritores)}")
+
+    salida = io.BytesIO() if destino is None else destino
+    escritores[formato](tablas, salida)
+    if destino is None:
+        salida.seek(0)
+    return salida
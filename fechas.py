@@ -0,0 +1,102 @@
+import re
+import unicodedata
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# CONVERSIÓN DE FECHAS EN ESPAÑOL ("DD de MES")
+# =====================================================
+
+# Año de la campaña analizada (las fechas codificadas no incluyen el año)
+AÑO_CAMPAÑA = 2025
+
+# Los meses se reconocen por sus tres primeras letras: admite nombres completos,
+# abreviaturas ("abr", "sept.") y la variante "setiembre"
+MESES = {
+    'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'sep': 9, 'set': 9, 'oct': 10, 'nov': 11, 'dic': 12
+}
+
+# Día al inicio del texto, mes opcionalmente precedido de "de" y año opcional
+# ("de 2025", "del 2025", "2025"); anclado para no leer "2025 de mayo" como 25 de mayo
+PATRON_FECHA = re.compile(r'^\s*(?P<dia>\d{1,2})\s*(?:de\s+)?(?P<mes>[a-z]{3,})\.?(?:\s*(?:de|del)?\s*(?P<año>\d{4}))?')
+
+# Caché de cadenas ya convertidas: (texto, año, mes_inicio) -> datetime64[ns]
+_CACHE_FECHAS = {}
+MAX_CACHE_FECHAS = 100_000
+
+def normalizar_texto_fecha(texto):
+    """Pasa a minúsculas y elimina tildes y espacios sobrantes"""
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ASCII", "ignore").decode("ASCII")
+    return ' '.join(texto.lower().split())
+
+def inferir_años(meses, año=AÑO_CAMPAÑA, mes_inicio=None):
+    """
+    Asigna el año a cada mes según la política configurada
+
+    Con mes_inicio=None todas las fechas son del año indicado. Si la campaña cruza
+    el cambio de año, los meses >= mes_inicio se asignan al año anterior
+    (p. ej. año=2024, mes_inicio=9: septiembre-diciembre de 2023, enero-agosto de 2024).
+    """
+    años = np.full(len(meses), año, dtype=np.int64)
+    if mes_inicio is not None:
+        años[meses >= mes_inicio] = año - 1
+    return años
+
+def convertir_textos_fecha(textos, año=AÑO_CAMPAÑA, mes_inicio=None):
+    """Convierte un array de cadenas distintas a datetime64[ns] con una extracción regex vectorizada"""
+    # Las celdas que Excel ya entrega como fecha se conservan tal cual
+    es_fecha = np.array([isinstance(texto, (date, np.datetime64)) for texto in textos], dtype=bool)
+
+    normalizados = pd.Series([normalizar_texto_fecha(texto) for texto in textos], dtype=object)
+    partes = normalizados.str.extract(PATRON_FECHA)
+
+    meses = partes['mes'].str[:3].map(MESES).to_numpy(dtype=float)
+    dias = pd.to_numeric(partes['dia']).to_numpy(dtype=float)
+    años_explicitos = pd.to_numeric(partes['año']).to_numpy(dtype=float)
+
+    validos = ~np.isnan(meses) & ~np.isnan(dias)
+    años = inferir_años(np.nan_to_num(meses).astype(np.int64), año, mes_inicio).astype(float)
+    años = np.where(np.isnan(años_explicitos), años, años_explicitos)
+
+    componentes = pd.DataFrame({
+        'year': np.where(validos, años, np.nan),
+        'month': np.where(validos, meses, np.nan),
+        'day': np.where(validos, dias, np.nan)
+    })
+    # Las combinaciones imposibles (p. ej. "31 de febrero") quedan como NaT
+    fechas = pd.to_datetime(componentes, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    if es_fecha.any():
+        fechas[es_fecha] = pd.to_datetime(pd.Series(textos[es_fecha])).dt.normalize().to_numpy(dtype='datetime64[ns]')
+    return fechas
+
+def convertir_fechas(serie, año=AÑO_CAMPAÑA, mes_inicio=None):
+    """
+    Convierte una columna de fechas "DD de MES" a datetime de forma vectorizada
+
+    Solo se analizan las cadenas distintas de la columna que no estén ya en la
+    caché; el resultado se reparte a todas las filas con una indexación.
+
+    Parámetros:
+    - serie: Columna con fechas en texto ("10 de abril", "3 abr", "5 de mayo de 2025")
+    - año: Año asignado a las fechas que no lo indican
+    - mes_inicio: Mes a partir del cual las fechas pertenecen al año anterior (None = ninguno)
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = np.asarray(unicos, dtype=object)
+
+    claves = [(texto, año, mes_inicio) for texto in unicos]
+    pendientes = [i for i, clave in enumerate(claves) if clave not in _CACHE_FECHAS]
+    if pendientes:
+        if len(_CACHE_FECHAS) + len(pendientes) > MAX_CACHE_FECHAS:
+            _CACHE_FECHAS.clear()
+        convertidas = convertir_textos_fecha(unicos[pendientes], año, mes_inicio)
+        for i, fecha in zip(pendientes, convertidas):
+            _CACHE_FECHAS[claves[i]] = fecha
+
+    # La última posición (NaT) recoge los valores ausentes (código -1)
+    tabla = np.array([_CACHE_FECHAS[clave] for clave in claves] + [np.datetime64('NaT')],
+                     dtype='datetime64[ns]')
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name)
@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from indice_bitmap import bitmap_valor, bitmap_rango_fechas, bitmap_dummies, posiciones_bitmap
+from rendimiento import instrumentar
+
+# =====================================================
+# CACHÉ DE FILTROS DE LA BARRA LATERAL
+# =====================================================
+
+# Selecciones recientes (LRU): clave de selección -> (posiciones de fila, columnas dummy).
+# Compartida por las sesiones (un hilo por sesión): se accede siempre con el cerrojo
+_CACHE_FILTROS = OrderedDict()
+MAX_CACHE_FILTROS = 64
+_bloqueo_filtros = threading.Lock()
+
+def hay_seleccion_variable(variable_seleccionada):
+    return variable_seleccionada is not None and variable_seleccionada != "Todas las variables"
+
+def columnas_de_seleccion(df, dummy_cols, variable_seleccionada=None, categorias_seleccionadas=None):
+    """Columnas dummy de la selección y si las categorías elegidas restringen filas"""
+    if not hay_seleccion_variable(variable_seleccionada):
+        return dummy_cols, False
+    if not categorias_seleccionadas or "Todas las categorías" in categorias_seleccionadas:
+        return [col for col in dummy_cols if col.split('__')[0] == variable_seleccionada], False
+    cols_filtradas = [f"{variable_seleccionada}__{categoria}" for categoria in categorias_seleccionadas
+                      if f"{variable_seleccionada}__{categoria}" in df.columns]
+    return cols_filtradas, bool(cols_filtradas)
+
+def calcular_filtro_bitmap(indice, df, dummy_cols, candidato=None, fecha_inicio=None, fecha_fin=None,
+                           variable_seleccionada=None, categorias_seleccionadas=None):
+    """Igual que calcular_filtro() pero combinando los bitmaps del índice (AND/OR)"""
+    bitmap = indice['filas']
+
+    if candidato is not None and candidato != "Todos":
+        bitmap = bitmap & bitmap_valor(indice, 'Candidato', candidato)
+
+    if fecha_inicio is not None and fecha_fin is not None and 'Fecha_convertida' in df.columns:
+        bitmap = bitmap & bitmap_rango_fechas(indice, fecha_inicio, fecha_fin)
+
+    cols_filtradas, filtra_filas = columnas_de_seleccion(df, dummy_cols, variable_seleccionada,
+                                                         categorias_seleccionadas)
+    if filtra_filas:
+        bitmap = bitmap & bitmap_dummies(indice, cols_filtradas)
+
+    posiciones = posiciones_bitmap(indice, bitmap)
+    posiciones.setflags(write=False)
+    return posiciones, cols_filtradas
+
+@instrumentar()
+def calcular_filtro(df, dummy_cols, candidato=None, fecha_inicio=None, fecha_fin=None,
+                    variable_seleccionada=None, categorias_seleccionadas=None, indice=None):
+    """
+    Posiciones de las filas que cumplen los filtros de la barra lateral
+
+    Aplica los mismos criterios que el filtrado por candidato, por rango de fechas
+    (ambos extremos incluidos) y filtrar_datos_por_seleccion(), pero con máscaras
+    booleanas sobre arrays en lugar de copias del DataFrame. Con un índice de
+    bitmaps (indice_bitmap.py) no se recorre ninguna columna.
+    Devuelve (posiciones, columnas dummy de la selección); las posiciones son de solo lectura.
+    """
+    if indice is not None:
+        return calcular_filtro_bitmap(indice, df, dummy_cols, candidato, fecha_inicio, fecha_fin,
+                                      variable_seleccionada, categorias_seleccionadas)
+
+    mascara = np.ones(len(df), dtype=bool)
+
+    if candidato is not None and candidato != "Todos":
+        mascara &= (df['Candidato'] == candidato).to_numpy()
+
+    if fecha_inicio is not None and fecha_fin is not None and 'Fecha_convertida' in df.columns:
+        fechas = df['Fecha_convertida'].to_numpy(dtype='datetime64[ns]')
+        inicio = np.datetime64(fecha_inicio, 'D')
+        fin_exclusivo = np.datetime64(fecha_fin, 'D') + 1
+        mascara &= (fechas >= inicio) & (fechas < fin_exclusivo)
+
+    cols_filtradas, filtra_filas = columnas_de_seleccion(df, dummy_cols, variable_seleccionada,
+                                                         categorias_seleccionadas)
+    if filtra_filas:
+        # Al menos una de las categorías seleccionadas debe estar presente (OR)
+        mascara &= (df[cols_filtradas].to_numpy() == 1).any(axis=1)
+
+    posiciones = np.flatnonzero(mascara)
+    posiciones.setflags(write=False)
+    return posiciones, cols_filtradas
+
+def clave_seleccion(firma_datos=None, candidato=None, fecha_inicio=None, fecha_fin=None,
+                    variable_seleccionada=None, categorias_seleccionadas=None):
+    """Clave de una selección de la barra lateral (también la usan las cachés por sección)"""
+    return (firma_datos, candidato, fecha_inicio, fecha_fin, variable_seleccionada,
+            tuple(categorias_seleccionadas or ()))
+
+def obtener_filtro(df, dummy_cols, firma_datos=None, candidato=None, fecha_inicio=None, fecha_fin=None,
+                   variable_seleccionada=None, categorias_seleccionadas=None, indice=None):
+    """
+    Versión memorizada de calcular_filtro()
+
+    La clave es la selección (candidato, rango de fechas, variable, categorías)
+    junto con la firma de los datos; las opciones que no filtran filas (formato
+    APA, tema, tamaño de gráficos) no invalidan la caché.
+    """
+    clave = clave_seleccion(firma_datos, candidato, fecha_inicio, fecha_fin, variable_seleccionada,
+                            categorias_seleccionadas)
+    with _bloqueo_filtros:
+        resultado = _CACHE_FILTROS.get(clave)
+        if resultado is not None:
+            _CACHE_FILTROS.move_to_end(clave)
+            return resultado
+
+    # El cálculo se hace fuera del cerrojo (dos sesiones pueden calcular la misma selección)
+    resultado = calcular_filtro(df, dummy_cols, candidato, fecha_inicio, fecha_fin,
+                                variable_seleccionada, categorias_seleccionadas, indice)
+    with _bloqueo_filtros:
+        _CACHE_FILTROS[clave] = resultado
+        _CACHE_FILTROS.move_to_end(clave)
+        while len(_CACHE_FILTROS) > MAX_CACHE_FILTROS:
+            _CACHE_FILTROS.popitem(last=False)
+    return resultado
+
+def aplicar_filtro(df, posiciones):
+    """
+    Filas seleccionadas de df con una sola indexación
+
+    Sin copia si no se descarta ninguna fila (el propio df) o si las posiciones
+    son un tramo contiguo (vista con iloc); en otro caso pandas no admite vistas
+    de filas sueltas y take() las copia.
+    """
+    if len(posiciones) == len(df):
+        return df
+    if len(posiciones) == 0 or posiciones[-1] - posiciones[0] + 1 == len(posiciones):
+        inicio = int(posiciones[0]) if len(posiciones) else 0
+        return df.iloc[inicio:inicio + len(posiciones)]
+    return df.take(posiciones)
+
+class FilasFiltradas:
+    """
+    Selección de filas de df como array de posiciones, sin copiar el DataFrame
+
+    Tamaño y columnas se consultan sin materializar; materializar() construye el
+    DataFrame filtrado (aplicar_filtro) solo la primera vez que se pide, p. ej.
+    cuando una sección no está en caché y tiene que calcularse.
+    """
+    def __init__(self, df, posiciones):
+        self.df = df
+        self.posiciones = posiciones
+        self.columns = df.columns
+        self._filas = None
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    @property
+    def shape(self):
+        return (len(self.posiciones), len(self.columns))
+
+    def materializar(self):
+        if self._filas is None:
+            self._filas = aplicar_filtro(self.df, self.posiciones)
+        return self._filas
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyreadstat
+except ImportError:  # La lectura del .sav es opcional
+    pyreadstat = None
+
+from fechas import convertir_fechas
+from generar_dummies_desde_codigos import category_mappings, generar_dummies
+
+# =====================================================
+# FUENTE DE DATOS SPSS (.sav)
+# =====================================================
+
+ARCHIVO_SPSS = "TFMCRIS.sav"
+
+def codigo_texto(codigo):
+    """Código de una etiqueta de valor como texto ('2' y no '2.0')"""
+    if isinstance(codigo, float) and codigo.is_integer():
+        return str(int(codigo))
+    return str(codigo).strip()
+
+def etiquetas_de_valor(meta, renombrar):
+    """Etiquetas de valor del .sav por variable (nombre original): {código en texto: etiqueta}"""
+    return {
+        renombrar.get(nombre_spss, nombre_spss): {codigo_texto(codigo): etiqueta for codigo, etiqueta in etiquetas.items()}
+        for nombre_spss, etiquetas in meta.variable_value_labels.items()
+    }
+
+def aplicar_etiquetas(df, etiquetas):
+    """
+    Separa las etiquetas de valor en mapeos de dummies y etiquetas de columnas simples
+
+    Las variables codificadas (las de category_mappings) generan dummies con las
+    etiquetas del .sav, que tienen prioridad sobre los mapeos del script; en el
+    resto de variables (p. ej. Candidato) se sustituye el código por su etiqueta.
+    """
+    mapeos = {col: dict(cat_dict) for col, cat_dict in category_mappings.items()}
+    for variable, cat_dict in etiquetas.items():
+        if variable in mapeos:
+            mapeos[variable] = cat_dict
+        elif variable in df.columns:
+            codigos = df[variable].map(codigo_texto, na_action='ignore')
+            df[variable] = codigos.map(cat_dict).fillna(df[variable])
+    return df, mapeos
+
+def ajustar_tipos_spss(df):
+    """Adapta los tipos de SPSS a los de la lectura desde Excel (cadenas vacías = ausentes, enteros)"""
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]) or df[col].dtype == object:
+            df[col] = df[col].mask(df[col].astype(str).str.strip() == '')
+        elif pd.api.types.is_float_dtype(df[col]):
+            valores = df[col].to_numpy()
+            if not np.isnan(valores).any() and np.all(valores == np.round(valores)):
+                df[col] = valores.astype(np.int64)
+    return df
+
+def cargar_spss(ruta=ARCHIVO_SPSS):
+    """
+    Carga el archivo SPSS directamente en el esquema de columnas dummy de cargar_datos()
+
+    Las variables se renombran con sus etiquetas de variable (nombres originales
+    del Excel) y las dummies 'variable__categoria' se generan a partir de las
+    variables codificadas y sus etiquetas de valor. Las dummies y la fecha
+    guardadas en el .sav se descartan y se recalculan.
+    """
+    if pyreadstat is None:
+        raise ImportError("Para leer archivos .sav instala pyreadstat (pip install pyreadstat)")
+
+    df, meta = pyreadstat.read_sav(ruta)
+
+    derivadas = [col for col in df.columns if '__' in col or col == 'Fecha_convertida']
+    renombrar = {col: etiqueta for col, etiqueta in meta.column_names_to_labels.items()
+                 if etiqueta and col not in derivadas}
+    df = ajustar_tipos_spss(df.drop(columns=derivadas).rename(columns=renombrar))
+
+    df, mapeos = aplicar_etiquetas(df, etiquetas_de_valor(meta, renombrar))
+
+    if 'Fecha' in df.columns:
+        df['Fecha_convertida'] = convertir_fechas(df['Fecha'])
+
+    return generar_dummies(df, mapeos)
@@ -0,0 +1,261 @@
+import argparse
+import os
+import time
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from fechas import AÑO_CAMPAÑA
+from generar_dummies_desde_codigos import category_mappings, codificar_columna_multietiqueta, clean_label, leer_hojas
+from exportacion import escribir_xlsx, escribir_csv, escribir_parquet, MAX_FILAS_HOJA
+
+# =====================================================
+# GENERADOR DE DATOS SINTÉTICOS DE CAMPAÑA (PRUEBAS DE CARGA)
+# =====================================================
+# Publicaciones codificadas con el mismo esquema que analisis.xlsx (una hoja por
+# candidato, celdas con varios códigos como "1-2- 6", fechas "DD de mes"), para
+# medir la carga, la recodificación, los filtros y las exportaciones a escala.
+
+# Filas que se generan de una vez (la memoria no depende del total)
+FILAS_POR_BLOQUE = 100_000
+
+# Periodo de campaña simulado
+FECHA_INICIO = date(AÑO_CAMPAÑA, 3, 23)
+FECHA_FIN = date(AÑO_CAMPAÑA, 4, 10)
+
+# Candidatos reales; a partir del tercero se numeran
+CANDIDATOS_BASE = ['Luisa', 'Noboa']
+
+# Variables con un solo código por celda en la codificación original
+VARIABLES_CODIGO_UNICO = ["Contenido visual del post", "Aparición del líder", "Tipo de propaganda"]
+
+# Proporción de publicaciones con nota libre y variación entre candidatos de las frecuencias
+PROPORCION_NOTAS = 0.6
+DISPERSION_CANDIDATOS = 0.35
+
+NOMBRES_MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+                 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+
+_ALFABETO_ENLACES = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"))
+
+_FRAGMENTOS_NOTAS = [
+    "Responde a las críticas del rival", "Remarca la importancia de la democracia",
+    "Aparece con su familia", "Uso repetitivo de la palabra libertad", "Cierre de campaña",
+    "Fe y seguridad", "Orden, trabajo y paz", "Mensaje a los jóvenes", "Lo llama majadero",
+    "Video del debate", "Recorrido por la provincia", "Promesa de empleo", "MUY ÉPICA",
+    "Testimonio de una votante", "Ataque al gobierno anterior", "Meme sobre el rival"
+]
+
+def perfil_por_defecto(mappings=category_mappings):
+    """
+    Frecuencias de cada código cuando no se estiman a partir de datos reales
+
+    Devuelve un diccionario variable -> {'codigos', 'probabilidades' (presencia de
+    cada código en una publicación), 'unico' (un solo código por celda), 'ruido'
+    (proporción de celdas con un código fuera del diccionario)}.
+    """
+    perfil = {}
+    for variable, cat_dict in mappings.items():
+        codigos = list(cat_dict.keys())
+        pesos = 1.0 / np.arange(1, len(codigos) + 1)  # Los primeros códigos, más frecuentes
+        unico = variable in VARIABLES_CODIGO_UNICO
+        probabilidades = pesos / pesos.sum() if unico else np.minimum(pesos * 0.6, 0.9)
+        perfil[variable] = {'codigos': codigos, 'probabilidades': probabilidades,
+                            'unico': unico, 'ruido': 0.01}
+    return perfil
+
+def estimar_perfil(df, mappings=category_mappings):
+    """Frecuencias de cada código estimadas sobre una hoja de codificación real (ver perfil_por_defecto)"""
+    perfil = perfil_por_defecto(mappings)
+    for variable, cat_dict in mappings.items():
+        if variable not in df.columns:
+            continue
+        celdas = df[variable].dropna().astype(str)
+        if len(celdas) == 0:
+            continue
+        presencia = codificar_columna_multietiqueta(celdas, cat_dict, clean_label(variable)).to_numpy()
+        tokens = celdas.str.split('-')
+        conocidos = set(cat_dict)
+        perfil[variable] = {
+            'codigos': list(cat_dict.keys()),
+            'probabilidades': np.clip(presencia.mean(axis=0), 0.001, 0.95),
+            'unico': not celdas.str.contains('-').any(),
+            'ruido': float(tokens.map(lambda partes: any(p.strip() not in conocidos for p in partes)).mean())
+        }
+    return perfil
+
+def nombres_candidatos(n_candidatos):
+    return [CANDIDATOS_BASE[i] if i < len(CANDIDATOS_BASE) else f"Candidato {i + 1}"
+            for i in range(n_candidatos)]
+
+def _textos_fecha(fecha_inicio, fecha_fin):
+    dias = pd.date_range(fecha_inicio, fecha_fin, freq='D')
+    textos = np.array([f"{dia.day} de {NOMBRES_MESES[dia.month - 1]}" for dia in dias], dtype=object)
+    # Más publicaciones a medida que se acerca la elección
+    pesos = np.linspace(1.0, 2.5, len(dias))
+    return textos, pesos / pesos.sum()
+
+@lru_cache(maxsize=None)
+def _textos_mascaras(codigos, ruido_codigo):
+    """Texto de cada combinación de códigos (índice = máscara de bits), con y sin espacios"""
+    n_mascaras = 1 << (len(codigos) + 1)
+    juntos = np.empty(n_mascaras, dtype=object)
+    espaciados = np.empty(n_mascaras, dtype=object)
+    todos = list(codigos) + [ruido_codigo]
+    for mascara in range(n_mascaras):
+        presentes = [codigo for j, codigo in enumerate(todos) if mascara >> j & 1]
+        juntos[mascara] = "-".join(presentes)
+        espaciados[mascara] = "- ".join(presentes)
+    return juntos, espaciados
+
+def _columna_codigos(rng, n, datos):
+    """Celdas de una variable codificada para n publicaciones"""
+    codigos, probabilidades = datos['codigos'], np.asarray(datos['probabilidades'], dtype=float)
+    ruido_codigo = str(len(codigos) + 1)
+
+    if datos['unico']:
+        # Un código por celda (enteros, como en la hoja original)
+        elegidos = rng.choice(len(codigos), size=n, p=probabilidades / probabilidades.sum())
+        valores = np.asarray(codigos, dtype=np.int64)[elegidos]
+        fuera = rng.random(n) < datos['ruido']
+        valores[fuera] = int(ruido_codigo)
+        return valores
+
+    # Varios códigos: presencia independiente de cada uno; al menos uno por celda
+    presencia = rng.random((n, len(codigos))) < probabilidades
+    vacias = ~presencia.any(axis=1)
+    presencia[vacias, rng.choice(len(codigos), size=int(vacias.sum()), p=probabilidades / probabilidades.sum())] = True
+    mascaras = presencia.astype(np.int64) @ (1 << np.arange(len(codigos), dtype=np.int64))
+    mascaras |= (rng.random(n) < datos['ruido']).astype(np.int64) << len(codigos)
+
+    juntos, espaciados = _textos_mascaras(tuple(codigos), ruido_codigo)
+    return np.where(rng.random(n) < 0.2, espaciados[mascaras], juntos[mascaras])
+
+def _enlaces(rng, n):
+    letras = _ALFABETO_ENLACES[rng.integers(0, len(_ALFABETO_ENLACES), size=(n, 11))]
+    identificadores = np.ascontiguousarray(letras).view('<U11').ravel()
+    return np.char.add(np.char.add("https://www.instagram.com/p/", identificadores), "/").astype(object)
+
+def _notas(rng, n):
+    notas = np.full(n, None, dtype=object)
+    con_nota = np.flatnonzero(rng.random(n) < PROPORCION_NOTAS)
+    fragmentos = np.array(_FRAGMENTOS_NOTAS, dtype=object)
+    primera = fragmentos[rng.integers(0, len(fragmentos), size=len(con_nota))]
+    segunda = fragmentos[rng.integers(0, len(fragmentos), size=len(con_nota))]
+    dos_frases = rng.random(len(con_nota)) < 0.3
+    notas[con_nota] = np.where(dos_frases, primera + ". " + segunda, primera)
+    return notas
+
+def _perfil_candidato(rng, perfil):
+    """Frecuencias de un candidato: las del perfil con una variación aleatoria"""
+    propio = {}
+    for variable, datos in perfil.items():
+        factor = rng.lognormal(0.0, DISPERSION_CANDIDATOS, size=len(datos['codigos']))
+        propio[variable] = dict(datos, probabilidades=np.clip(datos['probabilidades'] * factor, 0.001, 0.95))
+    return propio
+
+def bloques_candidato(candidato, n_filas, rng, perfil=None, fecha_inicio=FECHA_INICIO, fecha_fin=FECHA_FIN,
+                      filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Publicaciones sintéticas de un candidato, en DataFrames de filas_por_bloque filas
+
+    Las columnas son las de la hoja de codificación: Candidato, Link, Nº Publi,
+    Fecha, las variables de category_mappings y Notas.
+    """
+    perfil = _perfil_candidato(rng, perfil or perfil_por_defecto())
+    textos_fecha, pesos_fecha = _textos_fecha(fecha_inicio, fecha_fin)
+
+    for inicio in range(0, n_filas, filas_por_bloque):
+        n = min(filas_por_bloque, n_filas - inicio)
+        # Fechas ordenadas dentro de cada bloque, como en las hojas originales
+        dias = np.sort(rng.choice(len(textos_fecha), size=n, p=pesos_fecha))
+        bloque = {
+            'Candidato': np.full(n, candidato, dtype=object),
+            'Link': _enlaces(rng, n),
+            'Nº Publi': np.arange(inicio + 1, inicio + n + 1),
+            'Fecha': textos_fecha[dias],
+        }
+        for variable, datos in perfil.items():
+            bloque[variable] = _columna_codigos(rng, n, datos)
+        bloque['Notas'] = _notas(rng, n)
+        yield pd.DataFrame(bloque)
+
+def repartir_filas(n_filas, n_candidatos, pesos=None):
+    """Publicaciones de cada candidato (reparto proporcional a los pesos, exacto en el total)"""
+    pesos = np.ones(n_candidatos) if pesos is None else np.asarray(pesos, dtype=float)
+    cuotas = n_filas * pesos / pesos.sum()
+    filas = np.floor(cuotas).astype(np.int64)
+    filas[np.argsort(filas - cuotas, kind='stable')[:n_filas - filas.sum()]] += 1
+    return filas
+
+def generar_hojas(n_filas, n_candidatos=2, semilla=None, perfil=None, pesos=None,
+                  filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Diccionario hoja (candidato en mayúsculas) -> generador de trozos
+
+    Con la misma semilla y los mismos parámetros el resultado es idéntico; cada
+    candidato usa su propio flujo aleatorio, derivado de la semilla.
+    """
+    flujos = np.random.SeedSequence(semilla).spawn(n_candidatos)
+    candidatos = nombres_candidatos(n_candidatos)
+    return {
+        candidato.upper(): bloques_candidato(candidato, int(filas), np.random.default_rng(flujo), perfil,
+                                             filas_por_bloque=filas_por_bloque)
+        for candidato, filas, flujo in zip(candidatos, repartir_filas(n_filas, n_candidatos, pesos), flujos)
+    }
+
+def generar_datos_sinteticos(n_filas, n_candidatos=2, semilla=None, perfil=None, pesos=None):
+    """Todas las publicaciones sintéticas en un DataFrame (como leer_hojas sobre analisis.xlsx)"""
+    hojas = generar_hojas(n_filas, n_candidatos, semilla, perfil, pesos)
+    trozos = [bloque for generador in hojas.values() for bloque in generador]
+    return pd.concat(trozos, ignore_index=True)
+
+def _todas_las_hojas(hojas):
+    for generador in hojas.values():
+        yield from generador
+
+def escribir_datos_sinteticos(ruta, n_filas, n_candidatos=2, semilla=None, perfil=None, pesos=None,
+                              filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera y escribe las publicaciones trozo a trozo, sin reunirlas en memoria
+
+    El formato se deduce de la extensión:
+    - .xlsx: una hoja por candidato, como analisis.xlsx (más de 1.048.575 filas
+      por candidato continúan en hojas adicionales)
+    - .csv / .parquet: un único archivo con todos los candidatos
+    """
+    hojas = generar_hojas(n_filas, n_candidatos, semilla, perfil, pesos, filas_por_bloque)
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.xlsx':
+        escribir_xlsx(hojas, ruta)
+    elif extension == '.csv':
+        escribir_csv(_todas_las_hojas(hojas), ruta)
+    elif extension == '.parquet':
+        escribir_parquet(_todas_las_hojas(hojas), ruta)
+    else:
+        raise ValueError(f"Formato no soportado: {extension}. Opciones: .xlsx, .csv, .parquet")
+    return ruta
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera publicaciones codificadas sintéticas para pruebas de carga")
+    parser.add_argument("--filas", type=int, default=1000, help="Número total de publicaciones")
+    parser.add_argument("--candidatos", type=int, default=2, help="Número de candidatos")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla (misma semilla = mismos datos)")
+    parser.add_argument("--salida", default="sintetico.xlsx", help="Archivo de salida (.xlsx, .csv o .parquet)")
+    parser.add_argument("--perfil", default=None,
+                        help="Hoja de codificación real (p. ej. analisis.xlsx) de la que estimar las frecuencias")
+    args = parser.parse_args()
+
+    perfil = estimar_perfil(leer_hojas(args.perfil)) if args.perfil else None
+    if args.salida.lower().endswith('.xlsx') and args.filas / args.candidatos > MAX_FILAS_HOJA:
+        print("Aviso: algunos candidatos superan el límite de filas de Excel y ocuparán varias hojas")
+
+    inicio = time.perf_counter()
+    escribir_datos_sinteticos(args.salida, args.filas, args.candidatos, args.semilla, perfil)
+    print(f"{args.filas} publicaciones de {args.candidatos} candidatos guardadas en {args.salida} "
+          f"({time.perf_counter() - inicio:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,14 @@
+import argparse
+import os
 import pandas as pd
+import numpy as np
 import unicodedata
-from datetime import datetime
+
+from fechas import convertir_fechas
 
 # Reemplaza esto por la ruta a tu archivo
 file_path = "analisis.xlsx"
 
-# Leer las dos hojas del archivo Excel
-print("Leyendo las hojas de Excel...")
-df1 = pd.read_excel(file_path, sheet_name=0)  # Primera hoja
-df2 = pd.read_excel(file_path, sheet_name=1)  # Segunda hoja
-
-print(f"Primera hoja: {len(df1)} filas")
-print(f"Segunda hoja: {len(df2)} filas")
-
-# Combinar los dataframes - agregar la segunda hoja al final de la primera
-df = pd.concat([df1, df2], ignore_index=True)
-print(f"Dataset combinado: {len(df)} filas")
-
 # Diccionario de categorías
 category_mappings = {
     "Contenido visual del post": {
@@ -98,73 +90,117 @@ def clean_label(label):
     label = label.lower().strip().replace(" ", "_").replace("/", "_").replace("–", "-")
     return label
 
-# Procesar fechas si existe la columna Fecha
-if 'Fecha' in df.columns:
+def codificar_columna_multietiqueta(serie, cat_dict, prefijo):
+    """
+    Genera de una sola pasada todas las dummies de una columna con códigos múltiples
+
+    Cada celda (p. ej. "1-2- 6") se tokeniza una única vez por valor distinto y los
+    indicadores de todas las categorías se construyen juntos como columnas uint8.
+
+    Parámetros:
+    - serie: Columna con los códigos separados por guiones
+    - cat_dict: Diccionario código -> etiqueta de la variable
+    - prefijo: Nombre limpio de la variable (parte anterior a '__')
+    """
+    codigos = list(cat_dict.keys())
+    posicion_codigo = {code: j for j, code in enumerate(codigos)}
+
+    # Factorizar: solo se tokenizan los valores distintos de la columna
+    indices, valores_unicos = pd.factorize(serie.astype(str))
+    tabla_unicos = np.zeros((len(valores_unicos) + 1, len(codigos)), dtype=np.uint8)
+    for i, valor in enumerate(valores_unicos):
+        for token in valor.split("-"):
+            j = posicion_codigo.get(token.strip())
+            if j is not None:
+                tabla_unicos[i, j] = 1
+
+    # La última fila (todo ceros) recoge los valores ausentes (índice -1)
+    matriz = tabla_unicos[indices]
+    columnas = [f"{prefijo}__{clean_label(label)}" for label in cat_dict.values()]
+    return pd.DataFrame(matriz, index=serie.index, columns=columnas)
+
+def generar_dummies(df, category_mappings):
+    """Añade al DataFrame las columnas dummy de todas las variables codificadas"""
+    bloques = []
+    for col, cat_dict in category_mappings.items():
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+            bloques.append(codificar_columna_multietiqueta(df[col], cat_dict, clean_label(col)))
+        else:
+            print(f"Advertencia: La columna '{col}' no fue encontrada en el dataset")
+
+    if bloques:
+        df = pd.concat([df] + bloques, axis=1)
+    return df
+
+def leer_hojas(ruta=file_path):
+    """Lee y combina las dos hojas (una por candidato) del archivo de codificación"""
+    print("Leyendo las hojas de Excel...")
+    df1 = pd.read_excel(ruta, sheet_name=0)  # Primera hoja
+    df2 = pd.read_excel(ruta, sheet_name=1)  # Segunda hoja
+
+    print(f"Primera hoja: {len(df1)} filas")
+    print(f"Segunda hoja: {len(df2)} filas")
+
+    # Combinar los dataframes - agregar la segunda hoja al final de la primera
+    df = pd.concat([df1, df2], ignore_index=True)
+    print(f"Dataset combinado: {len(df)} filas")
+    return df
+
+def procesar_fechas(df):
+    """Añade la columna Fecha_convertida si existe la columna Fecha"""
+    if 'Fecha' not in df.columns:
+        return df
+
     print("Procesando fechas...")
-      # Diccionario de meses en español
-    meses = {
-        'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
-        'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-    }
-    
-    def convertir_fecha(fecha_str):
-        try:
-            if pd.isna(fecha_str):
-                return None
-                
-            # Normalizar texto
-            fecha_str = str(fecha_str).lower().strip()
-            
-            # Extraer partes principales (día y mes)
-            if ' de ' in fecha_str:
-                partes = fecha_str.split(' de ')
-                dia_str = partes[0].strip()
-                # Si hay más texto después del mes, ignorarlo
-                mes_texto = partes[1].strip().split()[0]
-            else:
-                return None
-            
-            # Extraer el número del día
-            import re
-            dia_match = re.search(r'\d+', dia_str)
-            if dia_match:
-                dia = int(dia_match.group())
-            else:
-                return None
-                
-            # Obtener el mes
-            mes = meses.get(mes_texto, None)
-            if mes is None:
-                return None
-                
-            # Todas las fechas se consideran de 2025
-            return datetime(2025, mes, dia)
-        except Exception as e:
-            print(f"Error procesando fecha '{fecha_str}': {e}")
-            return None
-    
     # Crear columna de fecha convertida
-    df['Fecha_convertida'] = df['Fecha'].apply(convertir_fecha)
+    df['Fecha_convertida'] = convertir_fechas(df['Fecha'])
     print(f"Fechas procesadas: {df['Fecha_convertida'].notna().sum()} de {len(df)} registros")
+    return df
 
-print("Generando variables dummy...")
-
-# Procesar cada columna definida
-for col, cat_dict in category_mappings.items():
-    if col in df.columns:
-        df[col] = df[col].astype(str)
-        for code, label in cat_dict.items():
-            dummy_col = f"{clean_label(col)}__{clean_label(label)}"
-            df[dummy_col] = df[col].str.split("-").apply(
-                lambda values: int(code in [v.strip() for v in values]) if isinstance(values, list) else 0
-            )
+def recodificar(df):
+    """Convierte fechas y genera las dummies de un lote de filas de la hoja de codificación"""
+    df = procesar_fechas(df)
+    print("Generando variables dummy...")
+    # Procesar todas las columnas definidas (una pasada por columna)
+    return generar_dummies(df, category_mappings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera recodificado.xlsx con variables dummy a partir de analisis.xlsx")
+    parser.add_argument("--entrada", default=file_path, help="Archivo Excel con las hojas de codificación")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Solo recodifica las filas nuevas o modificadas y las añade al almacén incremental")
+    parser.add_argument("--exportar-excel", action="store_true",
+                        help="En modo incremental, regenera también recodificado.xlsx")
+    args = parser.parse_args()
+
+    df_fuente = leer_hojas(args.entrada)
+
+    if args.incremental:
+        from ingesta_incremental import ingerir_incremental
+        resumen = ingerir_incremental(df_fuente, recodificar)
+        print(f"Ingesta incremental: {resumen['nuevas']} nuevas, {resumen['modificadas']} modificadas, "
+              f"{resumen['eliminadas']} eliminadas (versión {resumen['version']})")
+        # La primera ingesta genera también el Excel, del que depende la vigencia del almacén
+        if not args.exportar_excel and os.path.exists("recodificado.xlsx"):
+            return
+        from carga_datos import cargar_almacen
+        df = cargar_almacen()
     else:
-        print(f"Advertencia: La columna '{col}' no fue encontrada en el dataset")
+        df = recodificar(df_fuente.copy())
+
+    # Guardar resultado
+    df.to_excel("recodificado.xlsx", index=False)
+
+    if not args.incremental:
+        # La recodificación completa reinicia el almacén incremental si ya existía
+        from ingesta_incremental import reiniciar_almacen_si_existe
+        reiniciar_almacen_si_existe(df_fuente, df)
 
-# Guardar resultado
-df.to_excel("recodificado.xlsx", index=False)
+    print("Proceso completado!")
+    print(f"Las dos hojas han sido combinadas: {len(df)} filas totales")
+    print(f"Variables dummy generadas para {len(category_mappings)} categorías")
+    print("Archivo guardado como: recodificado.xlsx")
 
-print("Proceso completado!")
-print(f"Las dos hojas han sido combinadas: {len(df)} filas totales")
-print(f"Variables dummy generadas para {len(category_mappings)} categorías")
-print("Archivo guardado como: recodificado.xlsx")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# MATRIZ BOOLEANA DE INDICADORES (COLUMNAS DUMMY)
+# =====================================================
+
+# Filas por bloque al multiplicar matrices (mantiene exactos los conteos en float32)
+FILAS_POR_BLOQUE = 1 << 20
+
+def construir_matriz_indicadores(df, dummy_cols):
+    """
+    Construye la matriz booleana de indicadores a partir de las columnas dummy
+
+    Devuelve un diccionario con:
+    - 'datos': ndarray booleano (publicaciones x columnas dummy), 1 byte por celda
+    - 'columnas': Lista de columnas dummy en el orden de la matriz
+    - 'posicion': Diccionario columna -> índice de columna en la matriz
+    """
+    columnas = [col for col in dummy_cols if col in df.columns]
+    if columnas:
+        datos = df[columnas].to_numpy(dtype=bool)
+    else:
+        datos = np.zeros((len(df), 0), dtype=bool)
+
+    return {
+        'datos': datos,
+        'columnas': columnas,
+        'posicion': {col: j for j, col in enumerate(columnas)}
+    }
+
+def seleccionar_submatriz(matriz, filas=None, columnas=None):
+    """Devuelve (datos, columnas) restringidos a unas filas (máscara o posiciones) y columnas"""
+    datos = matriz['datos']
+    nombres = matriz['columnas']
+
+    if columnas is not None:
+        nombres = [col for col in columnas if col in matriz['posicion']]
+        datos = datos[:, [matriz['posicion'][col] for col in nombres]]
+
+    if filas is not None:
+        datos = datos[filas]
+
+    return datos, nombres
+
+def sumar_indicadores(matriz, filas=None, columnas=None):
+    """Cuenta las publicaciones con cada indicador activo (una sola reducción matricial)"""
+    datos, nombres = seleccionar_submatriz(matriz, filas, columnas)
+    return pd.Series(np.count_nonzero(datos, axis=0), index=nombres, dtype='int64')
+
+def contar_coocurrencias(matriz, filas=None, columnas=None):
+    """
+    Calcula la matriz de coocurrencias X.T @ X entre indicadores
+
+    La celda (i, j) es el número de publicaciones que usan a la vez las categorías
+    i y j; la diagonal contiene la frecuencia de cada categoría.
+    """
+    datos, nombres = seleccionar_submatriz(matriz, filas, columnas)
+
+    conteos = np.zeros((len(nombres), len(nombres)), dtype=np.float64)
+    for inicio in range(0, datos.shape[0], FILAS_POR_BLOQUE):
+        bloque = datos[inicio:inicio + FILAS_POR_BLOQUE].astype(np.float32)
+        conteos += bloque.T @ bloque
+
+    return pd.DataFrame(conteos.astype(np.int64), index=nombres, columns=nombres)
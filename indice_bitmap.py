@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# ÍNDICE DE BITMAPS PARA FILTROS CATEGÓRICOS
+# =====================================================
+
+# Columnas categóricas indexadas: un bitmap por valor
+COLUMNA_CONTEXTO = 'Contexto de la imagen'
+COLUMNAS_INDEXADAS = ['Candidato', COLUMNA_CONTEXTO]
+
+# Número de bits activos de cada byte (para numpy sin np.bitwise_count)
+_BITS_POR_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def empaquetar(mascara):
+    """Convierte máscaras booleanas (..., filas) en bitmaps de 1 bit por fila"""
+    return np.packbits(mascara, axis=-1, bitorder='little')
+
+def construir_indice_bitmap(df, dummy_cols, columnas=None, col_fecha='Fecha_convertida'):
+    """
+    Construye una sola vez los bitmaps de filtrado del dataset
+
+    Devuelve un diccionario con:
+    - 'n_filas': Número de filas indexadas
+    - 'filas': Bitmap de las filas incluidas (todas, salvo en un índice restringido)
+    - 'categorias': {columna: {'valores': lista en orden de aparición,
+      'posicion': valor -> índice, 'bitmaps': ndarray (valores x bytes)}}
+    - 'dias': ndarray datetime64[D] ordenado y 'bitmaps_dias' (días x bytes)
+    - 'columnas': columnas dummy, 'posicion' y 'bitmaps_dummies' (columnas x bytes)
+
+    Cada bitmap tiene un bit por fila (bit i = fila i en el orden de df), de modo
+    que cualquier combinación de filtros se resuelve con AND/OR sobre bytes.
+    """
+    n_filas = len(df)
+    columnas = COLUMNAS_INDEXADAS if columnas is None else columnas
+
+    categorias = {}
+    for columna in columnas:
+        if columna not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[columna])
+        mascaras = codigos[None, :] == np.arange(len(valores))[:, None]
+        valores = list(valores)
+        categorias[columna] = {
+            'valores': valores,
+            'posicion': {valor: k for k, valor in enumerate(valores)},
+            'bitmaps': empaquetar(mascaras)
+        }
+
+    dias = np.array([], dtype='datetime64[D]')
+    bitmaps_dias = np.zeros((0, (n_filas + 7) // 8), dtype=np.uint8)
+    if col_fecha is not None and col_fecha in df.columns:
+        fechas = df[col_fecha].to_numpy(dtype='datetime64[D]')
+        codigos, dias = pd.factorize(fechas, sort=True)
+        dias = np.asarray(dias, dtype='datetime64[D]')
+        bitmaps_dias = empaquetar(codigos[None, :] == np.arange(len(dias))[:, None])
+
+    nombres = [col for col in dummy_cols if col in df.columns]
+    datos = df[nombres].to_numpy(dtype=bool) if nombres else np.zeros((n_filas, 0), dtype=bool)
+
+    return {
+        'n_filas': n_filas,
+        'filas': empaquetar(np.ones(n_filas, dtype=bool)),
+        'categorias': categorias,
+        'dias': dias,
+        'bitmaps_dias': bitmaps_dias,
+        'columnas': nombres,
+        'posicion': {col: j for j, col in enumerate(nombres)},
+        'bitmaps_dummies': empaquetar(datos.T)
+    }
+
+# =====================================================
+# OPERACIONES SOBRE BITMAPS
+# =====================================================
+
+def bitmap_vacio(indice):
+    return np.zeros((indice['n_filas'] + 7) // 8, dtype=np.uint8)
+
+def bitmap_y(*bitmaps):
+    """Intersección (AND) de bitmaps"""
+    return np.bitwise_and.reduce(np.stack(bitmaps), axis=0)
+
+def bitmap_o(indice, bitmaps):
+    """Unión (OR) de una pila de bitmaps (vacío si no hay ninguno)"""
+    if len(bitmaps) == 0:
+        return bitmap_vacio(indice)
+    return np.bitwise_or.reduce(bitmaps, axis=0)
+
+def contar_bits(bitmaps):
+    """Número de filas de cada bitmap (a lo largo del último eje)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitmaps).sum(axis=-1, dtype=np.int64)
+    return _BITS_POR_BYTE[bitmaps].sum(axis=-1, dtype=np.int64)
+
+def posiciones_bitmap(indice, bitmap):
+    """Posiciones (ordenadas) de las filas de un bitmap"""
+    return np.flatnonzero(np.unpackbits(bitmap, count=indice['n_filas'], bitorder='little'))
+
+def primera_fila(indice, bitmaps):
+    """Primera fila de cada bitmap de una pila (n_filas si está vacío)"""
+    bits = np.unpackbits(bitmaps, axis=-1, count=indice['n_filas'], bitorder='little').astype(bool)
+    if indice['n_filas'] == 0:
+        return np.zeros(bits.shape[:-1], dtype=np.int64)
+    return np.where(bits.any(axis=-1), bits.argmax(axis=-1), indice['n_filas'])
+
+def bitmap_valor(indice, columna, valor):
+    """Filas con columna == valor (vacío si la columna o el valor no están indexados)"""
+    categoria = indice['categorias'].get(columna)
+    if categoria is None or valor not in categoria['posicion']:
+        return bitmap_vacio(indice)
+    return categoria['bitmaps'][categoria['posicion'][valor]]
+
+def bitmap_rango_fechas(indice, fecha_inicio, fecha_fin):
+    """Filas con fecha entre fecha_inicio y fecha_fin (ambas incluidas)"""
+    dias = indice['dias']
+    inicio = np.searchsorted(dias, np.datetime64(fecha_inicio, 'D'), side='left')
+    fin = np.searchsorted(dias, np.datetime64(fecha_fin, 'D'), side='right')
+    return bitmap_o(indice, indice['bitmaps_dias'][inicio:fin])
+
+def bitmap_dummies(indice, columnas):
+    """Filas con al menos una de las columnas dummy activa (OR)"""
+    posiciones = [indice['posicion'][col] for col in columnas if col in indice['posicion']]
+    return bitmap_o(indice, indice['bitmaps_dummies'][posiciones])
+
+def valores_presentes(indice, columna, filtro=None):
+    """
+    Valores de una columna con alguna fila en el filtro, en orden de aparición
+
+    Equivale a df_filtrado[columna].dropna().unique() sin recorrer el DataFrame.
+    Devuelve (valores, bitmaps ya restringidos al filtro).
+    """
+    categoria = indice['categorias'].get(columna)
+    if categoria is None:
+        return [], np.zeros((0, (indice['n_filas'] + 7) // 8), dtype=np.uint8)
+    bitmaps = categoria['bitmaps'] if filtro is None else categoria['bitmaps'] & filtro
+    primeras = primera_fila(indice, bitmaps)
+    orden = [k for k in np.argsort(primeras, kind='stable') if primeras[k] < indice['n_filas']]
+    return [categoria['valores'][k] for k in orden], bitmaps[orden]
+
+def contar_dummies(indice, filtro, columnas):
+    """Publicaciones del filtro con cada columna dummy activa (Serie indexada por columna)"""
+    nombres = [col for col in columnas if col in indice['posicion']]
+    bitmaps = indice['bitmaps_dummies'][[indice['posicion'][col] for col in nombres]]
+    return pd.Series(contar_bits(bitmaps & filtro), index=nombres, dtype='int64')
+
+def restringir_indice(indice, filtro):
+    """
+    Índice limitado a las filas de un bitmap (p. ej. la selección de la barra lateral)
+
+    Las posiciones siguen refiriéndose al dataset completo; solo cambian los
+    bits activos, por lo que los conteos y el orden de aparición son los del
+    DataFrame filtrado.
+    """
+    restringido = dict(indice)
+    restringido['filas'] = indice['filas'] & filtro
+    restringido['categorias'] = {
+        columna: dict(categoria, bitmaps=categoria['bitmaps'] & filtro)
+        for columna, categoria in indice['categorias'].items()
+    }
+    restringido['bitmaps_dias'] = indice['bitmaps_dias'] & filtro
+    restringido['bitmaps_dummies'] = indice['bitmaps_dummies'] & filtro
+    return restringido
+
+def bitmap_posiciones(indice, posiciones):
+    """Bitmap de unas posiciones de fila (p. ej. las de una selección de filtros.py)"""
+    mascara = np.zeros(indice['n_filas'], dtype=bool)
+    mascara[posiciones] = True
+    return empaquetar(mascara)
@@ -0,0 +1,189 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt
+from docxtpl import DocxTemplate, InlineImage
+from jinja2 import Environment
+
+from tablas_docx import asegurar_estilo_tabla_apa, xml_tabla_apa
+
+# =====================================================
+# INFORME APA EN DOCX A PARTIR DE UNA PLANTILLA (DOCXTPL)
+# =====================================================
+
+# Plantilla APA incluida en el proyecto (se regenera si falta)
+PLANTILLA_APA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plantillas", "informe_apa.docx")
+
+# Ancho de las figuras en el informe
+ANCHO_FIGURA = Inches(6)
+
+# Plantillas compiladas que se conservan entre exportaciones
+MAX_PLANTILLAS_COMPILADAS = 8
+
+# Contenido de la plantilla: (texto, estilo, alineación, negrita, tamaño en pt).
+# Las líneas {%p ... %} ocupan un párrafo propio que docxtpl elimina; el párrafo
+# de seccion.tabla recibe un marcador que se sustituye por la tabla al final.
+_PARRAFOS_PLANTILLA = [
+    ("{{ titulo }}", 'Title', WD_ALIGN_PARAGRAPH.CENTER, False, 16),
+    ("Fecha de análisis: {{ fecha }}", None, WD_ALIGN_PARAGRAPH.CENTER, False, 12),
+    ("", None, None, False, 12),
+    ("{%p for seccion in secciones %}", None, None, False, 12),
+    ("{{ seccion.titulo }}", None, WD_ALIGN_PARAGRAPH.LEFT, True, 12),
+    ("{%p if seccion.tabla %}", None, None, False, 12),
+    ("{{ seccion.tabla }}", None, None, False, 12),
+    ("{%p endif %}", None, None, False, 12),
+    ("{%p if seccion.figura %}", None, None, False, 12),
+    ("{{ seccion.figura }}", None, WD_ALIGN_PARAGRAPH.CENTER, False, 12),
+    ("{%p endif %}", None, None, False, 12),
+    ("", None, None, False, 12),
+    ("{%p endfor %}", None, None, False, 12),
+]
+
+def crear_plantilla_apa(ruta=PLANTILLA_APA):
+    """
+    Genera la plantilla APA del informe (carta, márgenes de 1", Times New Roman 12 pt)
+
+    La plantilla puede editarse después en Word (estilos, encabezados, portada)
+    siempre que se conserven las etiquetas {{ ... }} y {%p ... %}.
+    """
+    doc = Document()
+    seccion = doc.sections[0]
+    seccion.page_height, seccion.page_width = Inches(11), Inches(8.5)
+    seccion.left_margin = seccion.right_margin = Inches(1)
+    seccion.top_margin = seccion.bottom_margin = Inches(1)
+
+    normal = doc.styles['Normal']
+    normal.font.name = 'Times New Roman'
+    normal.font.size = Pt(12)
+    asegurar_estilo_tabla_apa(doc)
+
+    for texto, estilo, alineacion, negrita, tamano in _PARRAFOS_PLANTILLA:
+        parrafo = doc.add_paragraph(style=estilo)
+        if texto:
+            run = parrafo.add_run(texto)
+            run.font.name = 'Times New Roman'
+            run.font.size = Pt(tamano)
+            run.bold = negrita or None
+        if alineacion is not None:
+            parrafo.alignment = alineacion
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    doc.save(ruta)
+    return ruta
+
+class _EntornoPlantillas(Environment):
+    """
+    Entorno Jinja que reutiliza la compilación de un mismo XML de plantilla
+
+    Lo comparten las sesiones de Streamlit (un hilo cada una): la caché de
+    plantillas compiladas se consulta y modifica con un cerrojo.
+    """
+
+    def __init__(self, maximo=MAX_PLANTILLAS_COMPILADAS):
+        super().__init__(autoescape=True)
+        self.maximo = maximo
+        self.compiladas = OrderedDict()
+        self.bloqueo = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class:
+            return super().from_string(source, globals, template_class)
+        with self.bloqueo:
+            plantilla = self.compiladas.get(source)
+            if plantilla is not None:
+                self.compiladas.move_to_end(source)
+                return plantilla
+        # Compilación fuera del cerrojo (dos hilos pueden compilar la misma plantilla)
+        plantilla = super().from_string(source)
+        with self.bloqueo:
+            self.compiladas[source] = plantilla
+            while len(self.compiladas) > self.maximo:
+                self.compiladas.popitem(last=False)
+        return plantilla
+
+_ENTORNO = _EntornoPlantillas()
+_ARCHIVOS_PLANTILLA = {}
+_bloqueo_archivos = threading.Lock()
+
+def cargar_plantilla(ruta=PLANTILLA_APA):
+    """
+    Plantilla docxtpl lista para renderizar
+
+    El archivo se lee una sola vez mientras no cambie (fecha de modificación y
+    tamaño) y cada llamada devuelve una plantilla nueva sobre esos bytes, ya
+    que docxtpl modifica el documento al renderizar.
+    """
+    if not os.path.exists(ruta):
+        crear_plantilla_apa(ruta)
+    estado = os.stat(ruta)
+    clave = (estado.st_mtime_ns, estado.st_size)
+
+    with _bloqueo_archivos:
+        guardada = _ARCHIVOS_PLANTILLA.get(ruta)
+        if guardada is None or guardada[0] != clave:
+            with open(ruta, 'rb') as archivo:
+                guardada = (clave, archivo.read())
+            _ARCHIVOS_PLANTILLA[ruta] = guardada
+    return DocxTemplate(io.BytesIO(guardada[1]))
+
+def _insertar_tablas(plantilla, tablas_marcadas):
+    """Sustituye cada párrafo marcador del documento renderizado por su tabla APA"""
+    cuerpo = plantilla.docx.element.body
+    for parrafo in list(cuerpo.iter(qn('w:p'))):
+        texto = ''.join(t.text or '' for t in parrafo.iter(qn('w:t')))
+        df = tablas_marcadas.get(texto.strip())
+        if df is not None:
+            parrafo.addprevious(parse_xml(xml_tabla_apa(df)))
+            parrafo.getparent().remove(parrafo)
+
+def generar_informe_docx(tablas, figuras=None, titulo_documento="Análisis de Campaña Electoral",
+                         ruta_plantilla=PLANTILLA_APA, destino=None):
+    """
+    Renderiza el informe APA con todas las tablas y figuras en una sola pasada
+
+    Parámetros:
+    - tablas: Diccionario nombre -> DataFrame (las vacías se omiten)
+    - figuras: Diccionario nombre -> imagen (bytes PNG, ruta o archivo)
+    - titulo_documento: Título principal del informe
+    - ruta_plantilla: Plantilla docxtpl (por defecto la plantilla APA del proyecto)
+    - destino: Ruta o archivo donde guardar; si es None se devuelve un BytesIO
+
+    La plantilla compilada se reutiliza entre llamadas. Las tablas no pasan por
+    Jinja: se insertan como XML en bloque (tablas_docx.py) sobre el documento
+    ya renderizado, de modo que su tamaño no encarece el renderizado.
+    """
+    plantilla = cargar_plantilla(ruta_plantilla)
+
+    secciones, tablas_marcadas = [], {}
+    for i, (nombre, df) in enumerate(((n, df) for n, df in tablas.items() if not df.empty), 1):
+        marcador = f"[[TABLA_{i}]]"
+        tablas_marcadas[marcador] = df
+        secciones.append({'titulo': f"Tabla {i}. {nombre}", 'tabla': marcador, 'figura': None})
+    for i, (nombre, imagen) in enumerate((figuras or {}).items(), 1):
+        if isinstance(imagen, (bytes, bytearray)):
+            imagen = io.BytesIO(imagen)
+        secciones.append({'titulo': f"Figura {i}. {nombre}", 'tabla': None,
+                          'figura': InlineImage(plantilla, imagen, width=ANCHO_FIGURA)})
+
+    contexto = {
+        'titulo': titulo_documento,
+        'fecha': datetime.now().strftime('%d de %B de %Y'),
+        'secciones': secciones
+    }
+    plantilla.render(contexto, jinja_env=_ENTORNO)
+    # Las tablas remiten al estilo TablaAPA: se añade si la plantilla (p. ej. una propia) no lo tiene
+    asegurar_estilo_tabla_apa(plantilla.docx)
+    _insertar_tablas(plantilla, tablas_marcadas)
+
+    salida = io.BytesIO() if destino is None else destino
+    plantilla.save(salida)
+    if destino is None:
+        salida.seek(0)
+    return salida
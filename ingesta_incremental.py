@@ -0,0 +1,213 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from carga_datos import (
+    DIRECTORIO_ALMACEN, leer_manifiesto, escribir_parte_almacen, cargar_almacen
+)
+from agregaciones import construir_cubo_conteos, actualizar_cubo_conteos
+
+# =====================================================
+# CONFIGURACIÓN DE LA INGESTA INCREMENTAL
+# =====================================================
+
+# Columnas que identifican una publicación (con el número de aparición para los duplicados)
+COLUMNAS_CLAVE = ['Candidato', 'Link']
+
+# Cubo de conteos persistido junto al almacén y actualizado en cada ingesta
+ARCHIVO_CUBO = "cubo_conteos.pkl"
+
+# A partir de este número de partes el almacén se compacta en una sola
+MAX_PARTES = 20
+
+# =====================================================
+# IDENTIFICACIÓN Y DETECCIÓN DE CAMBIOS
+# =====================================================
+
+def calcular_ids(df):
+    """Identificador estable de cada publicación: Candidato | Link | número de aparición"""
+    clave = pd.Series('', index=df.index, dtype=object)
+    for col in COLUMNAS_CLAVE:
+        if col in df.columns:
+            clave = clave + df[col].astype(str) + '|'
+    ocurrencia = clave.groupby(clave, sort=False).cumcount()
+    return clave + ocurrencia.astype(str)
+
+def calcular_hash_filas(df, columnas):
+    """Hash de contenido de cada fila en las columnas de origen (detecta filas modificadas)"""
+    return pd.util.hash_pandas_object(df[columnas].astype(str), index=False).to_numpy(dtype=np.uint64)
+
+def preparar_fuente(df_fuente):
+    """Añade a las filas de origen su identificador y su hash de contenido"""
+    df = df_fuente.copy()
+    columnas_origen = list(df_fuente.columns)
+    df['_id_publicacion'] = calcular_ids(df_fuente).to_numpy()
+    df['_hash_fila'] = calcular_hash_filas(df_fuente, columnas_origen)
+    return df, columnas_origen
+
+def detectar_cambios(df_fuente, df_almacen):
+    """
+    Compara las filas de origen con el almacén
+
+    Devuelve un diccionario con los identificadores 'nuevas', 'modificadas' y 'eliminadas'.
+    """
+    hash_almacen = pd.Series(df_almacen['_hash_fila'].to_numpy(), index=df_almacen['_id_publicacion'])
+    hash_fuente = pd.Series(df_fuente['_hash_fila'].to_numpy(), index=df_fuente['_id_publicacion'])
+
+    comunes = hash_fuente.index.intersection(hash_almacen.index)
+    distintos = hash_fuente[comunes].to_numpy() != hash_almacen[comunes].to_numpy()
+
+    return {
+        'nuevas': hash_fuente.index.difference(hash_almacen.index, sort=False),
+        'modificadas': comunes[distintos],
+        'eliminadas': hash_almacen.index.difference(hash_fuente.index, sort=False)
+    }
+
+# =====================================================
+# CUBO PERSISTIDO
+# =====================================================
+
+def columnas_dummy(df):
+    return [col for col in df.columns if '__' in col]
+
+def guardar_cubo_almacen(cubo, version, directorio=DIRECTORIO_ALMACEN):
+    """Guarda el cubo de conteos asociado a una versión del almacén (escritura atómica)"""
+    ruta = os.path.join(directorio, ARCHIVO_CUBO)
+    ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(ruta_temporal, 'wb') as f:
+        pickle.dump({'version': version, 'cubo': cubo}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta_temporal, ruta)
+
+def cargar_cubo_almacen(directorio=DIRECTORIO_ALMACEN):
+    """Devuelve el cubo persistido si corresponde a la versión vigente del almacén, o None"""
+    manifiesto = leer_manifiesto(directorio)
+    ruta = os.path.join(directorio, ARCHIVO_CUBO)
+    if manifiesto is None or not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, 'rb') as f:
+            guardado = pickle.load(f)
+    except Exception:
+        return None
+    return guardado['cubo'] if guardado['version'] == manifiesto['version'] else None
+
+def reconstruir_cubo_almacen(directorio=DIRECTORIO_ALMACEN):
+    """Recalcula el cubo a partir del contenido completo del almacén"""
+    df = cargar_almacen(directorio, incluir_control=True)
+    cubo = construir_cubo_conteos(df, columnas_dummy(df), posiciones=df['_orden'].to_numpy())
+    guardar_cubo_almacen(cubo, leer_manifiesto(directorio)['version'], directorio)
+    return cubo
+
+# =====================================================
+# INGESTA
+# =====================================================
+
+def recodificar_lote(df_fuente, columnas_origen, funcion_recodificar):
+    """Recodifica un lote de filas de origen conservando sus columnas de control"""
+    df = funcion_recodificar(df_fuente[columnas_origen].copy())
+    for col in ('_id_publicacion', '_hash_fila'):
+        df[col] = df_fuente[col].to_numpy()
+    return df
+
+def escribir_almacen_completo(df_fuente, df_recodificado, directorio=DIRECTORIO_ALMACEN):
+    """Sustituye el contenido del almacén por un dataset recodificado completo"""
+    df = df_recodificado.copy()
+    df['_id_publicacion'] = df_fuente['_id_publicacion'].to_numpy()
+    df['_hash_fila'] = df_fuente['_hash_fila'].to_numpy()
+    df['_orden'] = np.arange(len(df), dtype=np.int64)
+    df['_eliminada'] = False
+
+    version = escribir_parte_almacen(df, directorio, reiniciar=True)
+    cubo = construir_cubo_conteos(df, columnas_dummy(df_recodificado), posiciones=df['_orden'].to_numpy())
+    guardar_cubo_almacen(cubo, version, directorio)
+    return version
+
+def reiniciar_almacen_si_existe(df_fuente, df_recodificado, directorio=DIRECTORIO_ALMACEN):
+    """Tras una recodificación completa, mantiene sincronizado el almacén si ya se usaba"""
+    if leer_manifiesto(directorio) is None:
+        return None
+    df_fuente, _ = preparar_fuente(df_fuente)
+    return escribir_almacen_completo(df_fuente, df_recodificado, directorio)
+
+def ingerir_incremental(df_fuente, funcion_recodificar, directorio=DIRECTORIO_ALMACEN):
+    """
+    Recodifica solo las filas nuevas o modificadas y las añade al almacén
+
+    Parámetros:
+    - df_fuente: Filas de origen (hojas de codificación combinadas, sin recodificar)
+    - funcion_recodificar: Función que recibe filas de origen y devuelve filas recodificadas
+    - directorio: Carpeta del almacén
+
+    Las filas eliminadas del origen se registran como bajas. El cubo de conteos
+    persistido se actualiza con las diferencias en lugar de recalcularse.
+    Devuelve un resumen con el número de filas nuevas, modificadas y eliminadas y la versión.
+    """
+    df_fuente, columnas_origen = preparar_fuente(df_fuente)
+    df_almacen = cargar_almacen(directorio, incluir_control=True)
+
+    if df_almacen is None:
+        df_recodificado = funcion_recodificar(df_fuente[columnas_origen].copy())
+        version = escribir_almacen_completo(df_fuente, df_recodificado, directorio)
+        return {'nuevas': len(df_fuente), 'modificadas': 0, 'eliminadas': 0, 'version': version}
+
+    cambios = detectar_cambios(df_fuente, df_almacen)
+    resumen = {clave: len(ids) for clave, ids in cambios.items()}
+    if not any(resumen.values()):
+        resumen['version'] = leer_manifiesto(directorio)['version']
+        return resumen
+
+    cubo = cargar_cubo_almacen(directorio)
+    almacen_por_id = df_almacen.set_index('_id_publicacion', drop=False)
+
+    # Altas: filas nuevas y nueva versión de las modificadas (conservan su orden)
+    ids_altas = cambios['nuevas'].append(cambios['modificadas'])
+    fuente_altas = df_fuente[df_fuente['_id_publicacion'].isin(ids_altas)]
+    df_altas = recodificar_lote(fuente_altas, columnas_origen, funcion_recodificar)
+
+    orden_siguiente = int(df_almacen['_orden'].max()) + 1 if len(df_almacen) else 0
+    orden = almacen_por_id['_orden'].reindex(df_altas['_id_publicacion']).to_numpy(dtype=float, copy=True)
+    es_nueva = np.isnan(orden)
+    orden[es_nueva] = orden_siguiente + np.arange(es_nueva.sum())
+    df_altas['_orden'] = orden.astype(np.int64)
+    df_altas['_eliminada'] = False
+
+    # Bajas: versión anterior de las filas eliminadas, marcada como eliminada
+    df_eliminadas = almacen_por_id.loc[cambios['eliminadas']].reset_index(drop=True)
+    df_eliminadas['_eliminada'] = True
+
+    if set(df_altas.columns) != set(df_almacen.columns):
+        # Cambió el esquema (p. ej. nuevas categorías): se recodifica todo el origen
+        df_recodificado = funcion_recodificar(df_fuente[columnas_origen].copy())
+        resumen['version'] = escribir_almacen_completo(df_fuente, df_recodificado, directorio)
+        return resumen
+
+    parte = pd.concat([df_altas[df_almacen.columns], df_eliminadas[df_almacen.columns]], ignore_index=True)
+    version = escribir_parte_almacen(parte, directorio)
+
+    # Actualizar el cubo persistido con las diferencias (o recalcularlo si no estaba al día)
+    if cubo is not None and cubo['columnas'] == columnas_dummy(df_almacen):
+        df_bajas = almacen_por_id.loc[cambios['modificadas'].append(cambios['eliminadas'])]
+        cubo = actualizar_cubo_conteos(cubo, df_altas, df_bajas, cubo['columnas'],
+                                       posiciones_altas=df_altas['_orden'].to_numpy())
+        guardar_cubo_almacen(cubo, version, directorio)
+    else:
+        reconstruir_cubo_almacen(directorio)
+
+    if len(leer_manifiesto(directorio)['partes']) > MAX_PARTES:
+        compactar_almacen(directorio)
+
+    resumen['version'] = leer_manifiesto(directorio)['version']
+    return resumen
+
+def compactar_almacen(directorio=DIRECTORIO_ALMACEN):
+    """Reescribe el almacén como una única parte con la última versión de cada publicación"""
+    cubo = cargar_cubo_almacen(directorio)
+    df = cargar_almacen(directorio, incluir_control=True)
+    version = escribir_parte_almacen(df, directorio, reiniciar=True)
+    if cubo is not None:
+        guardar_cubo_almacen(cubo, version, directorio)
+    else:
+        reconstruir_cubo_almacen(directorio)
+    return version
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from indice_bitmap import construir_indice_bitmap, contar_bits, valores_presentes
+
+# =====================================================
+# ITEMSETS FRECUENTES Y REGLAS DE ASOCIACIÓN (APRIORI SOBRE BITMAPS)
+# =====================================================
+
+# Umbrales por defecto
+SOPORTE_MINIMO = 0.10
+CONFIANZA_MINIMA = 0.60
+LIFT_MINIMO = 1.10
+MAX_LONGITUD = 3
+
+def itemsets_frecuentes(bitmaps, filas, soporte_minimo=SOPORTE_MINIMO, max_longitud=MAX_LONGITUD):
+    """
+    Combinaciones de columnas dummy que aparecen juntas en al menos soporte_minimo publicaciones
+
+    Búsqueda por niveles (Apriori): cada itemset de longitud k + 1 se forma
+    uniendo dos itemsets frecuentes de longitud k con el mismo prefijo, y su
+    soporte es el número de bits del AND de sus bitmaps. Un candidato se descarta
+    sin contarlo si alguno de sus subconjuntos no es frecuente.
+
+    Parámetros:
+    - bitmaps: ndarray (columnas x bytes) con el bitmap de cada columna dummy
+    - filas: Bitmap de las publicaciones consideradas (p. ej. las de un candidato)
+    - soporte_minimo: Proporción mínima de publicaciones
+    - max_longitud: Número máximo de columnas por itemset
+
+    Devuelve un diccionario itemset (tupla de posiciones) -> número de publicaciones
+    y el total de publicaciones.
+    """
+    total = int(contar_bits(filas))
+    if total == 0:
+        return {}, 0
+    minimo = max(int(np.ceil(soporte_minimo * total)), 1)
+
+    # Nivel 1: un bitmap por columna, restringido a las filas consideradas
+    restringidos = bitmaps & filas
+    conteos = contar_bits(restringidos)
+    frecuentes = np.flatnonzero(conteos >= minimo)
+    nivel = {(j,): restringidos[j] for j in frecuentes}
+    soportes = {(j,): int(conteos[j]) for j in frecuentes}
+
+    longitud = 1
+    while nivel and longitud < max_longitud:
+        claves = sorted(nivel)
+        siguiente = {}
+        for a, itemset_a in enumerate(claves):
+            for itemset_b in claves[a + 1:]:
+                if itemset_a[:-1] != itemset_b[:-1]:
+                    break
+                candidato = itemset_a + itemset_b[-1:]
+                # Poda Apriori: todos los subconjuntos de longitud k deben ser frecuentes
+                if any(candidato[:k] + candidato[k + 1:] not in nivel for k in range(len(candidato) - 2)):
+                    continue
+                interseccion = nivel[itemset_a] & nivel[itemset_b]
+                publicaciones = int(contar_bits(interseccion))
+                if publicaciones >= minimo:
+                    siguiente[candidato] = interseccion
+                    soportes[candidato] = publicaciones
+        nivel = siguiente
+        longitud += 1
+
+    return soportes, total
+
+def generar_reglas(soportes, total, nombres, confianza_minima=CONFIANZA_MINIMA, lift_minimo=LIFT_MINIMO):
+    """
+    Reglas antecedente -> consecuente a partir de los itemsets frecuentes
+
+    Cada itemset de longitud >= 2 genera una regla por cada subconjunto propio
+    como antecedente. Devuelve un DataFrame con 'Antecedente', 'Consecuente',
+    'Publicaciones', 'Soporte', 'Confianza' y 'Lift', ordenado por lift y confianza.
+    """
+    reglas = []
+    for itemset, publicaciones in soportes.items():
+        if len(itemset) < 2:
+            continue
+        for tamano in range(1, len(itemset)):
+            for posiciones in _subconjuntos(itemset, tamano):
+                consecuente = tuple(j for j in itemset if j not in posiciones)
+                confianza = publicaciones / soportes[posiciones]
+                lift = confianza / (soportes[consecuente] / total)
+                if confianza >= confianza_minima and lift >= lift_minimo:
+                    reglas.append({
+                        'Antecedente': tuple(nombres[j] for j in posiciones),
+                        'Consecuente': tuple(nombres[j] for j in consecuente),
+                        'Publicaciones': publicaciones,
+                        'Soporte': publicaciones / total,
+                        'Confianza': confianza,
+                        'Lift': lift
+                    })
+
+    columnas = ['Antecedente', 'Consecuente', 'Publicaciones', 'Soporte', 'Confianza', 'Lift']
+    if not reglas:
+        return pd.DataFrame(columns=columnas)
+    return pd.DataFrame(reglas, columns=columnas).sort_values(
+        ['Lift', 'Confianza', 'Publicaciones'], ascending=False, kind='stable'
+    ).reset_index(drop=True)
+
+def _subconjuntos(itemset, tamano):
+    if tamano == 0:
+        yield ()
+        return
+    for k in range(len(itemset) - tamano + 1):
+        for resto in _subconjuntos(itemset[k + 1:], tamano - 1):
+            yield (itemset[k],) + resto
+
+def reglas_por_candidato(df, dummy_cols, indice=None, soporte_minimo=SOPORTE_MINIMO,
+                         confianza_minima=CONFIANZA_MINIMA, lift_minimo=LIFT_MINIMO,
+                         max_longitud=MAX_LONGITUD):
+    """
+    Combinaciones de estrategias y reglas de asociación de cada candidato
+
+    Parámetros:
+    - df: DataFrame con las columnas dummy y 'Candidato'
+    - dummy_cols: Columnas dummy (ítems) a considerar
+    - indice: Índice de bitmaps (indice_bitmap.py), ya restringido a la selección;
+      si es None se construye sobre df
+
+    Devuelve un diccionario con 'itemsets' (Candidato, Itemset, Longitud,
+    Publicaciones, Soporte) y 'reglas' (Candidato y las columnas de generar_reglas).
+    """
+    if indice is None:
+        indice = construir_indice_bitmap(df, dummy_cols)
+    nombres = [col for col in dummy_cols if col in indice['posicion']]
+    bitmaps = indice['bitmaps_dummies'][[indice['posicion'][col] for col in nombres]]
+
+    if 'Candidato' in indice['categorias']:
+        candidatos, bitmaps_candidato = valores_presentes(indice, 'Candidato')
+    else:
+        candidatos, bitmaps_candidato = ['Todos'], [indice['filas']]
+
+    tablas_itemsets, tablas_reglas = [], []
+    for candidato, filas in zip(candidatos, bitmaps_candidato):
+        soportes, total = itemsets_frecuentes(bitmaps, filas, soporte_minimo, max_longitud)
+        if not soportes:
+            continue
+        tablas_itemsets.append(pd.DataFrame({
+            'Candidato': candidato,
+            'Itemset': [tuple(nombres[j] for j in itemset) for itemset in soportes],
+            'Longitud': [len(itemset) for itemset in soportes],
+            'Publicaciones': list(soportes.values()),
+            'Soporte': [publicaciones / total for publicaciones in soportes.values()]
+        }))
+        reglas = generar_reglas(soportes, total, nombres, confianza_minima, lift_minimo)
+        reglas.insert(0, 'Candidato', candidato)
+        tablas_reglas.append(reglas)
+
+    itemsets = (pd.concat(tablas_itemsets, ignore_index=True) if tablas_itemsets else
+                pd.DataFrame(columns=['Candidato', 'Itemset', 'Longitud', 'Publicaciones', 'Soporte']))
+    reglas = (pd.concat(tablas_reglas, ignore_index=True) if tablas_reglas else
+              pd.DataFrame(columns=['Candidato', 'Antecedente', 'Consecuente', 'Publicaciones',
+                                    'Soporte', 'Confianza', 'Lift']))
+    return {'itemsets': itemsets, 'reglas': reglas}
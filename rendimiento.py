@@ -0,0 +1,200 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# =====================================================
+# INSTRUMENTACIÓN DE RENDIMIENTO POR EJECUCIÓN
+# =====================================================
+# Cada ejecución (rerun) del script registra, por función o sección medida, el
+# tiempo de pared, las filas procesadas, si el resultado vino de caché y el pico
+# de memoria. Sin una ejecución iniciada, medir() e instrumentar() no hacen nada.
+#
+# La medición de memoria es un interruptor de diagnóstico: tracemalloc ralentiza
+# todas las asignaciones del proceso y su pico es global, así que solo está
+# activo mientras alguna ejecución lo pide y, con varias sesiones midiendo a la
+# vez, los picos de una pueden incluir asignaciones de otra.
+
+# Registro JSONL (una línea por ejecución) para el análisis posterior
+ARCHIVO_LOG = os.environ.get("CAMPANA_LOG_RENDIMIENTO", "rendimiento.jsonl")
+
+# Estado de la ejecución en curso (Streamlit ejecuta cada sesión en su propio hilo)
+_estado = threading.local()
+
+_bloqueo_tracemalloc = threading.Lock()
+
+# Ejecuciones en curso que miden memoria (tracemalloc se detiene al llegar a cero)
+_ejecuciones_con_memoria = 0
+
+def activar_tracemalloc():
+    """Activa tracemalloc para una ejecución más (lo arranca si ninguna lo usaba)"""
+    global _ejecuciones_con_memoria
+    with _bloqueo_tracemalloc:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _ejecuciones_con_memoria += 1
+
+def desactivar_tracemalloc():
+    """Libera tracemalloc para una ejecución (lo detiene si ninguna otra lo usa)"""
+    global _ejecuciones_con_memoria
+    with _bloqueo_tracemalloc:
+        _ejecuciones_con_memoria = max(_ejecuciones_con_memoria - 1, 0)
+        if _ejecuciones_con_memoria == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def acumular_pico():
+    """
+    Lleva el pico de tracemalloc a la ejecución y a las mediciones abiertas y lo reinicia
+
+    Se llama al abrir y cerrar cada medición: así cada bloque puede reiniciar el
+    pico sin perder el de los bloques que lo contienen.
+    """
+    pico = tracemalloc.get_traced_memory()[1]
+    _estado.pico = max(_estado.pico, pico)
+    _estado.picos = [max(p, pico) for p in _estado.picos]
+    tracemalloc.reset_peak()
+
+def iniciar_ejecucion(memoria=False):
+    """
+    Empieza el registro de una ejecución
+
+    Con memoria=True se mide el pico de memoria de la ejecución y de cada
+    medición (activa tracemalloc hasta finalizar_ejecucion, que tiene coste;
+    el tiempo y las filas se miden siempre).
+    """
+    if getattr(_estado, 'mediciones', None) is not None and _estado.memoria:
+        desactivar_tracemalloc()  # Ejecución anterior interrumpida sin finalizar
+    _estado.mediciones = []
+    _estado.pila = []
+    _estado.picos = []
+    _estado.calculos = 0
+    _estado.inicio = time.perf_counter()
+    _estado.fecha = datetime.now().isoformat()
+    _estado.memoria = memoria
+    if memoria:
+        activar_tracemalloc()
+        tracemalloc.reset_peak()
+        _estado.memoria_inicial = _estado.pico = tracemalloc.get_traced_memory()[0]
+
+def finalizar_ejecucion():
+    """
+    Cierra el registro de la ejecución en curso
+
+    Devuelve un diccionario con 'fecha', 'duracion' (s), 'memoria_pico' (bytes
+    por encima de la memoria trazada al iniciar la ejecución, o None sin medición
+    de memoria) y 'mediciones' (en orden de finalización), o None si no había
+    ninguna ejecución iniciada.
+    """
+    mediciones = getattr(_estado, 'mediciones', None)
+    if mediciones is None:
+        return None
+    memoria_pico = None
+    if _estado.memoria:
+        if tracemalloc.is_tracing():
+            acumular_pico()
+            memoria_pico = _estado.pico - _estado.memoria_inicial
+        desactivar_tracemalloc()
+    ejecucion = {
+        'fecha': _estado.fecha,
+        'duracion': time.perf_counter() - _estado.inicio,
+        'memoria_pico': memoria_pico,
+        'mediciones': mediciones
+    }
+    _estado.mediciones = None
+    return ejecucion
+
+def anotar_calculo():
+    """Indica que se ha calculado algo (para distinguir aciertos y fallos de caché en medir)"""
+    if getattr(_estado, 'mediciones', None) is not None:
+        _estado.calculos += 1
+
+def contar_filas(valor):
+    """Filas de un DataFrame (o suma de las de un diccionario de DataFrames); None si no aplica"""
+    if isinstance(valor, dict):
+        filas = [contar_filas(v) for v in valor.values()]
+        filas = [f for f in filas if f is not None]
+        return sum(filas) if filas else None
+    if hasattr(valor, 'shape') and hasattr(valor, '__len__'):
+        return len(valor)
+    return None
+
+@contextmanager
+def medir(nombre, filas=None, cache=False):
+    """
+    Mide el bloque como una entrada del registro de la ejecución
+
+    Devuelve (as) el diccionario de la medición, para completar 'filas' desde
+    dentro del bloque. Con cache=True el bloque es una llamada memorizada: cuenta
+    como fallo ('miss') si dentro se ha calculado algo (funciones instrumentadas
+    o anotar_calculo) y como acierto ('hit') si no. 'memoria_pico' es el máximo
+    de bytes trazados durante el bloque por encima de los que había al empezar
+    (incluye temporales ya liberados al terminar).
+    """
+    medicion = {'nombre': nombre, 'filas': filas, 'cache': None}
+    if getattr(_estado, 'mediciones', None) is None:
+        yield medicion
+        return
+
+    pila = _estado.pila
+    medicion['padre'] = pila[-1]['nombre'] if pila else None
+    calculos_previos = _estado.calculos
+    medir_memoria = _estado.memoria and tracemalloc.is_tracing()
+    memoria_inicial = None
+    if medir_memoria:
+        acumular_pico()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+    pila.append(medicion)
+    _estado.picos.append(memoria_inicial or 0)
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        medicion['tiempo'] = time.perf_counter() - inicio
+        if memoria_inicial is not None and tracemalloc.is_tracing():
+            acumular_pico()
+        pico = _estado.picos.pop()
+        pila.pop()
+        if cache:
+            medicion['cache'] = 'miss' if _estado.calculos > calculos_previos else 'hit'
+        medicion['memoria_pico'] = pico - memoria_inicial if memoria_inicial is not None else None
+        _estado.mediciones.append(medicion)
+
+def instrumentar(nombre=None):
+    """
+    Decorador que mide cada llamada a la función con medir()
+
+    Las filas procesadas son las del primer argumento (DataFrame o diccionario de
+    DataFrames); cada llamada cuenta como cálculo para las cachés que la contienen.
+    """
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if getattr(_estado, 'mediciones', None) is None:
+                return funcion(*args, **kwargs)
+            anotar_calculo()
+            with medir(etiqueta, filas=contar_filas(args[0]) if args else None):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def resumen_ejecucion(ejecucion):
+    """Totales de una ejecución: duración, aciertos y fallos de caché y pico de memoria"""
+    mediciones = ejecucion['mediciones']
+    return {
+        'duracion': ejecucion['duracion'],
+        'aciertos_cache': sum(m['cache'] == 'hit' for m in mediciones),
+        'fallos_cache': sum(m['cache'] == 'miss' for m in mediciones),
+        'memoria_pico': ejecucion.get('memoria_pico')
+    }
+
+def guardar_ejecucion(ejecucion, ruta=None):
+    """Añade la ejecución como una línea JSON al registro"""
+    ruta = ruta or ARCHIVO_LOG
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(ejecucion, ensure_ascii=False, default=str) + "\n")
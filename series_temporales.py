@@ -0,0 +1,241 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fechas import AÑO_CAMPAÑA
+from agregaciones import construir_cubo_conteos, SIN_FILA
+
+# =====================================================
+# MOTOR TEMPORAL: PERIODO × CANDIDATO × ESTRATEGIA
+# =====================================================
+# A partir del cubo de conteos (agregaciones.py) se construye, una vez por
+# selección, un array 3-D por frecuencia (diaria, semanal y por fase de campaña)
+# con los usos, la media móvil y la proporción acumulada de cada columna dummy y
+# candidato. Los gráficos solo recortan ese array, sin reagrupar las filas.
+
+FRECUENCIAS = {
+    'diaria': "Diaria",
+    'semanal': "Semanal",
+    'fase': "Fase de campaña"
+}
+
+MEDIDAS = {
+    'usos': "Número de usos",
+    'media_movil': "Media móvil de usos",
+    'proporcion_acumulada': "Proporción acumulada (%)"
+}
+
+# Columna con la etiqueta del periodo en las tablas de cada frecuencia
+COLUMNA_PERIODO = {
+    'diaria': 'Fecha_convertida',
+    'semanal': 'Semana',
+    'fase': 'Fase'
+}
+
+# Ventana de la media móvil, en periodos de cada frecuencia
+VENTANA_MEDIA_MOVIL = {'diaria': 7, 'semanal': 2, 'fase': 1}
+
+# Calendario de la segunda vuelta presidencial de Ecuador (la primera vuelta fue
+# el 9 de febrero): campaña oficial del 23 de marzo (debate) al 10 de abril,
+# silencio electoral el 11 y 12 de abril y votación el 13 de abril.
+# Ambos extremos de cada fase incluidos.
+FASES_CAMPAÑA = [
+    ("Arranque y debate", date(AÑO_CAMPAÑA, 3, 23), date(AÑO_CAMPAÑA, 3, 29)),
+    ("Campaña intermedia", date(AÑO_CAMPAÑA, 3, 30), date(AÑO_CAMPAÑA, 4, 5)),
+    ("Cierre de campaña", date(AÑO_CAMPAÑA, 4, 6), date(AÑO_CAMPAÑA, 4, 10)),
+    ("Silencio electoral", date(AÑO_CAMPAÑA, 4, 11), date(AÑO_CAMPAÑA, 4, 12)),
+    ("Jornada electoral", date(AÑO_CAMPAÑA, 4, 13), date(AÑO_CAMPAÑA, 4, 13))
+]
+FASE_ANTERIOR = "Antes de la campaña"
+FASE_POSTERIOR = "Después de las elecciones"
+
+def serie_diaria_cubo(cubo, candidatos=None, fecha_inicio=None, fecha_fin=None):
+    """
+    Usos diarios de la selección como array días × candidatos × columnas
+
+    El eje de días es un calendario continuo entre el primer y el último día con
+    publicaciones (los días sin publicaciones quedan a cero); las publicaciones
+    sin fecha no se incluyen. Devuelve un diccionario con 'conteos',
+    'publicaciones' (días × candidatos), 'periodos' (DatetimeIndex),
+    'candidatos', 'columnas' y 'posicion'.
+    """
+    dias = cubo['fechas']
+    indices_candidato = np.arange(len(cubo['candidatos']))
+    if candidatos is not None:
+        indices_candidato = np.array(
+            [i for i, cand in enumerate(cubo['candidatos']) if cand in candidatos], dtype=np.intp
+        )
+    seleccion = np.ones(len(dias), dtype=bool)
+    if fecha_inicio is not None:
+        seleccion &= dias >= np.datetime64(fecha_inicio, 'D')
+    if fecha_fin is not None:
+        seleccion &= dias <= np.datetime64(fecha_fin, 'D')
+    indices_fecha = np.flatnonzero(seleccion)
+
+    publicaciones = cubo['publicaciones'][indices_candidato][:, indices_fecha]
+    conteos = cubo['conteos'][indices_candidato][:, indices_fecha]
+    primera_fila = cubo['primera_fila'][indices_candidato][:, indices_fecha].min(axis=1, initial=SIN_FILA)
+
+    # Solo candidatos y días con publicaciones en la selección (candidatos en orden de aparición)
+    presentes = np.flatnonzero(publicaciones.sum(axis=1) > 0)
+    presentes = presentes[np.argsort(primera_fila[presentes], kind='stable')]
+    con_publicaciones = np.flatnonzero(publicaciones[presentes].sum(axis=0) > 0)
+    dias = dias[indices_fecha][con_publicaciones]
+
+    if len(dias) == 0:
+        calendario = np.array([], dtype='datetime64[D]')
+    else:
+        calendario = np.arange(dias[0], dias[-1] + 1, dtype='datetime64[D]')
+    posicion_dia = (dias - calendario[0]).astype(np.intp) if len(dias) else np.array([], dtype=np.intp)
+
+    n_columnas = len(cubo['columnas'])
+    serie_conteos = np.zeros((len(calendario), len(presentes), n_columnas), dtype=np.int64)
+    serie_publicaciones = np.zeros((len(calendario), len(presentes)), dtype=np.int64)
+    serie_conteos[posicion_dia] = conteos[presentes][:, con_publicaciones].transpose(1, 0, 2)
+    serie_publicaciones[posicion_dia] = publicaciones[presentes][:, con_publicaciones].T
+
+    return {
+        'conteos': serie_conteos,
+        'publicaciones': serie_publicaciones,
+        'periodos': pd.DatetimeIndex(calendario.astype('datetime64[ns]')),
+        'candidatos': [cubo['candidatos'][indices_candidato[i]] for i in presentes],
+        'columnas': cubo['columnas'],
+        'posicion': cubo['posicion']
+    }
+
+def fases_segun_rango(fecha_inicio, fecha_fin, fases=FASES_CAMPAÑA):
+    """
+    Fases que cubren el rango de fechas de los datos (ambos extremos incluidos)
+
+    Las fases de campaña se recortan al rango (las que quedan fuera se omiten) y
+    los días anteriores o posteriores forman una fase más, con sus fechas en el nombre.
+    """
+    fecha_inicio, fecha_fin = pd.Timestamp(fecha_inicio).date(), pd.Timestamp(fecha_fin).date()
+    if not fases:
+        return [(f"{FASE_ANTERIOR} ({fecha_inicio:%d/%m}–{fecha_fin:%d/%m})", fecha_inicio, fecha_fin)]
+    resultado = [(nombre, max(inicio, fecha_inicio), min(fin, fecha_fin))
+                 for nombre, inicio, fin in fases if inicio <= fecha_fin and fin >= fecha_inicio]
+    if fecha_inicio < fases[0][1]:
+        fin = min(fases[0][1] - timedelta(days=1), fecha_fin)
+        resultado.insert(0, (f"{FASE_ANTERIOR} ({fecha_inicio:%d/%m}–{fin:%d/%m})", fecha_inicio, fin))
+    if fecha_fin > fases[-1][2]:
+        inicio = max(fases[-1][2] + timedelta(days=1), fecha_inicio)
+        resultado.append((f"{FASE_POSTERIOR} ({inicio:%d/%m}–{fecha_fin:%d/%m})", inicio, fecha_fin))
+    return resultado
+
+def etiquetas_fase(dias, fases=FASES_CAMPAÑA):
+    """Fase de campaña de cada día (antes de la primera o después de la última, si cae fuera)"""
+    dias = np.asarray(dias, dtype='datetime64[D]')
+    etiquetas = np.full(len(dias), FASE_POSTERIOR, dtype=object)
+    for nombre, inicio, fin in reversed(fases):
+        etiquetas[dias <= np.datetime64(fin, 'D')] = nombre
+    if fases:
+        etiquetas[dias < np.datetime64(fases[0][1], 'D')] = FASE_ANTERIOR
+    orden = [FASE_ANTERIOR] + [nombre for nombre, _, _ in fases] + [FASE_POSTERIOR]
+    return etiquetas, orden
+
+def remuestrear(serie, frecuencia, fases=FASES_CAMPAÑA):
+    """
+    Agrupa la serie diaria por semana (empezando en lunes) o por fase de campaña
+
+    Solo se conservan los periodos que contienen algún día del calendario.
+    """
+    if frecuencia == 'diaria':
+        return serie
+    dias = serie['periodos'].values.astype('datetime64[D]')
+    if frecuencia == 'semanal':
+        # El 1970-01-01 fue jueves: se retrocede hasta el lunes de cada semana
+        lunes = dias - ((dias.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+        periodos, codigos = np.unique(lunes, return_inverse=True)
+        periodos = pd.DatetimeIndex(periodos.astype('datetime64[ns]'))
+    elif frecuencia == 'fase':
+        etiquetas, orden = etiquetas_fase(dias, fases)
+        periodos = [nombre for nombre in orden if (etiquetas == nombre).any()]
+        codigos = np.array([periodos.index(e) for e in etiquetas], dtype=np.intp)
+        periodos = pd.Index(periodos)
+    else:
+        raise ValueError(f"Frecuencia no reconocida: {frecuencia}")
+
+    conteos = np.zeros((len(periodos),) + serie['conteos'].shape[1:], dtype=np.int64)
+    publicaciones = np.zeros((len(periodos),) + serie['publicaciones'].shape[1:], dtype=np.int64)
+    np.add.at(conteos, codigos, serie['conteos'])
+    np.add.at(publicaciones, codigos, serie['publicaciones'])
+    return {**serie, 'conteos': conteos, 'publicaciones': publicaciones, 'periodos': periodos}
+
+def media_movil(valores, ventana):
+    """Media móvil sobre el eje de tiempo (primer eje), con ventanas incompletas al inicio"""
+    acumulado = np.cumsum(valores, axis=0, dtype=np.float64)
+    resultado = acumulado.copy()
+    if ventana < len(valores):
+        resultado[ventana:] -= acumulado[:-ventana]
+    tamano = np.minimum(np.arange(1, len(valores) + 1), ventana).reshape((-1,) + (1,) * (valores.ndim - 1))
+    return resultado / tamano
+
+def proporcion_acumulada(conteos, publicaciones):
+    """Porcentaje de publicaciones acumuladas hasta cada periodo que usan cada estrategia"""
+    usos = np.cumsum(conteos, axis=0, dtype=np.float64)
+    total = np.cumsum(publicaciones, axis=0, dtype=np.float64)[..., np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, usos / total * 100, 0.0)
+
+def calcular_medidas(serie, ventana):
+    """Usos, media móvil y proporción acumulada de una serie (mismas dimensiones)"""
+    return {
+        'usos': serie['conteos'],
+        'media_movil': media_movil(serie['conteos'], ventana),
+        'proporcion_acumulada': proporcion_acumulada(serie['conteos'], serie['publicaciones'])
+    }
+
+def construir_motor_temporal(cubo, candidatos=None, fecha_inicio=None, fecha_fin=None, fases=None):
+    """
+    Series de la selección para todas las frecuencias y medidas de una vez
+
+    Sin fases explícitas, las fases de FASES_CAMPAÑA se ajustan al rango de
+    fechas de la selección (fases_segun_rango). Devuelve frecuencia -> serie
+    remuestreada con 'medidas' (medida -> array periodos × candidatos × columnas).
+    """
+    diaria = serie_diaria_cubo(cubo, candidatos, fecha_inicio, fecha_fin)
+    if fases is None:
+        periodos = diaria['periodos']
+        fases = fases_segun_rango(periodos[0], periodos[-1]) if len(periodos) else FASES_CAMPAÑA
+    motor = {}
+    for frecuencia in FRECUENCIAS:
+        serie = remuestrear(diaria, frecuencia, fases)
+        serie['medidas'] = calcular_medidas(serie, VENTANA_MEDIA_MOVIL[frecuencia])
+        motor[frecuencia] = serie
+    return motor
+
+def construir_motor_temporal_df(df, dummy_cols, fases=None):
+    """Motor temporal de un DataFrame ya filtrado (una pasada para el cubo de conteos)"""
+    return construir_motor_temporal(construir_cubo_conteos(df, dummy_cols), fases=fases)
+
+def tabla_temporal(motor, columnas, frecuencia='diaria', medida='usos', candidatos=None, por_candidato=False):
+    """
+    Tabla para graficar un subconjunto del motor: una fila por periodo
+
+    La primera columna es el periodo (COLUMNA_PERIODO) y le sigue una columna por
+    estrategia. Sin desglose, los candidatos indicados (None = todos) se suman
+    antes de calcular la medida; con por_candidato=True las columnas son
+    "Candidato · estrategia" y los valores se toman directamente del motor.
+    """
+    serie = motor[frecuencia]
+    columnas = [col for col in columnas if col in serie['posicion']]
+    indices_columna = np.array([serie['posicion'][col] for col in columnas], dtype=np.intp)
+    indices_candidato = [i for i, cand in enumerate(serie['candidatos']) if candidatos is None or cand in candidatos]
+
+    if por_candidato:
+        valores = serie['medidas'][medida][:, indices_candidato][:, :, indices_columna]
+        nombres = [f"{serie['candidatos'][i]} · {col}" for i in indices_candidato for col in columnas]
+        valores = valores.reshape(len(serie['periodos']), -1)
+    else:
+        agregada = {
+            'conteos': serie['conteos'][:, indices_candidato].sum(axis=1, keepdims=True),
+            'publicaciones': serie['publicaciones'][:, indices_candidato].sum(axis=1, keepdims=True)
+        }
+        valores = calcular_medidas(agregada, VENTANA_MEDIA_MOVIL[frecuencia])[medida][:, 0, indices_columna]
+        nombres = columnas
+
+    tabla = pd.DataFrame(valores, columns=nombres)
+    tabla.insert(0, COLUMNA_PERIODO[frecuencia], serie['periodos'])
+    return tabla
@@ -0,0 +1,110 @@
+import re
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.table import Table
+
+# =====================================================
+# TABLAS APA EN DOCX CONSTRUIDAS COMO XML EN BLOQUE
+# =====================================================
+
+# Estilo de tabla que se define una sola vez en los estilos del documento
+ESTILO_TABLA_APA = 'Tabla APA'
+
+# Ancho de cada columna (1,5 pulgadas en veinteavos de punto)
+ANCHO_COLUMNA = 2160
+
+# Caracteres de control que no admite XML
+_CONTROL_INVALIDO = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Times New Roman 12 pt, párrafos centrados sin espaciado; bordes APA: línea
+# superior e inferior de la tabla y línea bajo la fila de encabezados (en negrita)
+_XML_ESTILO_TABLA_APA = (
+    f'<w:style {nsdecls("w")} w:type="table" w:customStyle="1" w:styleId="TablaAPA">'
+    f'<w:name w:val="{ESTILO_TABLA_APA}"/>'
+    '<w:basedOn w:val="TableNormal"/>'
+    '<w:uiPriority w:val="99"/>'
+    '<w:pPr><w:spacing w:before="0" w:after="0" w:line="240" w:lineRule="auto"/><w:jc w:val="center"/></w:pPr>'
+    '<w:rPr><w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" w:cs="Times New Roman"/>'
+    '<w:sz w:val="24"/><w:szCs w:val="24"/></w:rPr>'
+    '<w:tblPr><w:tblBorders>'
+    '<w:top w:val="single" w:sz="8" w:space="0" w:color="000000"/>'
+    '<w:bottom w:val="single" w:sz="8" w:space="0" w:color="000000"/>'
+    '</w:tblBorders>'
+    '<w:tblCellMar><w:left w:w="108" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar>'
+    '</w:tblPr>'
+    '<w:tblStylePr w:type="firstRow">'
+    '<w:rPr><w:b/><w:bCs/></w:rPr>'
+    '<w:tcPr><w:tcBorders><w:bottom w:val="single" w:sz="8" w:space="0" w:color="000000"/></w:tcBorders></w:tcPr>'
+    '</w:tblStylePr>'
+    '</w:style>'
+)
+
+def asegurar_estilo_tabla_apa(doc):
+    """Añade el estilo de tabla APA a los estilos del documento si aún no está"""
+    estilos = doc.styles.element
+    if estilos.get_by_id('TablaAPA') is None:
+        estilos.append(parse_xml(_XML_ESTILO_TABLA_APA))
+    return ESTILO_TABLA_APA
+
+def _elemento_texto(texto):
+    # xml:space solo donde hace falta (como python-docx): además de aligerar el
+    # XML, lxml reconcilia ese espacio de nombres nodo a nodo al insertar la tabla
+    if texto != texto.strip():
+        return f'<w:t xml:space="preserve">{texto}</w:t>'
+    return f'<w:t>{texto}</w:t>' if texto else ''
+
+def _texto_celda(valor):
+    """Contenido <w:r> de una celda (saltos de línea y tabulaciones como en cell.text)"""
+    texto = escape(_CONTROL_INVALIDO.sub('', str(valor)))
+    if '\t' not in texto and '\n' not in texto:
+        return _elemento_texto(texto)
+    lineas = ['<w:tab/>'.join(_elemento_texto(parte) for parte in linea.split('\t'))
+              for linea in texto.split('\n')]
+    return '<w:br/>'.join(lineas)
+
+def _xml_fila(valores, celda, encabezado=False):
+    propiedades = '<w:trPr><w:tblHeader/></w:trPr>' if encabezado else ''
+    return f'<w:tr>{propiedades}{"".join(celda % _texto_celda(valor) for valor in valores)}</w:tr>'
+
+def xml_tabla_apa(df, ancho_columna=ANCHO_COLUMNA):
+    """
+    XML <w:tbl> completo de una tabla APA con los encabezados y valores de df
+
+    Se genera como texto en una sola pasada por las filas, sin crear objetos de
+    python-docx por celda; el formato lo aporta el estilo ESTILO_TABLA_APA. La
+    fila de encabezados se repite al cambiar de página.
+    """
+    columna_grid = f'<w:gridCol w:w="{ancho_columna}"/>'
+    celda = (f'<w:tc><w:tcPr><w:tcW w:w="{ancho_columna}" w:type="dxa"/></w:tcPr>'
+             '<w:p><w:r>%s</w:r></w:p></w:tc>')
+
+    partes = [
+        f'<w:tbl {nsdecls("w")}>'
+        '<w:tblPr><w:tblStyle w:val="TablaAPA"/><w:tblW w:w="0" w:type="auto"/><w:jc w:val="center"/>'
+        '<w:tblLook w:val="0020" w:firstRow="1" w:lastRow="0" w:firstColumn="0" w:lastColumn="0"'
+        ' w:noHBand="1" w:noVBand="1"/></w:tblPr>',
+        f'<w:tblGrid>{columna_grid * len(df.columns)}</w:tblGrid>',
+        _xml_fila(df.columns, celda, encabezado=True)
+    ]
+    # Valores por fila sin convertir cada fila en Series (como haría iterrows)
+    partes.extend(_xml_fila(fila, celda) for fila in df.to_numpy(dtype=object))
+    partes.append('</w:tbl>')
+    return ''.join(partes)
+
+def insertar_tabla_apa(doc, df, ancho_columna=ANCHO_COLUMNA):
+    """
+    Añade al final del documento una tabla APA con el contenido de df
+
+    Parámetros:
+    - doc: Documento de python-docx
+    - df: DataFrame (se escriben sus columnas, no el índice)
+    - ancho_columna: Ancho de cada columna en veinteavos de punto
+
+    Devuelve la tabla como objeto Table de python-docx.
+    """
+    asegurar_estilo_tabla_apa(doc)
+    tbl = parse_xml(xml_tabla_apa(df, ancho_columna))
+    doc.element.body._insert_tbl(tbl)
+    return Table(tbl, doc._body)